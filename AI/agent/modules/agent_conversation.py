@@ -12,6 +12,9 @@ from datetime import datetime
 from pathlib import Path
 import asyncio
 
+from .storage import run_io
+from .storage.backend import get_database
+
 class AgentConversationManager:
     def __init__(self, ollama_client, memory_utils, word2vec_model, max_turns=10):
         """
@@ -36,6 +39,8 @@ class AgentConversationManager:
         # 대화 저장 디렉토리
         self.conversations_dir = agent_dir / "data" / "conversations"
         os.makedirs(self.conversations_dir, exist_ok=True)
+        # STORAGE_BACKEND=sqlite이면 대화 파일 대신 conversations 테이블 사용
+        self.database = get_database(self.conversations_dir)
         
         print(f"✅ AgentConversationManager 초기화 완료 (최대 대화 턴 수: {self.max_turns})")
     
@@ -114,7 +119,8 @@ class AgentConversationManager:
             response = await self.ollama_client.process_prompt(
                 prompt=prompt,
                 system_prompt=system_prompt,
-                model_name="gemma3"
+                model_name="gemma3",
+                priority="conversation"
             )
             
             # 7. 응답 파싱
@@ -206,15 +212,21 @@ class AgentConversationManager:
     
     async def _load_conversation(self, conversation_id):
         """대화 로드"""
+        if self.database is not None:
+            try:
+                return await run_io(self.database.load_conversation, conversation_id)
+            except Exception as e:
+                print(f"Error loading conversation {conversation_id}: {e}")
+                return None
+        
         filepath = self.conversations_dir / f"{conversation_id}.json"
         
         if not os.path.exists(filepath):
             return None
         
-        # 파일 로드
+        # 파일 로드 (이벤트 루프가 멈추지 않도록 I/O 스레드에서 실행)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return await run_io(self._read_json, filepath)
         except Exception as e:
             print(f"Error loading conversation {conversation_id}: {e}")
             return None
@@ -224,23 +236,35 @@ class AgentConversationManager:
         filepath = self.conversations_dir / f"{conversation['conversation_id']}.json"
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(conversation, f, ensure_ascii=False, indent=2)
+            if self.database is not None:
+                await run_io(self.database.save_conversation, conversation)
+            else:
+                await run_io(self._write_json, filepath, conversation)
             return True
         except Exception as e:
             print(f"Error saving conversation: {e}")
             return False
+
+    @staticmethod
+    def _read_json(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(filepath, data):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
     
     async def _get_previous_conversations(self, agent1_name, agent2_name, max_count=3):
         """이전 대화 메모리 조회"""
-        # 메모리에서 두 에이전트 간의 이전 대화 검색
-        memories = self.memory_utils._load_memories()
+        # 메모리에서 두 에이전트 간의 이전 대화 검색 (상주 저장소에서 복사 없이 조회)
+        agent_memories = self.memory_utils.get_agent_memories(agent1_name)
         
-        if agent1_name not in memories:
+        if not agent_memories:
             return []
         
         conversation_memories = []
-        for memory in memories[agent1_name]["memories"]:
+        for memory in agent_memories.get("memories", {}).values():
             if memory.get("event_type") == "conversation":
                 details = memory.get("details", {})
                 if details.get("with") == agent2_name:
@@ -277,7 +301,6 @@ class AgentConversationManager:
             memory = {
                 "event": event_sentence,
                 "time": agent["time"],
-                "embeddings": embedding,
                 "event_type": "conversation",
                 "importance": summaries.get("importance", importance),
                 "details": {
@@ -289,22 +312,16 @@ class AgentConversationManager:
                 }
             }
             
-            # 메모리에 저장
-            memories = self.memory_utils._load_memories()
-            
-            if agent_name not in memories:
-                memories[agent_name] = {"memories": []}
-            
             # 메모리 ID 생성
-            memory_id = 1
-            if memories[agent_name]["memories"]:
-                memory_id = max([m.get("event_id", 0) for m in memories[agent_name]["memories"]]) + 1
+            memory_id = self.memory_utils._get_next_memory_id(agent_name)
             
-            memory["event_id"] = memory_id
-            memories[agent_name]["memories"].append(memory)
-            
-            # 저장
-            self.memory_utils._save_memories(memories)
+            # 메모리와 임베딩 저장
+            embeddings = {
+                "event": embedding,
+                "action": [],
+                "feedback": []
+            }
+            self.memory_utils.put_memory(agent_name, memory_id, memory, embeddings)
             memory_ids.append(memory_id)
         
         return memory_ids
@@ -345,7 +362,8 @@ Format your response as JSON:
         response = await self.ollama_client.process_prompt(
             prompt=prompt,
             system_prompt=system_prompt,
-            model_name="gemma3"
+            model_name="gemma3",
+            priority="conversation"
         )
         
         # JSON 파싱
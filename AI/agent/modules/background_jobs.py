@@ -0,0 +1,364 @@
+"""
+백그라운드 작업 모듈
+
+/reflect-and-plan처럼 LLM 호출이 수십 번 이어지는 요청을 HTTP 요청과 분리해 실행합니다.
+- submit: 작업 ID를 바로 반환하고, 실제 처리는 asyncio 작업 대기열의 워커가 실행
+- 진행 상황: 작업 함수가 progress(단계 이름)를 호출할 때마다 단계별 상태/시간 기록
+- 결과 보관: 같은 키(예: 에이전트 + 게임 시간)로 다시 제출하면 진행 중이거나 성공한 작업을 그대로 반환
+  (클라이언트가 다시 연결해도 작업을 처음부터 다시 하지 않음, 실패한 작업만 새로 실행)
+- 작업 함수가 예외(JobFailed 포함)를 던지면 실패로 기록되어 다시 제출할 때 새로 실행
+- 완료 알림: callback_url이 있으면 작업이 끝났을 때 작업 상태를 POST로 전송
+  (JOB_CALLBACK_ALLOWED_URLS에 등록한 주소 아래의 URL만 허용, 설정하지 않으면 완료 알림을 사용하지 않음)
+- 끝난 작업은 JOB_RESULT_TTL초 동안 보관
+"""
+
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Awaitable, Hashable, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", "3600"))
+# 완료 알림을 보낼 수 있는 기준 주소 (쉼표로 구분, 예: "http://localhost:5000/callbacks/")
+JOB_CALLBACK_ALLOWED_URLS = [
+    url.strip() for url in os.environ.get("JOB_CALLBACK_ALLOWED_URLS", "").split(",") if url.strip()
+]
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 작업 함수: progress(단계 이름)를 받아 결과(JSON으로 직렬화 가능한 값)를 반환
+JobRunner = Callable[[Callable[[str], None]], Awaitable[Any]]
+
+
+class JobFailed(Exception):
+    """작업이 끝까지 실행되었지만 성공하지 못했음을 알림 (result는 실패한 작업의 결과로 함께 보관)"""
+
+    def __init__(self, message: str, result: Any = None):
+        super().__init__(message)
+        self.result = result
+
+
+class BackgroundJobManager:
+    # 보관할 최대 작업 수 (넘으면 오래된 끝난 작업부터 제거)
+    MAX_JOBS = 1000
+    # 완료 알림 요청 타임아웃 (초)
+    CALLBACK_TIMEOUT = 10
+
+    def __init__(self, workers: int = None, result_ttl: float = None, callback_allowed_urls: Iterable[str] = None):
+        """
+        백그라운드 작업 관리자 초기화 (워커는 첫 제출 때 실행 중인 이벤트 루프에서 시작)
+
+        Args:
+            workers: 동시에 실행할 작업 수
+            result_ttl: 끝난 작업을 보관할 시간 (초)
+            callback_allowed_urls: 완료 알림을 허용할 기준 주소 목록 (비어 있으면 완료 알림 사용 안 함)
+        """
+        self.workers = max(1, workers or JOB_WORKERS)
+        self.result_ttl = JOB_RESULT_TTL if result_ttl is None else result_ttl
+        if callback_allowed_urls is None:
+            callback_allowed_urls = JOB_CALLBACK_ALLOWED_URLS
+        self.callback_allowed_urls = [urlsplit(url) for url in callback_allowed_urls]
+
+        # 작업 ID -> 작업 상태
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 작업 키 -> 작업 ID
+        self._keys: Dict[Hashable, str] = {}
+        self._runners: Dict[str, JobRunner] = {}
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        # 실행 중인 asyncio 작업 (워커, 완료 알림) - 참조를 잃어 중간에 회수되지 않도록 끝날 때까지 보관
+        self._tasks = set()
+        self.submitted = 0
+        self.reused = 0
+
+    def _start_workers(self):
+        """워커 시작 (이벤트 루프 안에서 호출)"""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            self._create_task(self._worker(), name=f"background-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    def _create_task(self, coro, name: str = None) -> asyncio.Task:
+        """asyncio 작업 생성 (끝날 때까지 self._tasks에 보관)"""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def is_callback_allowed(self, url: str) -> bool:
+        """
+        완료 알림 주소 허용 여부 (등록한 기준 주소와 scheme/호스트/포트가 같고 경로가 그 아래인 경우만 허용)
+
+        Args:
+            url: 확인할 callback_url
+
+        Returns:
+            bool: 허용 여부
+        """
+        try:
+            target = urlsplit(url)
+            target_port = target.port
+        except ValueError:
+            return False
+        if target.scheme not in ("http", "https") or not target.hostname or target.username or target.password:
+            return False
+        for base in self.callback_allowed_urls:
+            if (
+                target.scheme == base.scheme
+                and target.hostname == base.hostname
+                and target_port == base.port
+                and target.path.startswith(base.path)
+            ):
+                return True
+        return False
+
+    def submit(
+        self,
+        kind: str,
+        runner: JobRunner,
+        key: Hashable = None,
+        stages: Iterable[str] = (),
+        callback_url: str = None
+    ) -> Dict[str, Any]:
+        """
+        작업 제출 (같은 키의 작업이 대기 중/실행 중/성공 상태로 남아 있으면 그 작업을 반환)
+
+        Args:
+            kind: 작업 종류 (예: "reflect_and_plan")
+            runner: 실행할 작업 함수
+            key: 중복 제출을 판단할 키 (None이면 항상 새 작업)
+            stages: 진행 상황에 표시할 단계 이름들 (순서대로)
+            callback_url: 작업이 끝나면 상태를 POST로 보낼 주소 (is_callback_allowed를 통과해야 함)
+
+        Returns:
+            Dict[str, Any]: 작업 상태 (복사본)
+
+        Raises:
+            ValueError: 허용되지 않은 callback_url인 경우
+        """
+        if callback_url and not self.is_callback_allowed(callback_url):
+            raise ValueError(f"허용되지 않은 callback_url입니다: {callback_url}")
+        self._start_workers()
+        self._prune()
+
+        if key is not None:
+            job = self._jobs.get(self._keys.get(key))
+            if job is not None and job["status"] != FAILED:
+                self.reused += 1
+                if callback_url and not job.get("callback_url"):
+                    job["callback_url"] = callback_url
+                    if job["status"] == SUCCEEDED:
+                        self._create_task(self._send_callback(job), name=f"background-job-callback-{job['job_id']}")
+                return self.status(job["job_id"])
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": QUEUED,
+            "stage": None,
+            "stages": [{"name": name, "status": "pending"} for name in stages],
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "callback_url": callback_url,
+            "callback": None
+        }
+        self._jobs[job_id] = job
+        if key is not None:
+            self._keys[key] = job_id
+            job["key"] = key
+        self._runners[job_id] = runner
+        self._done_events[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)
+        self.submitted += 1
+        return self.status(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태 조회
+
+        Returns:
+            Optional[Dict[str, Any]]: {"job_id", "kind", "status", "stage", "stages", "progress", "result", "error", ...}
+                                      (없거나 보관 기간이 지난 작업이면 None)
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        stages = [dict(stage) for stage in job["stages"]]
+        done = sum(1 for stage in stages if stage["status"] in ("done", "skipped"))
+        status = {key: value for key, value in job.items() if key not in ("stages", "key")}
+        status["stages"] = stages
+        status["progress"] = 1.0 if job["status"] == SUCCEEDED else (done / len(stages) if stages else 0.0)
+        status["queue_position"] = self._queue_position(job_id) if job["status"] == QUEUED else None
+        return status
+
+    def _queue_position(self, job_id: str) -> Optional[int]:
+        """대기 중인 작업의 순서 (0부터)"""
+        queued = [item for item in self._jobs.values() if item["status"] == QUEUED]
+        for position, item in enumerate(queued):
+            if item["job_id"] == job_id:
+                return position
+        return None
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업이 끝날 때까지 기다린 뒤 상태 반환 (없는 작업이면 None)"""
+        event = self._done_events.get(job_id)
+        if event is None:
+            return self.status(job_id)
+        await event.wait()
+        return self.status(job_id)
+
+    async def _worker(self):
+        """대기열에서 작업을 하나씩 꺼내 실행"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        """작업 실행 및 단계별 진행 상황/결과 기록"""
+        job = self._jobs.get(job_id)
+        runner = self._runners.pop(job_id, None)
+        if job is None or runner is None:
+            return
+
+        job["status"] = RUNNING
+        job["started_at"] = time.time()
+        print(f"🛠️ 백그라운드 작업 시작: {job['kind']} ({job_id})")
+
+        def progress(stage_name: str):
+            self._enter_stage(job, stage_name)
+
+        try:
+            job["result"] = await runner(progress)
+            self._finish_stages(job, "done")
+            job["status"] = SUCCEEDED
+            print(f"✅ 백그라운드 작업 완료: {job['kind']} ({job_id}, {time.time() - job['started_at']:.2f}초)")
+        except JobFailed as e:
+            job["status"] = FAILED
+            job["error"] = str(e)
+            job["result"] = e.result
+            self._finish_stages(job, "failed")
+            print(f"❌ 백그라운드 작업 실패: {job['kind']} ({job_id}): {e}")
+        except asyncio.CancelledError:
+            job["status"] = FAILED
+            job["error"] = "cancelled"
+            self._finish_stages(job, "failed")
+            raise
+        except Exception as e:
+            job["status"] = FAILED
+            job["error"] = str(e)
+            self._finish_stages(job, "failed")
+            print(f"❌ 백그라운드 작업 실패: {job['kind']} ({job_id}): {e}")
+            traceback.print_exc()
+        finally:
+            job["stage"] = None
+            job["finished_at"] = time.time()
+            event = self._done_events.get(job_id)
+            if event is not None:
+                event.set()
+
+        if job.get("callback_url"):
+            await self._send_callback(job)
+
+    @staticmethod
+    def _enter_stage(job: Dict[str, Any], stage_name: str):
+        """단계 시작 기록 (이전 단계는 완료 처리, 건너뛴 단계는 skipped)"""
+        now = time.time()
+        names = [stage["name"] for stage in job["stages"]]
+        if stage_name not in names:
+            job["stages"].append({"name": stage_name, "status": "pending"})
+            names.append(stage_name)
+        index = names.index(stage_name)
+        for stage in job["stages"][:index]:
+            if stage["status"] == "running":
+                stage["status"] = "done"
+                stage["finished_at"] = now
+            elif stage["status"] == "pending":
+                stage["status"] = "skipped"
+        stage = job["stages"][index]
+        stage["status"] = "running"
+        stage["started_at"] = now
+        job["stage"] = stage_name
+
+    @staticmethod
+    def _finish_stages(job: Dict[str, Any], running_status: str):
+        """작업이 끝났을 때 실행 중인 단계는 running_status로, 남은 단계는 skipped로 정리"""
+        now = time.time()
+        for stage in job["stages"]:
+            if stage["status"] == "running":
+                stage["status"] = running_status
+                stage["finished_at"] = now
+            elif stage["status"] == "pending":
+                stage["status"] = "skipped"
+
+    async def _send_callback(self, job: Dict[str, Any]):
+        """완료 알림 전송 (실패해도 작업 결과는 상태 조회로 받을 수 있음)"""
+        url = job.get("callback_url")
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.CALLBACK_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.post(url, json=self.status(job["job_id"])) as response:
+                    job["callback"] = {"delivered": response.status < 400, "status_code": response.status}
+        except Exception as e:
+            job["callback"] = {"delivered": False, "error": str(e)}
+            print(f"⚠️ 작업 완료 알림 전송 실패 ({url}): {e}")
+
+    def _prune(self):
+        """보관 기간이 지났거나 최대 개수를 넘은 끝난 작업 제거"""
+        now = time.time()
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in (SUCCEEDED, FAILED)
+        ]
+        expired = [job_id for job_id in finished if now - self._jobs[job_id]["finished_at"] > self.result_ttl]
+        overflow = len(self._jobs) - len(expired) - self.MAX_JOBS
+        if overflow > 0:
+            expired.extend([job_id for job_id in finished if job_id not in expired][:overflow])
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            self._done_events.pop(job_id, None)
+            if "key" in job and self._keys.get(job["key"]) == job_id:
+                del self._keys[job["key"]]
+
+    def stats(self) -> Dict[str, Any]:
+        """상태별 작업 수와 제출/재사용 횟수"""
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job["status"]] += 1
+        return {
+            "workers": self.workers,
+            "jobs": counts,
+            "submitted": self.submitted,
+            "reused": self.reused
+        }
+
+    async def shutdown(self):
+        """워커 종료 (실행 중인 작업과 보내는 중인 완료 알림은 취소)"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
@@ -0,0 +1,105 @@
+import argparse
+import time
+
+import numpy as np
+
+try:
+    from .storage.ann_index import IVFIndex
+except ImportError:
+    # 스크립트로 직접 실행하는 경우
+    from storage.ann_index import IVFIndex
+
+
+def _make_embeddings(count, dim, topics, rng):
+    """주제(군집) 주변에 모인 정규화 임베딩 생성 (문장 평균 임베딩과 비슷한 분포)"""
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=count)
+    vectors = centers[labels] + rng.normal(scale=0.8, size=(count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32, copy=False)
+
+
+def _exact_top(matrix, query, top_k):
+    """전체 행렬 곱 + 부분 정렬로 정확한 상위 top_k 행"""
+    scores = matrix @ query
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    return top[np.argsort(-scores[top])]
+
+
+def benchmark_memory_ann(count=20000, dim=300, queries=200, top_k=10, candidates=200, probes=None, seed=0):
+    """
+    근사 검색 인덱스(IVFIndex)와 전체 검색의 재현율/지연 시간 비교
+
+    에이전트 메모리 임베딩과 비슷한 합성 데이터로 인덱스를 학습한 뒤,
+    검색할 군집 수(n_probe)별로 전체 검색 대비 recall@top_k와 쿼리당 지연 시간을 출력합니다.
+    행 단위 추가/삭제(save_memory, overwrite_location_memory 경로) 비용도 함께 측정합니다.
+
+    Args:
+        count (int): 메모리 수
+        dim (int): 임베딩 차원
+        queries (int): 쿼리 수
+        top_k (int): 재현율을 계산할 상위 개수
+        candidates (int): 근사 검색에서 쿼리마다 가져올 후보 수
+        probes (list): 비교할 n_probe 목록 (기본값: 군집 수 기준 자동)
+        seed (int): 난수 시드
+
+    Returns:
+        list: n_probe별 결과 딕셔너리 목록
+    """
+    rng = np.random.default_rng(seed)
+    matrix = _make_embeddings(count, dim, max(8, count // 500), rng)
+    query_vectors = _make_embeddings(queries, dim, max(8, count // 500), rng)
+    rows = np.arange(count)
+
+    start = time.perf_counter()
+    index = IVFIndex(seed=seed)
+    index.train(matrix, rows)
+    train_time = time.perf_counter() - start
+    n_lists = len(index.centroids)
+    print(f"📦 메모리 {count}개, 차원 {dim}, 군집 {n_lists}개, 학습 {train_time * 1000:.1f}ms")
+
+    # 전체 검색 기준값
+    start = time.perf_counter()
+    exact = [set(_exact_top(matrix, query, top_k).tolist()) for query in query_vectors]
+    exact_time = (time.perf_counter() - start) / queries
+    print(f"🔍 전체 검색: {exact_time * 1000:.3f}ms/쿼리")
+
+    results = []
+    for n_probe in probes or sorted({1, max(1, n_lists // 16), max(1, n_lists // 8), max(1, n_lists // 4)}):
+        found = []
+        start = time.perf_counter()
+        for query in query_vectors:
+            candidate_rows, _ = index.search(matrix, [query], candidates, n_probe)
+            scores = matrix[candidate_rows] @ query
+            found.append(set(candidate_rows[np.argsort(-scores)[:top_k]].tolist()))
+        ann_time = (time.perf_counter() - start) / queries
+        recall = float(np.mean([len(a & b) / top_k for a, b in zip(found, exact)]))
+        results.append({"n_probe": n_probe, "recall": recall, "ms_per_query": ann_time * 1000, "speedup": exact_time / ann_time})
+        print(f"   n_probe={n_probe:4d}: recall@{top_k}={recall:.3f}, {ann_time * 1000:.3f}ms/쿼리 (x{exact_time / ann_time:.1f})")
+
+    # 행 단위 추가/삭제 비용
+    updates = min(1000, count)
+    start = time.perf_counter()
+    for row in range(updates):
+        index.remove(row)
+        index.add(row, matrix[row])
+    update_time = (time.perf_counter() - start) / updates
+    print(f"✏️ 행 추가/삭제: {update_time * 1000000:.1f}µs/행")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메모리 근사 검색 인덱스의 재현율/지연 시간을 전체 검색과 비교합니다.")
+    parser.add_argument("--count", type=int, default=20000, help="메모리 수")
+    parser.add_argument("--dim", type=int, default=300, help="임베딩 차원")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--top-k", type=int, default=10, help="재현율을 계산할 상위 개수")
+    parser.add_argument("--candidates", type=int, default=200, help="쿼리마다 가져올 후보 수")
+    parser.add_argument("--probes", type=int, nargs="*", default=None, help="비교할 n_probe 목록")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+    benchmark_memory_ann(args.count, args.dim, args.queries, args.top_k, args.candidates, args.probes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+반응 판단 캐시 모듈
+
+Unity는 에이전트가 무언가를 볼 때마다 /react를 호출하므로, 같은 나무/같은 배고픔 수준처럼
+같은 상황이 게임 시간 한 시간에도 여러 번 반복됩니다. 매번 검색과 LLM 호출을 하지 않도록
+(에이전트, 이벤트 문장, 상태 구간, 성격) 키로 반응 판단 결과를 게임 시간 기준으로 잠시 보관합니다.
+
+- 상태 구간: format_state 결과 문자열 ("very hungry" 등, 이미 구간으로 나뉜 값)
+- 메모리가 바뀌지 않았으면 (임베딩 인덱스 버전이 같으면) 검색 없이 바로 캐시된 판단을 반환
+- 메모리가 바뀌었으면 검색을 다시 해서 프롬프트에 들어갈 관련 메모리가 같을 때만 재사용
+  (같은 관찰 메모리가 새 ID로 다시 저장되어도 내용이 같으면 캐시가 유지됨)
+- 피드백/대화/반응 생성 등 판단에 영향을 주는 새 메모리가 생기면 invalidate로 명시적으로 비움
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+from .storage.time_index import MIN_TIMESTAMP, parse_timestamp
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def game_minutes(time_str: Any) -> Optional[float]:
+    """
+    게임 시간 문자열을 분 단위 숫자로 변환
+
+    Returns:
+        Optional[float]: 기준 시각으로부터 지난 분 (파싱할 수 없으면 None)
+    """
+    timestamp = parse_timestamp(time_str)
+    if timestamp == MIN_TIMESTAMP:
+        return None
+    try:
+        moment = datetime.strptime(f"{timestamp:014d}", "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return (moment - _EPOCH).total_seconds() / 60.0
+
+
+class ReactionDecisionCache:
+    # 판단을 재사용할 게임 시간 (분)
+    TTL_GAME_MINUTES = 60
+    # 최대 항목 수
+    MAX_SIZE = 1024
+
+    def __init__(self, ttl_game_minutes: float = None, max_size: int = None):
+        """
+        반응 판단 캐시 초기화
+
+        Args:
+            ttl_game_minutes: 판단을 재사용할 게임 시간 (분, 0이면 캐시 사용 안 함)
+            max_size: 최대 항목 수
+        """
+        self.ttl_game_minutes = self.TTL_GAME_MINUTES if ttl_game_minutes is None else ttl_game_minutes
+        self.max_size = max_size or self.MAX_SIZE
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(agent_name: str, event_sentence: str, state_bucket: str, personality: str) -> Tuple[Hashable, ...]:
+        """상황 키 (이벤트 문장은 공백/대소문자 차이를 무시)"""
+        return (agent_name, " ".join((event_sentence or "").lower().split()), state_bucket or "", personality or "")
+
+    def lookup(self, key: Tuple[Hashable, ...], game_time: Any) -> Optional[Dict[str, Any]]:
+        """
+        유효한 캐시 항목 조회 (게임 시간이 TTL을 넘었거나 거꾸로 흘렀으면 제거)
+
+        Returns:
+            Optional[Dict[str, Any]]: {"decision", "fingerprint", "memory_version", "game_minutes"} 또는 None
+        """
+        now = game_minutes(game_time)
+        if self.ttl_game_minutes <= 0 or now is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            elapsed = now - entry["game_minutes"]
+            if elapsed < 0 or elapsed > self.ttl_game_minutes:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def hit(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """메모리가 바뀌지 않아 바로 재사용한 판단 (복사본)"""
+        with self._lock:
+            self.hits += 1
+        return dict(entry["decision"])
+
+    def revalidate(self, key: Tuple[Hashable, ...], entry: Dict[str, Any], memory_version: Hashable) -> Dict[str, Any]:
+        """메모리는 바뀌었지만 관련 메모리가 같아 재사용한 판단 (다음 조회부터는 바로 재사용)"""
+        with self._lock:
+            self.revalidated += 1
+            if self._entries.get(key) is entry:
+                entry["memory_version"] = memory_version
+        return dict(entry["decision"])
+
+    def store(self, key: Tuple[Hashable, ...], game_time: Any, memory_version: Hashable, fingerprint: str, decision: Dict[str, Any]):
+        """새 판단 저장 (게임 시간이 없으면 저장하지 않음)"""
+        now = game_minutes(game_time)
+        with self._lock:
+            self.misses += 1
+            if self.ttl_game_minutes <= 0 or now is None:
+                return
+            self._entries[key] = {
+                "decision": dict(decision),
+                "fingerprint": fingerprint,
+                "memory_version": memory_version,
+                "game_minutes": now
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, agent_name: str = None):
+        """에이전트의 캐시된 판단 제거 (agent_name이 None이면 전체)"""
+        with self._lock:
+            if agent_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == agent_name]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/재검증/실패 통계"""
+        with self._lock:
+            total = self.hits + self.revalidated + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / total if total else 0.0
+            }
@@ -0,0 +1,277 @@
+"""
+문장 임베딩 캐시 모듈
+
+같은 문장(상태 문장, 위치 문장, "Conversation with X at Y" 등)이 반복해서
+임베딩되므로, 정규화된 문장을 키로 하는 LRU 캐시에 float32 벡터를 보관합니다.
+같은 Word2Vec 모델을 쓰는 모든 모듈이 하나의 캐시를 공유합니다.
+
+캐시에 없는 문장은 여러 개를 한 번에 계산합니다 (get_many):
+고유 단어만 KeyedVectors 배열에서 행 번호로 모아 단어 행렬을 만들고,
+문장별 단어 벡터 합을 구간 합(문장 x 단어 희소 행렬과 단어 행렬의 곱)으로 구한 뒤 한 번에 정규화합니다.
+(np.add.reduceat은 2차원 행렬에서 같은 연산보다 몇 배 느려 희소 행렬 곱을 사용)
+
+content_hash는 정규화된 문장의 해시로, 저장된 임베딩이 현재 텍스트로 만든 것인지 확인할 때 씁니다.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any
+
+import numpy as np
+from scipy import sparse
+
+# 특수문자 제거 (공백 제외)
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+class EmbeddingCache:
+    # 캐시에 보관할 최대 문장 수
+    MAX_SIZE = 4096
+
+    def __init__(self, word2vec_model, max_size: int = None):
+        """
+        임베딩 캐시 초기화
+
+        Args:
+            word2vec_model: Word2Vec 모델 (KeyedVectors)
+            max_size: 캐시에 보관할 최대 문장 수
+        """
+        self.model = word2vec_model
+        self.max_size = max_size or self.MAX_SIZE
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        캐시 키로 쓸 정규화 문장 (특수문자 제거, 소문자, 공백 정리)
+
+        Args:
+            text: 원본 문장
+
+        Returns:
+            str: 정규화된 문장
+        """
+        cleaned_text = _PUNCTUATION_PATTERN.sub('', text or '')
+        return " ".join(w.lower() for w in cleaned_text.split())
+
+    @classmethod
+    def content_hash(cls, text: str) -> str:
+        """
+        정규화된 문장의 짧은 해시 (정규화 결과가 같은 문장은 임베딩도 같으므로 같은 해시)
+
+        Args:
+            text: 원본 문장
+
+        Returns:
+            str: 16자리 16진수 해시
+        """
+        return hashlib.sha1(cls.normalize(text).encode("utf-8")).hexdigest()[:16]
+
+    def get(self, text: str) -> np.ndarray:
+        """
+        문장 임베딩 조회 (없으면 계산 후 캐시에 저장)
+
+        반환된 배열은 캐시와 공유되므로 읽기 전용입니다.
+
+        Args:
+            text: 임베딩할 문장
+
+        Returns:
+            np.ndarray: 정규화된 float32 문장 벡터
+        """
+        key = self.normalize(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        vector = self._compute(key)
+
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return vector
+
+    def get_many(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        여러 문장의 임베딩을 한 번에 조회 (캐시에 없는 문장은 한 번의 벡터 연산으로 계산)
+
+        같은 문장은 한 번만 계산합니다.
+
+        Args:
+            texts: 임베딩할 문장 목록
+            use_cache: 캐시 사용 여부 (저장 파일 전체를 다시 임베딩할 때처럼 한 번만 쓰는 문장이
+                       많으면 False로 두어 자주 쓰는 문장이 캐시에서 밀려나지 않게 함)
+
+        Returns:
+            np.ndarray: (문장 수, 차원) 정규화된 float32 행렬 (입력 순서)
+        """
+        keys = [self.normalize(text) for text in texts]
+        if not keys:
+            return np.zeros((0, self.model.vector_size), dtype=np.float32)
+        if not use_cache:
+            unique_keys = list(dict.fromkeys(keys))
+            positions = {key: i for i, key in enumerate(unique_keys)}
+            return self._compute_many(unique_keys)[[positions[key] for key in keys]]
+
+        vectors = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[key] = vector
+                else:
+                    missing.append(key)
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = self._compute_many(missing)
+            with self._lock:
+                for i, key in enumerate(missing):
+                    # 행 뷰를 캐시하면 항목 하나가 묶음 행렬 전체를 붙잡으므로 행마다 복사
+                    vector = computed[i].copy()
+                    vector.flags.writeable = False
+                    vectors[key] = vector
+                    self._cache[key] = vector
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+
+        return np.stack([vectors[key] for key in keys])
+
+    def _word_matrix(self, words: List[str]):
+        """
+        고유 단어들의 벡터 행렬 (모델 배열에서 행 번호로 한 번에 가져옴)
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, int]]: (단어 벡터 행렬, 단어 -> 행렬의 행 번호) (모델에 없는 단어는 제외)
+        """
+        # FallbackKeyedVectors는 축소 모델 배열을 먼저 사용하고, 없는 단어만 하나씩 조회
+        base = getattr(self.model, "pruned_model", self.model)
+        key_to_index = getattr(base, "key_to_index", None)
+        base_vectors = getattr(base, "vectors", None)
+
+        base_words, base_rows, extra_words, extra_vectors = [], [], [], []
+        for word in words:
+            row = key_to_index.get(word) if key_to_index is not None and base_vectors is not None else None
+            if row is not None:
+                base_words.append(word)
+                base_rows.append(row)
+            elif word in self.model:
+                extra_words.append(word)
+                extra_vectors.append(self.model[word])
+
+        parts = []
+        if base_rows:
+            parts.append(np.asarray(base_vectors[np.asarray(base_rows, dtype=np.int64)], dtype=np.float32))
+        if extra_vectors:
+            parts.append(np.asarray(extra_vectors, dtype=np.float32))
+        if not parts:
+            return np.zeros((0, self.model.vector_size), dtype=np.float32), {}
+        word_index = {word: i for i, word in enumerate(base_words + extra_words)}
+        return np.concatenate(parts) if len(parts) > 1 else parts[0], word_index
+
+    def _compute_many(self, normalized_texts: List[str]) -> np.ndarray:
+        """
+        정규화된 문장들의 단어 벡터 평균을 한 번에 계산하여 정규화
+
+        Returns:
+            np.ndarray: (문장 수, 차원) float32 행렬 (알려진 단어가 없는 문장은 0 벡터)
+        """
+        result = np.zeros((len(normalized_texts), self.model.vector_size), dtype=np.float32)
+        token_lists = [text.split() for text in normalized_texts]
+        word_matrix, word_index = self._word_matrix(list(dict.fromkeys(w for tokens in token_lists for w in tokens)))
+        if not word_index:
+            return result
+
+        # 문장별 단어 행 번호를 이어 붙이고 문장 경계(indptr)로 구간 합 계산
+        token_rows = [[word_index[w] for w in tokens if w in word_index] for tokens in token_lists]
+        counts = np.fromiter((len(rows) for rows in token_rows), dtype=np.int64, count=len(token_rows))
+        filled = np.flatnonzero(counts)
+        if len(filled) == 0:
+            return result
+
+        flat_rows = np.fromiter((row for rows in token_rows for row in rows), dtype=np.int64, count=int(counts.sum()))
+        indptr = np.concatenate(([0], np.cumsum(counts[filled])))
+        segments = sparse.csr_matrix(
+            (np.ones(len(flat_rows), dtype=np.float32), flat_rows, indptr),
+            shape=(len(filled), len(word_matrix))
+        )
+        means = np.asarray(segments @ word_matrix, dtype=np.float32) / counts[filled, None].astype(np.float32)
+
+        # 정규화
+        norms = np.linalg.norm(means, axis=1, keepdims=True)
+        np.divide(means, norms, out=means, where=norms > 0)
+        result[filled] = means
+        return result
+
+    def _compute(self, normalized_text: str) -> np.ndarray:
+        """정규화된 문장의 단어 벡터 평균을 정규화하여 반환 (문장 하나는 희소 행렬을 만드는 것보다 직접 계산이 빠름)"""
+        tokens = [w for w in normalized_text.split() if w in self.model]
+
+        if not tokens:
+            vector = np.zeros(self.model.vector_size, dtype=np.float32)
+        else:
+            # 단어 벡터의 평균을 문장 벡터로 사용
+            vector = np.mean([self.model[w] for w in tokens], axis=0).astype(np.float32)
+
+            # 정규화
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+
+        vector.flags.writeable = False
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def clear(self):
+        """캐시 비우기 (통계는 유지)"""
+        with self._lock:
+            self._cache.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(word2vec_model) -> EmbeddingCache:
+    """
+    모델별로 하나의 임베딩 캐시를 공유
+
+    Args:
+        word2vec_model: Word2Vec 모델
+
+    Returns:
+        EmbeddingCache: 공유 임베딩 캐시
+    """
+    with _caches_lock:
+        cache = _caches.get(id(word2vec_model))
+        if cache is None or cache.model is not word2vec_model:
+            cache = EmbeddingCache(word2vec_model)
+            _caches[id(word2vec_model)] = cache
+        return cache
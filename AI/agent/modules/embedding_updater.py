@@ -2,25 +2,31 @@
 임베딩 업데이트 모듈
 
 메모리와 반성 데이터의 임베딩을 업데이트하는 기능을 제공합니다.
+필드별 텍스트 해시(EmbeddingCache.content_hash)를 임베딩과 함께 저장하여,
+새로 추가되었거나 텍스트가 바뀐 필드만 다시 임베딩합니다.
 """
 
 import json
 import os
-from typing import Dict, List, Any
+from contextlib import ExitStack
+from typing import Dict, List, Any, Optional
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 from .memory_utils import MemoryUtils
+from .embedding_cache import EmbeddingCache
+from .storage.embedding_sidecar import MEMORY_EMBEDDING_FIELDS
 
 class EmbeddingUpdater:
-    def __init__(self, word2vec_model):
+    def __init__(self, word2vec_model, memory_utils: Optional[MemoryUtils] = None):
         """
         임베딩 업데이트 초기화
         
         Args:
             word2vec_model: Word2Vec 모델
+            memory_utils: 공유할 MemoryUtils 인스턴스 (없으면 새로 생성)
         """
-        self.memory_utils = MemoryUtils(word2vec_model)
+        self.memory_utils = memory_utils or MemoryUtils(word2vec_model)
         self.word2vec_model = word2vec_model
         
         # 현재 파일의 절대 경로를 기준으로 상위 디렉토리 찾기
@@ -79,71 +85,173 @@ class EmbeddingUpdater:
         
         return embeddings
         
+    @staticmethod
+    def _memory_field_is_current(entry: Any, field: str, text: str) -> bool:
+        """메모리 임베딩 필드가 현재 텍스트로 만든 것인지 여부 (텍스트가 없으면 벡터도 없어야 함)"""
+        fields = entry.get("fields", []) if isinstance(entry, dict) and "row" in entry else []
+        if not text:
+            return field not in fields
+        return field in fields and (entry.get("hashes") or {}).get(field) == EmbeddingCache.content_hash(text)
+
+    @staticmethod
+    def _reflection_is_current(reflection: Dict[str, Any], thought: str) -> bool:
+        """반성 임베딩이 현재 thought로 만든 것인지 여부"""
+        row = reflection.get("embedding_row")
+        return (
+            isinstance(row, int) and not isinstance(row, bool) and row >= 0
+            and reflection.get("embedding_hash") == EmbeddingCache.content_hash(thought)
+        )
+
+    def carry_over_memory_embeddings(self, agent_name: str, memories: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        새로 저장할 메모리 중 텍스트가 그대로인 필드의 기존 임베딩을 가져옴
+
+        전체 데이터를 교체하면 사이드카도 비워지므로 벡터를 리스트로 읽어 해시와 함께 넘깁니다.
+
+        Args:
+            agent_name: 에이전트 이름
+            memories: 새로 저장할 {메모리 ID: 메모리} 데이터
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {메모리 ID: {"event": [...], ..., "hashes": {...}}} (가져올 필드가 없는 메모리는 제외)
+        """
+        store = self.memory_utils.memory_store
+        current = (store.snapshot(agent_name).get(agent_name) or {}).get("embeddings", {})
+        embeddings = {}
+        for memory_id, memory in memories.items():
+            entry = current.get(str(memory_id))
+            if not isinstance(entry, dict):
+                continue
+            fields = [
+                field for field in MEMORY_EMBEDDING_FIELDS
+                if memory.get(field, "") and self._memory_field_is_current(entry, field, memory.get(field, ""))
+            ]
+            if not fields:
+                continue
+            vectors = store.get_embeddings(agent_name, memory_id)
+            carried = {field: vectors.get(field, []) for field in fields}
+            carried["hashes"] = {field: entry["hashes"][field] for field in fields}
+            embeddings[str(memory_id)] = carried
+        return embeddings
+
+    def carry_over_reflection_embeddings(self, agent_name: str, reflections: List[Dict[str, Any]]):
+        """
+        새로 저장할 반성에 thought가 같은 기존 반성의 임베딩 행을 이어줌 (제자리 수정)
+
+        반성 사이드카는 저장할 때 비워지지 않으므로 행 번호만 넘기면 됩니다.
+
+        Args:
+            agent_name: 에이전트 이름
+            reflections: 새로 저장할 반성 목록
+        """
+        existing = self.memory_utils.reflection_store.load_agent(agent_name) or {}
+        rows = {}
+        for reflection in existing.get("reflections", []):
+            thought = reflection.get("thought", "")
+            if thought and self._reflection_is_current(reflection, thought):
+                rows.setdefault(reflection["embedding_hash"], reflection["embedding_row"])
+
+        for reflection in reflections:
+            if not isinstance(reflection, dict):
+                continue
+            # 저장 파일에서 온 행 번호는 현재 사이드카와 맞지 않을 수 있으므로 버림
+            for key in ("embedding", "embedding_row", "embedding_hash"):
+                reflection.pop(key, None)
+            content_hash = EmbeddingCache.content_hash(reflection.get("thought", ""))
+            if reflection.get("thought", "") and content_hash in rows:
+                # 같은 행을 두 반성이 가리키지 않도록 한 번만 넘김
+                reflection["embedding_row"] = rows.pop(content_hash)
+                reflection["embedding_hash"] = content_hash
+
     def update_embeddings(self) -> Dict[str, int]:
         """
-        모든 메모리와 반성의 임베딩을 업데이트
-        
+        새로 추가되었거나 텍스트가 바뀐 메모리/반성의 임베딩만 업데이트
+
+        필드별 텍스트 해시가 저장된 해시와 같고 벡터가 있으면 건너뛰고,
+        다시 계산할 텍스트는 모아서 한 번에 임베딩한 뒤 바뀐 필드만 기록합니다.
+
         Returns:
-            Dict[str, int]: 업데이트된 항목 수 {"memories": n, "reflections": m, "objects": o}
+            Dict[str, int]: {"memories": 다시 계산한 메모리 수, "reflections": 다시 계산한 반성 수, "objects": o,
+                             "skipped_memories": 건너뛴 메모리 수, "skipped_reflections": 건너뛴 반성 수}
         """
-        update_counts = {"memories": 0, "reflections": 0, "objects": 0}
+        update_counts = {"memories": 0, "reflections": 0, "objects": 0, "skipped_memories": 0, "skipped_reflections": 0}
         
         # 오브젝트 임베딩 확인 및 생성
         if not os.path.exists(self.object_embeddings_path):
             print("오브젝트 임베딩 파일이 없습니다. 생성합니다...")
             self.create_object_embeddings()
             update_counts["objects"] = 1
-        
-        # 메모리 업데이트
-        memories = self.memory_utils._load_memories()
-        for agent_name in memories:
-            for memory_id, memory in memories[agent_name]["memories"].items():
-                # 임베딩 데이터 초기화
-                if "embeddings" not in memories[agent_name]:
-                    memories[agent_name]["embeddings"] = {}
-                
-                embeddings = {
-                    "event": [],
-                    "action": [],
-                    "feedback": []
-                }
-                
-                # event 임베딩
-                event = memory.get("event", "")
-                if event:
-                    embeddings["event"] = self.memory_utils.get_embedding(event)
-                
-                # action 임베딩
-                action = memory.get("action", "")
-                if action:
-                    embeddings["action"] = self.memory_utils.get_embedding(action)
-                
-                # feedback 임베딩
-                feedback = memory.get("feedback", "")
-                if feedback:
-                    embeddings["feedback"] = self.memory_utils.get_embedding(feedback)
-                
-                # 임베딩 저장
-                memories[agent_name]["embeddings"][memory_id] = embeddings
-                update_counts["memories"] += 1
-        
-        self.memory_utils._save_memories(memories)
-        
-        # 반성 업데이트
+
+        store = self.memory_utils.memory_store
         reflections = self.memory_utils._load_reflections()
-        for agent_name in reflections:
-            for reflection in reflections[agent_name]["reflections"]:
-                event = reflection.get("thought", "")
-                if event:
-                    # 시간 필드가 없는 경우 현재 시간 추가
-                    current_time = datetime.now().strftime("%Y.%m.%d.%H:%M")
-                    if "time" not in reflection:
-                        reflection["time"] = current_time
-                    if "created" not in reflection:
-                        reflection["created"] = current_time
-                    reflection["embedding"] = self.memory_utils.get_embedding(event)
-                    update_counts["reflections"] += 1
-        
-        self.memory_utils._save_reflections(reflections)
+
+        # 락 순서를 고정하여 교착 상태 방지 (조회와 기록 사이에 다른 요청이 임베딩을 바꾸지 않도록)
+        with ExitStack() as stack:
+            for agent_name in sorted(store.data, key=str):
+                stack.enter_context(store.agent_lock(agent_name))
+            memories = store.snapshot()
+
+            # 다시 계산할 텍스트 수집 (메모리 필드 / 반성)
+            texts = []
+            memory_targets = []
+            for agent_name, agent_data in memories.items():
+                embeddings = agent_data.get("embeddings", {}) or {}
+                for memory_id, memory in agent_data.get("memories", {}).items():
+                    entry = embeddings.get(memory_id)
+                    stale = [
+                        field for field in MEMORY_EMBEDDING_FIELDS
+                        if not self._memory_field_is_current(entry, field, memory.get(field, "") or "")
+                    ]
+                    if not stale:
+                        update_counts["skipped_memories"] += 1
+                        continue
+                    for field in stale:
+                        text = memory.get(field, "") or ""
+                        memory_targets.append((agent_name, memory_id, field, text, len(texts) if text else None))
+                        if text:
+                            texts.append(text)
+                    update_counts["memories"] += 1
+
+            reflection_targets = []
+            for agent_name in reflections:
+                for reflection in reflections[agent_name]["reflections"]:
+                    thought = reflection.get("thought", "")
+                    if not thought:
+                        continue
+                    if self._reflection_is_current(reflection, thought):
+                        update_counts["skipped_reflections"] += 1
+                        continue
+                    reflection_targets.append((agent_name, reflection, thought, len(texts)))
+                    texts.append(thought)
+
+            vectors = self.memory_utils.get_embeddings(texts, use_cache=False)
+
+            # 메모리 업데이트 (바뀐 필드만 해시와 함께 기록)
+            records = []
+            for agent_name, memory_id, field, text, position in memory_targets:
+                record = {"op": "put_embedding", "agent": agent_name, "memory_id": memory_id, "field": field, "vector": []}
+                if position is not None:
+                    record["vector"] = vectors[position].tolist()
+                    record["hash"] = EmbeddingCache.content_hash(text)
+                records.append(record)
+            if records:
+                self.memory_utils._append_memory_records(records)
+
+        # 반성 업데이트 (바뀐 에이전트의 파일만 다시 씀)
+        changed_agents = set()
+        current_time = datetime.now().strftime("%Y.%m.%d.%H:%M")
+        for agent_name, reflection, thought, position in reflection_targets:
+            # 시간 필드가 없는 경우 현재 시간 추가
+            if "time" not in reflection:
+                reflection["time"] = current_time
+            if "created" not in reflection:
+                reflection["created"] = current_time
+            reflection["embedding"] = vectors[position].tolist()
+            reflection["embedding_hash"] = EmbeddingCache.content_hash(thought)
+            changed_agents.add(agent_name)
+            update_counts["reflections"] += 1
+
+        if changed_agents:
+            self.memory_utils._save_reflections({agent_name: reflections[agent_name] for agent_name in changed_agents})
         
-        return update_counts 
\ No newline at end of file
+        return update_counts
@@ -11,6 +11,8 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 
+from .storage.backend import get_database
+
 class EventIdManager:
     def __init__(self, memory_utils, similarity_threshold: float = 0.75):
         """
@@ -30,7 +32,10 @@ class EventIdManager:
         data_dir = agent_dir / "data"
         
         self.event_id_file = str(data_dir / "event_ids.json")
-        self._ensure_event_id_file_exists()
+        # STORAGE_BACKEND=sqlite이면 event_ids.json 대신 event_ids 테이블 사용
+        self.database = get_database(self.event_id_file)
+        if self.database is None:
+            self._ensure_event_id_file_exists()
         
     def _ensure_event_id_file_exists(self):
         """event_ids.json 파일이 존재하는지 확인하고, 없다면 생성"""
@@ -74,14 +79,18 @@ class EventIdManager:
         # 임베딩 생성
         event_embedding = self.memory_utils.get_embedding(event_sentence)
         
-        # 메모리에서 유사한 이벤트 검색
-        event_ids = self._load_event_ids()
-        
-        if agent_name not in event_ids["agents"]:
-            event_ids["agents"][agent_name] = []
-        
-        # 에이전트의 이벤트 ID 리스트
-        agent_event_ids = event_ids["agents"][agent_name]
+        # 메모리에서 유사한 이벤트 검색 (SQLite면 해당 에이전트의 이벤트만 조회)
+        if self.database is not None:
+            event_ids = None
+            agent_event_ids = self.database.load_agent_event_ids(agent_name)
+        else:
+            event_ids = self._load_event_ids()
+            
+            if agent_name not in event_ids["agents"]:
+                event_ids["agents"][agent_name] = []
+            
+            # 에이전트의 이벤트 ID 리스트
+            agent_event_ids = event_ids["agents"][agent_name]
         
         # 가장 유사한 이벤트 찾기
         max_similarity = 0
@@ -106,26 +115,31 @@ class EventIdManager:
             print(f"유사한 이벤트 ID 발견: {most_similar_id}, 유사도: {max_similarity:.4f}")
             return most_similar_id
         
-        # 새 ID 생성
-        new_id = event_ids["next_id"]
-        event_ids["next_id"] += 1
-        
         # 게임 시간 사용 (없으면 이벤트의 time 필드 사용, 그것도 없으면 현재 시간)
         if not game_time:
             game_time = event.get("time", datetime.now().strftime("%Y.%m.%d.%H:%M"))
         
-        # 새 이벤트 ID 데이터 추가
-        agent_event_ids.append({
-            "id": new_id,
+        new_event = {
             "event_type": event.get("event_type", ""),
             "object": event.get("object", ""),
             "location": event.get("event_location", ""),
             "embedding": event_embedding,
             "created": game_time  # 게임 시간 사용
-        })
-        
-        # 데이터 저장
-        self._save_event_ids(event_ids)
+        }
+        
+        if self.database is not None:
+            # 새 ID 발급과 저장을 한 트랜잭션으로 처리 (이 이벤트 행만 추가)
+            new_id = self.database.add_event_id(agent_name, new_event)
+        else:
+            # 새 ID 생성
+            new_id = event_ids["next_id"]
+            event_ids["next_id"] += 1
+            
+            # 새 이벤트 ID 데이터 추가
+            agent_event_ids.append(dict(new_event, id=new_id))
+            
+            # 데이터 저장
+            self._save_event_ids(event_ids)
         
         print(f"새 이벤트 ID 생성: {new_id}, 게임 시간: {game_time}")
         return new_id
\ No newline at end of file
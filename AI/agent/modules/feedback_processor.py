@@ -12,6 +12,7 @@ from pathlib import Path
 import numpy as np
 from datetime import datetime
 import re
+from .prompt_registry import get_prompt_registry
 
 class FeedbackProcessor:
     def __init__(self, memory_utils, ollama_client):
@@ -59,6 +60,18 @@ Changes in my needs:
 Please create a concise, first-person perspective description of my experience that I can remember.
 """
         self._ensure_prompt_files_exist()
+        # 프롬프트는 시작 시 한 번 읽고 파일이 바뀌었을 때만 다시 로드
+        self.prompts = get_prompt_registry()
+        self.prompts.register("feedback/feedback_system", default=self.default_system_prompt)
+        self.prompts.register(
+            "feedback/feedback_prompt",
+            default=self.default_feedback_prompt,
+            placeholders=(
+                "AGENT_NAME", "ACTION", "INTERACTABLE", "LOCATION", "SUCCESS_STATUS", "FEEDBACK_DESCRIPTION",
+                "HUNGER_DIFF", "HUNGER_FEELING", "SLEEPINESS_DIFF", "SLEEPINESS_FEELING",
+                "LONELINESS_DIFF", "LONELINESS_FEELING", "STRESS_DIFF", "STRESS_FEELING"
+            )
+        )
     
     def _ensure_prompt_files_exist(self):
         """프롬프트 파일이 존재하는지 확인하고, 없다면 기본 템플릿으로 생성"""
@@ -72,15 +85,6 @@ Please create a concise, first-person perspective description of my experience t
             with open(self.feedback_prompt_path, 'w', encoding='utf-8') as f:
                 f.write(self.default_feedback_prompt)
     
-    def _load_prompt(self, file_path: str, default_template: str) -> str:
-        """프롬프트 파일 로드"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            print(f"프롬프트 파일 로드 실패: {e}, 기본 템플릿 사용")
-            return default_template
-    
     def _interpret_needs_diff(self, needs_diff: Dict[str, int]) -> Dict[str, str]:
         """
         욕구 변화량에 대한 해석 생성
@@ -265,12 +269,10 @@ Please create a concise, first-person perspective description of my experience t
             # 성공/실패 상태
             success_status = "Success" if success else "Failed"
             
-            # 프롬프트 템플릿 로드
-            system_prompt = self._load_prompt(self.system_prompt_path, self.default_system_prompt)
-            feedback_prompt = self._load_prompt(self.feedback_prompt_path, self.default_feedback_prompt)
-            
-            # 프롬프트 생성
-            formatted_prompt = feedback_prompt.format(
+            # 프롬프트 생성 (레지스트리에 로드된 템플릿 사용)
+            system_prompt = self.prompts.get("feedback/feedback_system")
+            formatted_prompt = self.prompts.render(
+                "feedback/feedback_prompt",
                 AGENT_NAME=agent_name,
                 ACTION=action if action else "",
                 INTERACTABLE=interactable if interactable else "",
@@ -291,7 +293,8 @@ Please create a concise, first-person perspective description of my experience t
             response = await self.ollama_client.process_prompt(
                 prompt=formatted_prompt,
                 system_prompt=system_prompt,
-                model_name="gemma3"
+                model_name="gemma3",
+                priority="conversation"
             )
             
             if response.get("status") != "success":
@@ -333,29 +336,16 @@ Please create a concise, first-person perspective description of my experience t
             # 임베딩 생성 (통합 피드백 기반)
             embedding = self.memory_utils.get_embedding(combined_feedback)
             
-            # 메모리 데이터 로드
-            memories = self.memory_utils._load_memories()
-            
-            # 에이전트가 존재하는지 확인
-            if agent_name not in memories:
-                memories[agent_name] = {"memories": {}}
-            
-            if "memories" not in memories[agent_name]:
-                memories[agent_name]["memories"] = {}
-            
             # 이벤트 텍스트 생성
             event_text = self._create_event_text(action, interactable, current_location)
             
             # 메모리 ID가 있으면 해당 메모리에 피드백 저장
             if memory_id:
-                agent_memories = memories[agent_name]["memories"]
-                
-                # 메모리 ID가 존재하는지 확인
-                if memory_id in agent_memories:
+                # 메모리 ID가 존재하는지 확인 (상주 저장소에서 조회)
+                if self.memory_utils.get_memory(agent_name, memory_id) is not None:
                     # 기존 메모리에 통합 피드백 추가
-                    agent_memories[memory_id]["feedback"] = combined_feedback
+                    self.memory_utils.update_memory(agent_name, memory_id, {"feedback": combined_feedback})
                     print(f"✅ 메모리 ID {memory_id}에 통합 피드백 저장")
-                    self.memory_utils._save_memories(memories)
                     
                     return {
                         "success": True,
@@ -369,7 +359,7 @@ Please create a concise, first-person perspective description of my experience t
             # 새 메모리 생성 (기존 ID 유지)
             if memory_id:
                 # 기존 ID로 새 메모리 생성
-                memories[agent_name]["memories"][memory_id] = {
+                new_memory = {
                     "event_role": "",
                     "event": event_text,  # 안전하게 생성된 이벤트 텍스트
                     "action": action if action else "",
@@ -379,8 +369,8 @@ Please create a concise, first-person perspective description of my experience t
                     "embeddings": embedding,
                     "importance": 3  # 피드백의 기본 중요도
                 }
+                self.memory_utils.put_memory(agent_name, memory_id, new_memory)
                 print(f"✅ 메모리 ID {memory_id}로 새 메모리 생성 및 통합 피드백 저장")
-                self.memory_utils._save_memories(memories)
                 
                 return {
                     "success": True,
@@ -391,7 +381,7 @@ Please create a concise, first-person perspective description of my experience t
             else:
                 # 새 ID로 메모리 생성
                 new_memory_id = self.memory_utils._get_next_memory_id(agent_name)
-                memories[agent_name]["memories"][new_memory_id] = {
+                new_memory = {
                     "event_role": "",
                     "event": event_text,  # 안전하게 생성된 이벤트 텍스트
                     "action": action if action else "",
@@ -401,8 +391,8 @@ Please create a concise, first-person perspective description of my experience t
                     "embeddings": embedding,
                     "importance": 3  # 피드백의 기본 중요도
                 }
+                self.memory_utils.put_memory(agent_name, new_memory_id, new_memory)
                 print(f"✅ 새 메모리 ID {new_memory_id}에 통합 피드백 저장")
-                self.memory_utils._save_memories(memories)
                 
                 return {
                     "success": True,
@@ -0,0 +1,186 @@
+"""
+LLM 요청 우선순위 스케줄러 모듈
+
+올라마 동시 요청 슬롯을 우선순위 클래스별 대기열로 배분합니다.
+- interactive: /react, /make_reaction 등 게임이 바로 기다리는 요청
+- conversation: 에이전트 대화, 행동 피드백
+- background: 중요도 평가, 반성, 계획 생성 등 일괄 작업
+
+슬롯이 비면 항상 높은 우선순위 대기열부터 처리하되,
+낮은 우선순위 요청이 일정 시간 이상 기다렸으면 먼저 처리하여 기아 상태를 막습니다.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_CONVERSATION = "conversation"
+PRIORITY_BACKGROUND = "background"
+
+# 높은 우선순위부터
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_CONVERSATION, PRIORITY_BACKGROUND)
+
+
+class PriorityScheduler:
+    # 낮은 우선순위 요청이 이 시간(초) 이상 기다리면 우선순위와 관계없이 다음 슬롯을 배정
+    STARVATION_TIMEOUT = 10.0
+
+    def __init__(self, max_concurrency: int, starvation_timeout: float = None):
+        """
+        스케줄러 초기화 (이벤트 루프 안에서 생성)
+
+        Args:
+            max_concurrency: 최대 동시 실행 수
+            starvation_timeout: 기아 방지 대기 시간 (초)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.starvation_timeout = self.STARVATION_TIMEOUT if starvation_timeout is None else starvation_timeout
+
+        self.active = 0
+        # 직전 배정이 기아 방지 배정이었는지 (연속 배정 시 높은 우선순위 요청이 밀리지 않도록 번갈아 처리)
+        self._last_promoted = False
+        # 클래스별 대기열: (대기 시작 시각, future)
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._stats = {
+            priority: {"requests": 0, "total_wait": 0.0, "max_wait": 0.0, "promoted": 0}
+            for priority in PRIORITIES
+        }
+
+    @staticmethod
+    def normalize_priority(priority: str) -> str:
+        """알 수 없는 우선순위는 conversation으로 처리"""
+        return priority if priority in PRIORITIES else PRIORITY_CONVERSATION
+
+    async def acquire(self, priority: str):
+        """
+        실행 슬롯을 얻을 때까지 대기
+
+        Args:
+            priority: 우선순위 클래스
+        """
+        priority = self.normalize_priority(priority)
+        enqueued_at = time.monotonic()
+
+        # 빈 슬롯이 있고 기다리는 요청이 없으면 바로 실행
+        if self.active < self.max_concurrency and not any(self._queues.values()):
+            self.active += 1
+            self._record_wait(priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (enqueued_at, future)
+        self._queues[priority].append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 배정받은 직후 취소된 경우 슬롯 반환
+                self.release()
+            else:
+                try:
+                    self._queues[priority].remove(entry)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self):
+        """실행 슬롯 반환 후 다음 대기 요청에 배정"""
+        self.active -= 1
+        self._dispatch()
+
+    def fail_waiters(self, error: BaseException):
+        """
+        대기 중인 요청을 모두 error로 실패 처리 (스케줄러를 더 이상 사용하지 않을 때 호출)
+
+        다른 스레드의 이벤트 루프에서 호출될 수 있으므로 각 요청의 루프에서 실패를 기록하며,
+        이미 닫힌 루프의 요청은 깨울 수 없으므로 대기열에서만 제거합니다.
+
+        Args:
+            error: 대기 중인 요청에 전달할 예외
+        """
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                _, future = queue.popleft()
+                if future.done():
+                    continue
+                loop = future.get_loop()
+                if loop.is_closed():
+                    continue
+                loop.call_soon_threadsafe(self._set_exception, future, error)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, error: BaseException):
+        """아직 끝나지 않은 future에 예외 설정"""
+        if not future.done():
+            future.set_exception(error)
+
+    def _dispatch(self):
+        """빈 슬롯을 대기 중인 요청에 배정"""
+        while self.active < self.max_concurrency:
+            priority = self._next_priority()
+            if priority is None:
+                return
+            enqueued_at, future = self._queues[priority].popleft()
+            if future.done():
+                continue
+            self.active += 1
+            self._record_wait(priority, time.monotonic() - enqueued_at)
+            future.set_result(None)
+
+    def _next_priority(self):
+        """다음에 처리할 우선순위 클래스 선택"""
+        now = time.monotonic()
+
+        highest = next((priority for priority in PRIORITIES if self._queues[priority]), None)
+        if self._last_promoted:
+            self._last_promoted = False
+            return highest
+
+        # 기아 방지: 오래 기다린 낮은 우선순위 요청 중 가장 오래 기다린 요청을 먼저 처리
+        starving = None
+        for priority in PRIORITIES[1:]:
+            queue = self._queues[priority]
+            if queue and now - queue[0][0] >= self.starvation_timeout:
+                if starving is None or queue[0][0] < self._queues[starving][0][0]:
+                    starving = priority
+        if starving is not None and starving != highest:
+            self._stats[starving]["promoted"] += 1
+            self._last_promoted = True
+            return starving
+        return highest
+
+    def _record_wait(self, priority: str, wait: float):
+        """대기 시간 통계 기록"""
+        stats = self._stats[priority]
+        stats["requests"] += 1
+        stats["total_wait"] += wait
+        stats["max_wait"] = max(stats["max_wait"], wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        클래스별 대기열 길이와 대기 시간 통계
+
+        Returns:
+            Dict[str, Any]: 실행 중인 요청 수, 클래스별 대기열 길이/요청 수/평균·최대 대기 시간
+        """
+        now = time.monotonic()
+        classes = {}
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            stats = self._stats[priority]
+            classes[priority] = {
+                "queued": len(queue),
+                "oldest_wait": round(now - queue[0][0], 3) if queue else 0.0,
+                "requests": stats["requests"],
+                "avg_wait": round(stats["total_wait"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                "max_wait": round(stats["max_wait"], 3),
+                "promoted": stats["promoted"]
+            }
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "classes": classes
+        }
@@ -1,12 +1,18 @@
-import json
 import os
-from typing import List, Dict, Any
+from contextlib import ExitStack
+from typing import List, Dict, Any, Optional
 import numpy as np
 from datetime import datetime
 from pathlib import Path
 from numpy import dot
 from numpy.linalg import norm
 
+from .storage.memory_store import get_memory_store
+from .storage.io_executor import run_io
+from .storage.backend import get_agent_store
+from .storage.embedding_sidecar import get_embedding_sidecar, externalize_reflection_embeddings
+from .embedding_cache import get_embedding_cache
+
 class MemoryUtils:
     def __init__(self, word2vec_model):
         # 현재 파일의 절대 경로를 기준으로 상위 디렉토리 찾기
@@ -18,77 +24,72 @@ class MemoryUtils:
         self.memories_file = str(data_dir / "memories.json")
         self.plans_file = str(data_dir / "plans.json")
         self.reflections_file = str(data_dir / "reflections.json")
-        
+
         # Word2Vec 모델 설정
         self.model = word2vec_model
+        # 같은 모델을 쓰는 모듈끼리 공유하는 문장 임베딩 캐시
+        self.embedding_cache = get_embedding_cache(word2vec_model)
         
+        # 메모리 데이터는 프로세스 내 공유 저장소에 상주 (디스크 기록은 write-behind)
+        # 메모리/반성/계획 모두 에이전트별 파일(memories/, reflections/, plans/)에 나눠 저장
+        # (STORAGE_BACKEND=sqlite이면 SQLite 데이터베이스 하나에 저장)
+        self.memory_store = get_memory_store(self.memories_file)
+        self.reflection_store = get_agent_store(self.reflections_file, {"reflections": []})
+        self.plan_store = get_agent_store(self.plans_file, {})
+
         self._ensure_files_exist()
 
+        # 반성 임베딩은 사이드카(.npy)에 저장 (기존 JSON 리스트 임베딩은 한 번 옮겨둠)
+        self.reflection_sidecar = get_embedding_sidecar(self.reflections_file, 1)
+        reflections = self._load_reflections()
+        if externalize_reflection_embeddings(self.reflection_sidecar, reflections):
+            print("📦 반성 임베딩을 사이드카 파일로 옮겼습니다.")
+            self._save_reflections(reflections)
+
     def _ensure_files_exist(self):
-        """필요한 JSON 파일들이 존재하는지 확인하고, 없다면 생성"""
-        for file_path in [self.memories_file, self.plans_file, self.reflections_file]:
-            if not os.path.exists(file_path):
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    if file_path == self.memories_file:
-                        # 새로운 메모리 구조로 초기화
-                        json.dump({
-                            "Tom": {
-                                "memories": {},
-                                "embeddings": {}
-                            },
-                            "Jane": {
-                                "memories": {},
-                                "embeddings": {}
-                            }
-                        }, f, ensure_ascii=False, indent=2)
-                    elif file_path == self.reflections_file:
-                        json.dump({"Tom": {"reflections": []}, "Jane": {"reflections": []}}, f, ensure_ascii=False, indent=2)
-                    else:
-                        json.dump({"Tom": {}, "Jane": {}}, f, ensure_ascii=False, indent=2)
+        """에이전트별 데이터(디렉토리 또는 데이터베이스 행)가 없다면 기본 에이전트 데이터로 생성"""
+        if not self.memory_store.exists():
+            # 새로운 메모리 구조로 초기화
+            self.memory_store.replace_all({
+                "Tom": {
+                    "memories": {},
+                    "embeddings": {}
+                },
+                "Jane": {
+                    "memories": {},
+                    "embeddings": {}
+                }
+            })
+            self.memory_store.flush()
+        if not self.reflection_store.exists():
+            self.reflection_store.save_all({"Tom": {"reflections": []}, "Jane": {"reflections": []}})
+        if not self.plan_store.exists():
+            self.plan_store.save_all({"Tom": {}, "Jane": {}})
 
     def _load_memories(self, sort_by_time: bool = False) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
-        """메모리 데이터 로드. 필요에 따라 시간순으로 정렬합니다."""
+        """
+        메모리 데이터 복사본 로드. 필요에 따라 시간순으로 정렬합니다.
+
+        반환값은 수정해도 되는 복사본입니다. 읽기만 하는 경로에서는
+        복사 비용이 없는 get_agent_memories()를 사용하세요.
+        """
         try:
-            with open(self.memories_file, 'r', encoding='utf-8') as f:
-                memories_data = json.load(f)
+            memories_data = self.memory_store.snapshot()
             
             if sort_by_time:
                 # 각 에이전트의 메모리를 시간 역순으로 정렬
+                # (저장소의 시간 인덱스 순서를 사용하므로 매번 시간 문자열을 파싱하지 않음)
                 for agent_name in memories_data:
-                    if "memories" in memories_data[agent_name] and isinstance(memories_data[agent_name]["memories"], dict):
-                        # 메모리 항목들을 시간 기준으로 정렬
-                        # strptime 포맷을 유연하게 처리하기 위해 여러 포맷 시도
-                        def parse_time(time_str):
-                            formats_to_try = [
-                                "%Y.%m.%d.%H:%M:%S", 
-                                "%Y.%m.%d.%H:%M",
-                                "%Y-%m-%dT%H:%M:%S.%fZ", # ISO 8601 format
-                                "%Y-%m-%d %H:%M:%S" # 다른 일반적인 포맷
-                            ]
-                            for fmt in formats_to_try:
-                                try:
-                                    return datetime.strptime(time_str, fmt)
-                                except ValueError:
-                                    continue
-                            # 모든 포맷에 실패하면 None 반환 또는 에러 처리
-                            print(f"Warning: Could not parse time string {time_str} for agent {agent_name}")
-                            return datetime.min # 정렬에서 가장 오래된 것으로 처리
-
-                        memory_items = []
-                        for mem_id, mem_content in memories_data[agent_name]["memories"].items():
-                            parsed_time = parse_time(mem_content.get("time", ""))
-                            memory_items.append((mem_id, mem_content, parsed_time))
-
-                        # 시간(parsed_time)을 기준으로 내림차순 정렬
-                        sorted_memory_items = sorted(
-                            memory_items,
-                            key=lambda item: item[2], # item[2]는 parsed_time
-                            reverse=True
-                        )
-                        
-                        # 정렬된 결과를 새 딕셔너리에 저장
-                        ordered_memories = {mem_id: mem_content for mem_id, mem_content, _ in sorted_memory_items}
+                    agent_memories = memories_data[agent_name].get("memories")
+                    if isinstance(agent_memories, dict):
+                        ordered_memories = {
+                            mem_id: agent_memories[mem_id]
+                            for mem_id in self.memory_store.memory_ids_newest_first(agent_name)
+                            if mem_id in agent_memories
+                        }
+                        # 복사본을 만든 뒤 인덱스에 반영되지 않은 메모리는 뒤에 붙임
+                        for mem_id, mem_content in agent_memories.items():
+                            ordered_memories.setdefault(mem_id, mem_content)
                         memories_data[agent_name]["memories"] = ordered_memories
             
             return memories_data
@@ -106,58 +107,145 @@ class MemoryUtils:
             }
 
     def _save_memories(self, memories: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]):
-        """메모리 데이터 저장"""
+        """메모리 데이터 전체 교체 (디스크에는 스냅샷으로 기록됨)"""
         try:
-            with open(self.memories_file, 'w', encoding='utf-8') as f:
-                json.dump(memories, f, ensure_ascii=False, indent=2)
+            self.memory_store.replace_all(memories)
         except Exception as e:
             print(f"메모리 저장 중 오류 발생: {e}")
 
+    def _save_agent_memories(self, agent_name: str, agent_memories: Dict[str, Dict[str, Any]]):
+        """에이전트 하나의 메모리 데이터 교체 (다른 에이전트 데이터와 샤드는 그대로 둠)"""
+        try:
+            self.memory_store.replace_agent(agent_name, agent_memories)
+        except Exception as e:
+            print(f"{agent_name} 메모리 저장 중 오류 발생: {e}")
+
+    def _append_memory_records(self, records: List[Dict[str, Any]]):
+        """메모리 변경 레코드를 저장소에 반영 (디스크에는 로그로 기록됨)"""
+        try:
+            self.memory_store.apply(records)
+        except Exception as e:
+            print(f"메모리 로그 기록 중 오류 발생: {e}")
+
+    def get_agent_memories(self, agent_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        에이전트의 메모리/임베딩 데이터 (복사 없이 상주 데이터를 그대로 반환)
+
+        Args:
+            agent_name: 에이전트 이름
+
+        Returns:
+            Dict: {"memories": {...}, "embeddings": {...}} (읽기 전용, 없으면 빈 딕셔너리)
+        """
+        return self.memory_store.get_agent(agent_name) or {}
+
+    def get_memory(self, agent_name: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """메모리 하나 조회 (읽기 전용, 없으면 None)"""
+        return self.memory_store.get_memory(agent_name, memory_id)
+
+    def get_memory_embeddings(self, agent_name: str, memory_id: str) -> Dict[str, List[float]]:
+        """메모리 하나의 임베딩 (사이드카에서 읽어 {"event", "action", "feedback"} 리스트로 반환, 없으면 {})"""
+        return self.memory_store.get_embeddings(agent_name, memory_id)
+
+    def get_embedding_index(self, agent_name: str):
+        """에이전트의 정규화된 임베딩 행렬 (AgentEmbeddingIndex, 에이전트가 없으면 None)"""
+        return self.memory_store.get_embedding_index(agent_name)
+
+    def put_memory(self, agent_name: str, memory_id: str, memory: Dict[str, Any], embeddings: Dict[str, List[float]] = None):
+        """
+        메모리 하나를 통째로 저장 (이미 있으면 덮어씀)
+
+        Args:
+            agent_name: 에이전트 이름
+            memory_id: 메모리 ID
+            memory: 메모리 데이터
+            embeddings: 임베딩 데이터 (None이면 기존 임베딩 유지)
+        """
+        record = {"op": "put_memory", "agent": agent_name, "memory_id": str(memory_id), "memory": memory}
+        if embeddings is not None:
+            record["embeddings"] = embeddings
+        self._append_memory_records([record])
+
+    def update_memory(self, agent_name: str, memory_id: str, fields: Dict[str, Any], embeddings: Dict[str, List[float]] = None):
+        """
+        메모리의 일부 필드만 갱신
+
+        Args:
+            agent_name: 에이전트 이름
+            memory_id: 메모리 ID
+            fields: 갱신할 필드와 값
+            embeddings: 함께 갱신할 임베딩 필드(event/action/feedback)와 벡터 (필드 갱신과 한 번에 반영)
+        """
+        records = [{"op": "update_memory", "agent": agent_name, "memory_id": str(memory_id), "fields": fields}]
+        for field, embedding in (embeddings or {}).items():
+            records.append({"op": "put_embedding", "agent": agent_name, "memory_id": str(memory_id), "field": field, "vector": embedding})
+        self._append_memory_records(records)
+
+    def update_embedding(self, agent_name: str, memory_id: str, field: str, embedding: List[float]):
+        """
+        메모리의 특정 임베딩 필드(event/action/feedback) 갱신
+
+        Args:
+            agent_name: 에이전트 이름
+            memory_id: 메모리 ID
+            field: 임베딩 필드 이름
+            embedding: 임베딩 벡터
+        """
+        self._append_memory_records([
+            {"op": "put_embedding", "agent": agent_name, "memory_id": str(memory_id), "field": field, "vector": embedding}
+        ])
+
     def _load_reflections(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
         """반성 데이터 로드"""
         try:
-            with open(self.reflections_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self.reflection_store.load_all()
         except Exception as e:
             print(f"반성 데이터 로드 중 오류 발생: {e}")
             return {"Tom": {"reflections": []}, "Jane": {"reflections": []}}
 
     def _save_reflections(self, reflections: Dict[str, Dict[str, List[Dict[str, Any]]]]):
-        """반성 데이터 저장"""
+        """
+        반성 데이터 저장 (임베딩은 사이드카에, JSON에는 embedding_row만 저장)
+
+        전달된 에이전트의 파일만 다시 씁니다.
+        """
         try:
-            with open(self.reflections_file, 'w', encoding='utf-8') as f:
-                json.dump(reflections, f, ensure_ascii=False, indent=2)
+            externalize_reflection_embeddings(self.reflection_sidecar, reflections)
+            self.reflection_sidecar.flush()
+            self.reflection_store.save_all(reflections)
         except Exception as e:
             print(f"반성 데이터 저장 중 오류 발생: {e}")
 
+    def _load_plans(self) -> Dict[str, Any]:
+        """계획 데이터 로드 (파일이 없거나 읽을 수 없으면 빈 딕셔너리)"""
+        try:
+            return self.plan_store.load_all()
+        except Exception as e:
+            print(f"계획 데이터 로드 중 오류 발생: {e}")
+            return {}
+
+    def _save_plans(self, plans: Dict[str, Any]):
+        """계획 데이터 저장 (전달된 에이전트의 파일만 다시 씀)"""
+        try:
+            self.plan_store.save_all(plans)
+        except Exception as e:
+            print(f"계획 데이터 저장 중 오류 발생: {e}")
+
     def _get_next_memory_id(self, agent_name: str) -> str:
         """에이전트의 다음 메모리 ID를 가져옴"""
-        memories = self._load_memories()
-        
-        if agent_name not in memories or "memories" not in memories[agent_name]:
-            return "1"
-            
-        agent_memories = memories[agent_name]["memories"]
-        if not agent_memories:
-            return "1"
-            
-        # 현재 메모리 ID 중 가장 큰 값을 찾음
-        try:
-            memory_ids = [int(id) for id in agent_memories.keys()]
-            return str(max(memory_ids) + 1)
-        except ValueError:
-            return "1"
+        return self.memory_store.next_memory_id(agent_name)
 
     def save_memory(self, event_sentence: str, embedding: List[float], event_time: str, agent_name: str, event_role: str = "", importance:int = 0):
         """새로운 메모리 저장"""
-        memories = self._load_memories()
+        memory_id, record = self._new_memory_record(event_sentence, embedding, event_time, agent_name, event_role, importance)
+
+        # 전체 파일을 다시 쓰지 않고 로그에 추가
+        self._append_memory_records([record])
         
-        if agent_name not in memories:
-            memories[agent_name] = {
-                "memories": {},
-                "embeddings": {}
-            }
-            
+        return memory_id
+
+    def _new_memory_record(self, event_sentence: str, embedding: List[float], event_time: str, agent_name: str, event_role: str = "", importance:int = 0):
+        """새 메모리 ID를 예약하고 저장할 put_memory 레코드 생성 (저장은 하지 않음)"""
         # 현재 시간이 제공되지 않은 경우 현재 시간 사용
         if not event_time:
             event_time = datetime.now().strftime("%Y.%m.%d.%H:%M")
@@ -194,20 +282,15 @@ class MemoryUtils:
         if importance != 0 : 
             memory["importance"] = importance
 
-        # 메모리와 임베딩을 별도로 저장
-        memories[agent_name]["memories"][memory_id] = memory
-        
-        # 임베딩 데이터 저장
+        # 임베딩 데이터
         embeddings = {
             "event": embedding,
             "action": [],
             "feedback": []
         }
-        memories[agent_name]["embeddings"][memory_id] = embeddings
-        
-        self._save_memories(memories)
-        
-        return memory_id
+
+        record = {"op": "put_memory", "agent": agent_name, "memory_id": str(memory_id), "memory": memory, "embeddings": embeddings}
+        return memory_id, record
 
     def get_embedding(self, text: str) -> List[float]:
         """
@@ -219,27 +302,34 @@ class MemoryUtils:
         Returns:
             List[float]: 임베딩 벡터
         """
+        return self.embedding_cache.get(text).tolist()
 
-        # 특수문자 제거 (공백 제외)
-        import re
-        cleaned_text = re.sub(r'[^\w\s]', '', text)    
+    def get_embedding_array(self, text: str) -> np.ndarray:
+        """
+        텍스트를 임베딩 벡터(float32 배열, 읽기 전용)로 변환
 
-        # 토큰화 및 소문자 변환
-        tokens = [w.lower() for w in cleaned_text.split() if w.lower() in self.model]
-        
-        if not tokens:
-            return [0.0] * self.model.vector_size
-        
-        # 단어 벡터의 평균을 문장 벡터로 사용
-        word_vectors = [self.model[w] for w in tokens]
-        sentence_vector = np.mean(word_vectors, axis=0)
-        
-        # 정규화
-        norm = np.linalg.norm(sentence_vector)
-        if norm > 0:
-            sentence_vector = sentence_vector / norm
-            
-        return sentence_vector.tolist()
+        리스트 변환 없이 캐시된 배열을 그대로 반환합니다.
+
+        Args:
+            text: 임베딩할 텍스트
+
+        Returns:
+            np.ndarray: 임베딩 벡터
+        """
+        return self.embedding_cache.get(text)
+
+    def get_embeddings(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        여러 텍스트를 한 번의 벡터 연산으로 임베딩
+
+        Args:
+            texts: 임베딩할 텍스트 목록
+            use_cache: 문장 임베딩 캐시 사용 여부 (전체 데이터를 다시 임베딩할 때는 False)
+
+        Returns:
+            np.ndarray: (텍스트 수, 차원) 정규화된 float32 행렬 (입력 순서)
+        """
+        return self.embedding_cache.get_many(texts, use_cache=use_cache)
 
     def event_to_sentence(self, event: Dict[str, Any]) -> str:
         """이벤트를 문장으로 변환"""
@@ -269,15 +359,28 @@ class MemoryUtils:
 ######################## 위치 저장하는 메소드 라인 ################################
 
     def overwrite_location_memory(self, event_sentence: str, embedding: List[float], event_location: str, event_type: str, event_time: str, agent_name: str, event_role: str = "", importance:int = 0):
-        """기존 메모리 덮어쓰기"""
-        memories = self._load_memories(sort_by_time=True)
+        """기존 메모리 덮어쓰기 (같은 에이전트의 위치 저장이 동시에 들어와도 중복 메모리가 생기지 않도록 에이전트 락 안에서 처리)"""
+        with self.memory_store.agent_lock(agent_name):
+            return self._overwrite_location_memory(event_sentence, embedding, event_location, event_type, event_time, agent_name, event_role, importance)
+
+    def _overwrite_location_memory(self, event_sentence: str, embedding: List[float], event_location: str, event_type: str, event_time: str, agent_name: str, event_role: str = "", importance:int = 0):
+        memory_id, records = self._location_memory_records(event_sentence, embedding, event_location, event_type, event_time, agent_name, event_role, importance)
+
+        # 삭제와 덮어쓰기를 한 번에 로그에 추가
+        self._append_memory_records(records)
         
-        if agent_name not in memories:
-            memories[agent_name] = {
-                "memories": {},
-                "embeddings": {}
-            }
-            
+        return memory_id
+
+    def _location_memory_records(self, event_sentence: str, embedding: List[float], event_location: str, event_type: str, event_time: str, agent_name: str, event_role: str = "", importance:int = 0, pending_ids: Dict[tuple, str] = None):
+        """
+        위치 메모리 덮어쓰기 레코드 생성 (저장은 하지 않음, 에이전트 락 안에서 호출)
+
+        Args:
+            pending_ids: 아직 저장소에 반영하지 않은 같은 묶음의 위치 메모리 ID ((에이전트, event_type, event_location) -> ID)
+
+        Returns:
+            Tuple[str, List[Dict]]: (메모리 ID, delete_memory/put_memory 레코드 목록)
+        """
         # 현재 시간이 제공되지 않은 경우 현재 시간 사용
         if not event_time:
             event_time = datetime.now().strftime("%Y.%m.%d.%H:%M")
@@ -285,30 +388,32 @@ class MemoryUtils:
         most_recent_match_id = None
         older_duplicate_ids_to_delete = []
 
-        # 기존 메모리에서 event_type과 event_location이 일치하는지 확인
-        # _load_memories(sort_by_time=True)로 인해 memories는 최신순으로 정렬되어 있음
-        if agent_name in memories and "memories" in memories[agent_name]:
-            for mem_id, mem_data in memories[agent_name]["memories"].items():
-                if mem_data.get("event_type") == event_type and \
-                   mem_data.get("event_location") == event_location:
-                    if most_recent_match_id is None: # 첫 번째 일치 항목 (가장 최신)
-                        most_recent_match_id = mem_id
-                    else: # 이후 일치 항목 (오래된 중복)
-                        older_duplicate_ids_to_delete.append(mem_id)
+        # 같은 묶음에서 이미 덮어쓴 위치면 그 메모리를 다시 덮어씀 (오래된 중복은 앞에서 이미 삭제)
+        pending_key = (agent_name, event_type, event_location)
+        if pending_ids is not None and pending_key in pending_ids:
+            match_ids = [pending_ids[pending_key]]
+        else:
+            # event_type과 event_location이 일치하는 기존 메모리를 저장소의 위치 인덱스로 최신순 조회
+            # (에이전트의 모든 메모리를 훑지 않음, 중복은 보통 없으므로 0~1개)
+            match_ids = self.memory_store.location_memory_ids(agent_name, event_type, event_location)
+
+        if match_ids:
+            most_recent_match_id = match_ids[0] # 첫 번째 일치 항목 (가장 최신)
+            older_duplicate_ids_to_delete = match_ids[1:] # 이후 일치 항목 (오래된 중복)
         
-        # 오래된 중복 메모리 삭제
-        if older_duplicate_ids_to_delete:
-            for del_id in older_duplicate_ids_to_delete:
-                if del_id in memories[agent_name]["memories"]:
-                    del memories[agent_name]["memories"][del_id]
-                if del_id in memories[agent_name]["embeddings"]: # 연결된 임베딩도 삭제
-                    del memories[agent_name]["embeddings"][del_id]
+        # 오래된 중복 메모리 삭제 (연결된 임베딩도 삭제)
+        records = [
+            {"op": "delete_memory", "agent": agent_name, "memory_id": del_id}
+            for del_id in older_duplicate_ids_to_delete
+        ]
 
         # 사용할 메모리 ID 결정
         if most_recent_match_id:
             memory_id = most_recent_match_id
         else:
             memory_id = self._get_next_memory_id(agent_name)
+        if pending_ids is not None:
+            pending_ids[pending_key] = memory_id
 
         ## 디버그용 기본점수
         if importance == 0:
@@ -346,20 +451,20 @@ class MemoryUtils:
         if importance != 0 : 
             memory["importance"] = importance
 
-        # 메모리와 임베딩을 별도로 저장
-        memories[agent_name]["memories"][memory_id] = memory
-        
-        # 임베딩 데이터 저장
+        # 임베딩 데이터
         embeddings = {
             "event": embedding,
             "action": [],
             "feedback": []
         }
-        memories[agent_name]["embeddings"][memory_id] = embeddings
-        
-        self._save_memories(memories)
-        
-        return memory_id
+        records.append({
+            "op": "put_memory",
+            "agent": agent_name,
+            "memory_id": memory_id,
+            "memory": memory,
+            "embeddings": embeddings
+        })
+        return memory_id, records
 
     def save_location_data(self, event: Dict[str, Any], agent_name: str) -> bool:
         """지역 정보를 메모리에 저장"""
@@ -376,4 +481,101 @@ class MemoryUtils:
             return True
         except Exception as e:
             print(f"관찰 정보 저장 실패: {e}")
-            return False
\ No newline at end of file
+            return False
+
+######################## 묶음 저장 메소드 라인 ################################
+
+    def save_events_batch(self, events: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        여러 에이전트의 관찰/위치 이벤트를 한 번에 저장
+
+        문장 임베딩은 한 번의 벡터 연산으로 계산하고, 모든 변경은 하나의 apply로 저장소에 반영합니다.
+        (관련 에이전트의 락을 모두 잡은 상태에서 위치 메모리 조회와 ID 예약을 하므로 개별 저장과 결과가 같음)
+
+        Args:
+            events: {"type": "perceive" | "location", "agent": 에이전트 이름, "event": 이벤트 데이터} 목록
+
+        Returns:
+            List[Optional[str]]: 입력 순서대로 저장된 메모리 ID (저장하지 않은 항목은 None)
+        """
+        memory_ids = [None] * len(events)
+        if not events:
+            return memory_ids
+
+        sentences = [event["event"].get("event_description", "") for event in events]
+        embeddings = self.get_embeddings(sentences)
+
+        # 락 순서를 고정하여 교착 상태 방지
+        agent_names = sorted({event["agent"] for event in events})
+        with ExitStack() as stack:
+            for agent_name in agent_names:
+                stack.enter_context(self.memory_store.agent_lock(agent_name))
+
+            records = []
+            pending_ids = {}
+            for i, item in enumerate(events):
+                event = item["event"]
+                agent_name = item["agent"]
+                embedding = embeddings[i].tolist()
+                event_time = event.get("time", datetime.now().strftime("%Y.%m.%d.%H:%M"))
+                importance = event.get("importance", 0)
+                if item["type"] == "location":
+                    memory_id, item_records = self._location_memory_records(
+                        sentences[i], embedding, event.get("event_location", ""), event.get("event_type", ""),
+                        event_time, agent_name, importance=importance, pending_ids=pending_ids
+                    )
+                    records.extend(item_records)
+                else:
+                    memory_id, record = self._new_memory_record(
+                        sentences[i], embedding, event_time, agent_name, event.get("event_role", ""), importance
+                    )
+                    records.append(record)
+                memory_ids[i] = memory_id
+
+            self.memory_store.apply(records)
+
+        print(f"💾 이벤트 {len(events)}개 묶음 저장 완료 (에이전트 {len(agent_names)}명, 레코드 {len(records)}개)")
+        return memory_ids
+
+######################## 비동기 메소드 라인 ################################
+    # 이벤트 루프에서 호출하는 경로용. 블로킹 I/O는 저장소 I/O 스레드 풀에서 실행합니다.
+
+    async def load_memories_async(self, sort_by_time: bool = False) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """_load_memories의 비동기 버전"""
+        return await run_io(self._load_memories, sort_by_time)
+
+    async def save_memories_async(self, memories: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]):
+        """_save_memories의 비동기 버전"""
+        await run_io(self._save_memories, memories)
+
+    async def load_reflections_async(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """_load_reflections의 비동기 버전"""
+        return await run_io(self._load_reflections)
+
+    async def save_reflections_async(self, reflections: Dict[str, Dict[str, List[Dict[str, Any]]]]):
+        """_save_reflections의 비동기 버전"""
+        await run_io(self._save_reflections, reflections)
+
+    async def load_plans_async(self) -> Dict[str, Any]:
+        """_load_plans의 비동기 버전"""
+        return await run_io(self._load_plans)
+
+    async def save_plans_async(self, plans: Dict[str, Any]):
+        """_save_plans의 비동기 버전"""
+        await run_io(self._save_plans, plans)
+
+    async def save_memory_async(self, event_sentence: str, embedding: List[float], event_time: str, agent_name: str, event_role: str = "", importance: int = 0) -> str:
+        """save_memory의 비동기 버전"""
+        return await run_io(self.save_memory, event_sentence, embedding, event_time, agent_name, event_role, importance)
+
+    async def save_perception_async(self, event: Dict[str, Any], agent_name: str) -> bool:
+        """save_perception의 비동기 버전"""
+        return await run_io(self.save_perception, event, agent_name)
+
+    async def save_location_data_async(self, event: Dict[str, Any], agent_name: str) -> bool:
+        """save_location_data의 비동기 버전"""
+        return await run_io(self.save_location_data, event, agent_name)
+
+    async def save_events_batch_async(self, events: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """save_events_batch의 비동기 버전"""
+        return await run_io(self.save_events_batch, events)
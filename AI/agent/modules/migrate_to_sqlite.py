@@ -0,0 +1,123 @@
+import argparse
+import glob
+import json
+import os
+
+try:
+    from .storage.backend import sqlite_database_path
+    from .storage.sqlite_store import SQLiteDocumentStore, get_sqlite_database
+    from .storage.sharded_json import load_sharded_json
+    from .storage.memory_store import load_json_memory_data
+    from .storage.embedding_sidecar import MEMORY_EMBEDDING_FIELDS, get_embedding_sidecar
+except ImportError:
+    # 스크립트로 직접 실행하는 경우
+    from storage.backend import sqlite_database_path
+    from storage.sqlite_store import SQLiteDocumentStore, get_sqlite_database
+    from storage.sharded_json import load_sharded_json
+    from storage.memory_store import load_json_memory_data
+    from storage.embedding_sidecar import MEMORY_EMBEDDING_FIELDS, get_embedding_sidecar
+
+
+def _memory_rows(sidecar, agent_name, agent_data):
+    """에이전트 메모리를 (메모리 ID, 메모리, {필드: 벡터}) 행으로 변환 (사이드카 행 참조는 벡터로 읽음)"""
+    rows = []
+    embeddings = agent_data.get("embeddings", {}) or {}
+    for memory_id, memory in (agent_data.get("memories", {}) or {}).items():
+        entry = embeddings.get(memory_id) or {}
+        vectors = {}
+        for slot, field in enumerate(MEMORY_EMBEDDING_FIELDS):
+            if "row" in entry:
+                vectors[field] = sidecar.read(agent_name, entry["row"], slot) if field in entry.get("fields", []) else None
+            else:
+                vectors[field] = entry.get(field) or None
+        rows.append((str(memory_id), memory, vectors))
+    return rows
+
+
+def migrate_to_sqlite(data_dir="../data", db_path=None, force=False):
+    """
+    기존 JSON 데이터(memories, reflections, plans, event_ids.json, conversations/)를
+    SQLite 데이터베이스로 가져옵니다. JSON 파일은 수정하지 않습니다.
+
+    메모리 임베딩은 사이드카 파일에서 읽어 BLOB으로 저장합니다.
+    반성 임베딩은 기존처럼 반성 사이드카(embeddings/reflections/)에 두고 행 번호만 옮깁니다.
+    가져온 뒤 STORAGE_BACKEND=sqlite로 서버를 실행하면 데이터베이스를 사용합니다.
+
+    Args:
+        data_dir (str): 데이터 디렉토리 (기본값: ../data, 이 파일 기준 상대 경로)
+        db_path (str): 데이터베이스 경로 (기본값: <data_dir>/agent_data.sqlite3 또는 STORAGE_SQLITE_PATH)
+        force (bool): 데이터베이스에 이미 데이터가 있어도 덮어쓰기 (같은 에이전트/ID 단위로 교체)
+
+    Returns:
+        dict: 항목별 가져온 개수 (실패하면 None)
+    """
+    try:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        data_dir = os.path.join(script_dir, data_dir)
+        memories_file = os.path.join(data_dir, "memories.json")
+        db_path = db_path or sqlite_database_path(memories_file)
+
+        database = get_sqlite_database(db_path)
+        if not force and database.query("SELECT 1 FROM memory_agents LIMIT 1"):
+            print(f"오류: {db_path}에 이미 메모리가 있습니다. 덮어쓰려면 --force를 사용하세요.")
+            return None
+
+        counts = {"memories": 0, "reflections": 0, "plans": 0, "event_ids": 0, "conversations": 0}
+
+        # 1. 메모리 (에이전트별 스냅샷 + 변경 로그, 아직 나누지 않은 단일 파일 포함)
+        sidecar = get_embedding_sidecar(memories_file, len(MEMORY_EMBEDDING_FIELDS))
+        for agent_name, agent_data in load_json_memory_data(memories_file).items():
+            rows = _memory_rows(sidecar, agent_name, agent_data)
+            database.replace_agent_memories(agent_name, rows)
+            counts["memories"] += len(rows)
+            print(f"📦 {agent_name}: 메모리 {len(rows)}개")
+
+        # 2. 반성 / 계획
+        for kind in ("reflections", "plans"):
+            documents = load_sharded_json(os.path.join(data_dir, f"{kind}.json"))
+            SQLiteDocumentStore(database, kind).save_all(documents)
+            for agent_data in documents.values():
+                items = agent_data.get(kind) if isinstance(agent_data, dict) else None
+                counts[kind] += len(items) if isinstance(items, (list, dict)) else 0
+
+        # 3. 이벤트 ID
+        event_id_file = os.path.join(data_dir, "event_ids.json")
+        if os.path.exists(event_id_file):
+            with open(event_id_file, 'r', encoding='utf-8') as f:
+                event_ids = json.load(f)
+            database.replace_event_ids(event_ids)
+            counts["event_ids"] = sum(len(entries) for entries in event_ids.get("agents", {}).values())
+
+        # 4. 대화
+        for path in sorted(glob.glob(os.path.join(data_dir, "conversations", "*.json"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    conversation = json.load(f)
+                conversation.setdefault("conversation_id", os.path.splitext(os.path.basename(path))[0])
+                database.save_conversation(conversation)
+                counts["conversations"] += 1
+            except Exception as e:
+                print(f"⚠️ 대화 파일을 가져오지 못했습니다 ({path}): {e}")
+
+        print(f"처리 완료: {counts}")
+        print(f"결과가 {db_path}에 저장되었습니다. STORAGE_BACKEND=sqlite로 서버를 실행하세요.")
+        return counts
+
+    except Exception as e:
+        print(f"오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 데이터를 SQLite 데이터베이스로 가져옵니다.")
+    parser.add_argument("--data-dir", default="../data", help="데이터 디렉토리 (이 파일 기준 상대 경로 또는 절대 경로)")
+    parser.add_argument("--db", default=None, help="데이터베이스 경로 (기본값: <data-dir>/agent_data.sqlite3)")
+    parser.add_argument("--force", action="store_true", help="데이터베이스에 이미 데이터가 있어도 덮어쓰기")
+    args = parser.parse_args()
+    migrate_to_sqlite(args.data_dir, args.db, args.force)
+
+
+if __name__ == "__main__":
+    main()
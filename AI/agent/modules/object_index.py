@@ -0,0 +1,141 @@
+"""
+오브젝트 임베딩 행렬 모듈
+
+object_embeddings.json의 오브젝트 임베딩을 서버 시작 시 한 번만 정규화된 float32 행렬로 올려두고,
+오브젝트 이름 -> 행 번호 맵을 함께 유지합니다. 관련 오브젝트 검색은 행렬-벡터 곱 한 번과
+부분 정렬(argpartition)로 처리하며, 현재 보이는 오브젝트만 대상으로 할 때는 해당 행만 계산합니다.
+"""
+
+import json
+from typing import Dict, List, Iterable, Optional, Tuple
+import numpy as np
+
+
+class ObjectEmbeddingIndex:
+    # 유사도를 계산할 수 없는 경우(임베딩이 0)의 기본 유사도
+    DEFAULT_SIMILARITY = 0.01
+
+    def __init__(self, object_embeddings: Optional[Dict[str, Dict[str, List[float]]]] = None, field: str = "name_only"):
+        """
+        오브젝트 임베딩 행렬 구성
+
+        Args:
+            object_embeddings: {오브젝트 이름: {"name_only": [...], "name_and_info": [...]}}
+            field: 행렬로 올릴 임베딩 종류
+        """
+        self.field = field
+        self.dim = None
+        self.names: List[str] = []         # 행 번호 -> 오브젝트 이름
+        self.rows: Dict[str, int] = {}     # 오브젝트 이름 -> 행 번호
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+        vectors = []
+        for name, data in (object_embeddings or {}).items():
+            try:
+                vector = np.asarray((data or {}).get(field, []), dtype=np.float32).ravel()
+            except (TypeError, ValueError, AttributeError):
+                continue
+            norm = float(np.linalg.norm(vector)) if vector.size else 0.0
+            # 임베딩이 없거나 0인 오브젝트는 건너뛰기
+            if norm == 0.0 or not np.isfinite(norm):
+                continue
+            # 차원은 첫 번째 유효한 오브젝트 기준 (다른 차원은 건너뛰기)
+            if self.dim is None:
+                self.dim = vector.size
+            elif vector.size != self.dim:
+                continue
+            self.rows[name] = len(self.names)
+            self.names.append(name)
+            vectors.append(vector / norm)
+
+        if vectors:
+            self.matrix = np.vstack(vectors).astype(np.float32, copy=False)
+
+    @classmethod
+    def load(cls, file_path: str, field: str = "name_only") -> "ObjectEmbeddingIndex":
+        """
+        object_embeddings.json 파일에서 행렬 구성
+
+        Args:
+            file_path: 오브젝트 임베딩 JSON 파일 경로
+            field: 행렬로 올릴 임베딩 종류
+
+        Returns:
+            ObjectEmbeddingIndex: 오브젝트 임베딩 행렬
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), field)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.rows
+
+    def rows_for(self, names: Iterable[str]) -> np.ndarray:
+        """오브젝트 이름들의 행 번호 (행렬에 없는 이름은 제외, 중복 제거, 입력 순서 유지)"""
+        rows = []
+        seen = set()
+        for name in names:
+            row = self.rows.get(name) if isinstance(name, str) else None
+            if row is not None and row not in seen:
+                seen.add(row)
+                rows.append(row)
+        return np.asarray(rows, dtype=np.int64)
+
+    def _similarities(self, embedding: List[float], rows: Optional[np.ndarray]) -> np.ndarray:
+        """질의 임베딩과 각 행의 코사인 유사도 (질의가 0이거나 차원이 다르면 기본 유사도)"""
+        count = len(self.names) if rows is None else len(rows)
+        query = np.asarray(embedding if embedding is not None else [], dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(query)) if query.size else 0.0
+        if norm == 0.0 or query.size != self.dim:
+            return np.full(count, self.DEFAULT_SIMILARITY, dtype=np.float64)
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        return matrix @ (query / norm)
+
+    def top_objects(
+        self,
+        event_embedding: List[float],
+        state_embedding: List[float],
+        top_k: int = 10,
+        similarity_threshold: float = 0.01,
+        names: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        이벤트/상태 임베딩과 관련된 상위 k개의 오브젝트
+
+        두 유사도 중 큰 값으로 순위를 매기고, 큰 값이 임계값 이상인 오브젝트만 반환합니다.
+        같은 유사도는 행 순서(object_embeddings.json 순서)를 따릅니다.
+
+        Args:
+            event_embedding: 이벤트 임베딩
+            state_embedding: 상태 임베딩
+            top_k: 반환할 오브젝트 개수
+            similarity_threshold: 유사도 임계값
+            names: 후보 오브젝트 이름 (None이면 전체 오브젝트)
+
+        Returns:
+            List[Tuple[str, float]]: (오브젝트 이름, 이벤트 유사도) 튜플 리스트
+        """
+        if top_k <= 0 or not self.names:
+            return []
+        rows = None if names is None else self.rows_for(names)
+        if rows is not None and len(rows) == 0:
+            return []
+
+        event_similarity = self._similarities(event_embedding, rows)
+        state_similarity = self._similarities(state_embedding, rows)
+        max_similarity = np.maximum(event_similarity, state_similarity)
+
+        candidates = np.flatnonzero(max_similarity >= similarity_threshold)
+        if len(candidates) > top_k:
+            # 부분 정렬로 k번째 유사도만 구하고, 그보다 큰 항목 + 같은 값 중 앞선 행으로 k개 선택
+            values = max_similarity[candidates]
+            kth = np.partition(values, len(values) - top_k)[len(values) - top_k]
+            above = candidates[values > kth]
+            tied = candidates[values == kth][:top_k - len(above)]
+            candidates = np.sort(np.concatenate([above, tied]))
+        order = candidates[np.argsort(-max_similarity[candidates], kind="stable")]
+
+        row_numbers = np.arange(len(self.names)) if rows is None else rows
+        return [(self.names[row_numbers[i]], float(event_similarity[i])) for i in order]
@@ -1,70 +1,91 @@
-import urllib.request
 import json
-import time
+import os
 import asyncio
 from typing import Dict, Any, Optional
-from queue import Queue
-import threading
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import aiohttp
+
+from .llm_scheduler import PriorityScheduler, PRIORITY_CONVERSATION
+from .stream_parser import create_stop_detector
 
 class OllamaClient:
-    def __init__(self, api_url: str = "http://localhost:11434/api/generate"):
+    # 동시에 올라마로 보낼 최대 요청 수 (올라마 서버의 OLLAMA_NUM_PARALLEL과 맞춤)
+    DEFAULT_MAX_CONCURRENCY = 4
+    # 요청 타임아웃 (초)
+    REQUEST_TIMEOUT = 120
+    # 재시도 설정 (최대 3번, 재시도 간격 0.5초부터 두 배씩 증가)
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+    def __init__(self, api_url: str = "http://localhost:11434/api/generate", max_concurrency: int = None, starvation_timeout: float = None):
+        """
+        올라마 클라이언트 초기화
+
+        Args:
+            api_url: 올라마 generate API 주소
+            max_concurrency: 최대 동시 요청 수 (기본값: 환경 변수 OLLAMA_NUM_PARALLEL 또는 4)
+            starvation_timeout: 낮은 우선순위 요청의 기아 방지 대기 시간 (초)
+        """
         self.api_url = api_url
-        self.request_queue = Queue()
-        self.processing = False
-        self.lock = threading.Lock()
-        
-        # 세션 설정
-        self.session = requests.Session()
-        
-        # 재시도 전략 설정
-        retry_strategy = Retry(
-            total=3,  # 최대 3번 재시도
-            backoff_factor=0.5,  # 재시도 간격
-            status_forcelist=[500, 502, 503, 504]  # 재시도할 HTTP 상태 코드
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get("OLLAMA_NUM_PARALLEL", self.DEFAULT_MAX_CONCURRENCY))
+        self.max_concurrency = max(1, max_concurrency)
+        self.starvation_timeout = starvation_timeout
+
+        # 세션과 스케줄러는 이벤트 루프에 묶이므로 사용하는 루프에서 처음 요청할 때 생성
+        self.session = None
+        self.scheduler = None
+        self._loop = None
+
+        # 현재 처리 중인 요청 수
+        self.active_requests = 0
+
+    @property
+    def processing(self) -> bool:
+        """처리 중인 요청이 있는지 여부"""
+        return self.active_requests > 0
+
+    def _ensure_session(self):
+        """현재 이벤트 루프용 HTTP 세션과 우선순위 스케줄러를 준비합니다."""
+        loop = asyncio.get_running_loop()
+        if self.session is not None and self._loop is loop and not self.session.closed:
+            return
+
+        # 다른 이벤트 루프에서 만든 세션은 재사용할 수 없으므로 정리한 뒤 새로 생성
+        self._discard_session()
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
         )
-        
-        # 어댑터 설정
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=10)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        self._start_processing_thread()
-
-    def _start_processing_thread(self):
-        """백그라운드에서 큐를 처리하는 스레드를 시작합니다."""
-        self.processing_thread = threading.Thread(target=self._process_queue, daemon=True)
-        self.processing_thread.start()
-
-    def _process_queue(self):
-        """큐에서 요청을 가져와 처리하는 메서드"""
-        while True:
-            if not self.request_queue.empty():
-                with self.lock:
-                    self.processing = True
-                    task = self.request_queue.get()
-                    
-                    try:
-                        response = self._send_request(
-                            task['prompt'],
-                            task['system_prompt'],
-                            task['model_name'],
-                            task.get('options', {})
-                        )
-                        if task['future']:
-                            task['future'].set_result(response)
-                    except Exception as e:
-                        if task['future']:
-                            task['future'].set_exception(e)
-                    
-                    self.request_queue.task_done()
-                    self.processing = False
-            time.sleep(0.1)
-
-    def _send_request(self, prompt: str, system_prompt: str, model_name: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
-        """올라마 API에 실제 요청을 보내는 메서드"""
+        self.scheduler = PriorityScheduler(self.max_concurrency, self.starvation_timeout)
+        self._loop = loop
+
+    def _discard_session(self):
+        """
+        이전 이벤트 루프의 세션과 스케줄러 정리
+
+        - 세션: 이전 루프가 아직 실행 중이면 그 루프에서 닫고, 이미 멈췄거나 닫혔으면 커넥터만 분리
+        - 스케줄러: 이전 스케줄러에서 슬롯을 기다리던 요청은 더 이상 깨어날 수 없으므로 실패 처리
+        """
+        old_session, old_scheduler, old_loop = self.session, self.scheduler, self._loop
+        self.session = None
+        self.scheduler = None
+        self._loop = None
+
+        if old_scheduler is not None:
+            old_scheduler.fail_waiters(aiohttp.ClientConnectionError("이벤트 루프가 바뀌어 요청이 취소되었습니다."))
+
+        if old_session is None or old_session.closed:
+            return
+        if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(old_session.close(), old_loop)
+        else:
+            # 닫힌 루프에서는 커넥터를 닫을 수 없으므로 세션에서 분리만 하여 경고 없이 버림
+            old_session.detach()
+
+    async def _send_request(self, prompt: str, system_prompt: str, model_name: str, options: Dict[str, Any] = None, stop_on: str = None) -> Dict[str, Any]:
+        """올라마 API에 실제 요청을 보내는 메서드 (stop_on이 있으면 스트리밍으로 받다가 결과가 완성되면 중단)"""
         try:
             # 기본 옵션 설정
             default_options = {
@@ -82,32 +103,47 @@ class OllamaClient:
                 "model": model_name,
                 "prompt": prompt,
                 "system": system_prompt,
-                "stream": False,
+                "stream": stop_on is not None,
                 "options": default_options
             }
 
-            # 세션을 사용하여 요청 전송
-            response = self.session.post(
-                self.api_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=120  # 120초 타임아웃 설정
-            )
-            
-            # 응답 확인
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "response": result.get("response", ""),
-                "status": "success"
-            }
-            
-        except requests.exceptions.RequestException as e:
+            self._ensure_session()
+
+            for attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    async with self.session.post(
+                        self.api_url,
+                        json=payload,
+                        headers={'Content-Type': 'application/json'}
+                    ) as response:
+                        # 서버 오류는 재시도
+                        if response.status in self.RETRY_STATUS_CODES and attempt < self.MAX_RETRIES:
+                            await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+                            continue
+
+                        # 응답 확인
+                        response.raise_for_status()
+
+                        if stop_on is not None:
+                            return await self._read_stream(response, stop_on)
+
+                        result = json.loads(await response.text())
+
+                        return {
+                            "response": result.get("response", ""),
+                            "status": "success"
+                        }
+                except aiohttp.ClientConnectionError:
+                    # 연결 오류도 재시도
+                    if attempt >= self.MAX_RETRIES:
+                        raise
+                    await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return {
                 "response": "",
                 "status": "error",
-                "error": str(e)
+                "error": str(e) or type(e).__name__
             }
         except Exception as e:
             return {
@@ -116,17 +152,61 @@ class OllamaClient:
                 "error": str(e)
             }
 
+    async def _read_stream(self, response: aiohttp.ClientResponse, stop_on: str) -> Dict[str, Any]:
+        """
+        NDJSON 스트리밍 응답을 읽다가 필요한 결과가 완성되면 연결을 끊어 생성을 중단합니다.
+
+        Args:
+            response: 올라마 스트리밍 응답
+            stop_on: "json" (최상위 JSON 객체) 또는 "integer" (첫 번째 정수)
+
+        Returns:
+            Dict[str, Any]: API 응답 (early_stop: 결과 완성으로 생성을 중단했는지 여부)
+        """
+        detector = create_stop_detector(stop_on)
+        text = ""
+        early_stop = False
+
+        async for line in response.content:
+            line = line.strip()
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise aiohttp.ClientPayloadError(chunk["error"])
+
+            token = chunk.get("response", "")
+            text += token
+            if detector is not None and detector.feed(token):
+                early_stop = True
+                break
+            if chunk.get("done"):
+                break
+
+        if early_stop:
+            # 연결을 닫으면 올라마도 남은 토큰 생성을 멈춤
+            response.close()
+            text = detector.result()
+
+        return {
+            "response": text,
+            "status": "success",
+            "early_stop": early_stop
+        }
+
     async def process_prompt(
         self,
         prompt: str,
         system_prompt: str = None,
         model_name: str = None,
         temperature: float = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        priority: str = PRIORITY_CONVERSATION,
+        stop_on: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         프롬프트를 처리하고 결과를 반환합니다.
-        
+
         Args:
             prompt (str): 처리할 프롬프트
             system_prompt (str, optional): 시스템 프롬프트. options에서도 지정 가능
@@ -139,23 +219,24 @@ class OllamaClient:
                 - top_p (float): 토큰 선택 확률 임계값 (0.0 ~ 1.0)
                 - frequency_penalty (float): 반복 패널티
                 - presence_penalty (float): 존재 패널티
-            
+            priority (str, optional): 우선순위 클래스 (interactive / conversation / background)
+            stop_on (str, optional): 스트리밍으로 받다가 결과가 완성되면 생성을 중단
+                - "json": 최상위 JSON 객체 하나가 완성되면 중단
+                - "integer": 첫 번째 정수가 완성되면 중단
+
         Returns:
             Dict[str, Any]: API 응답
         """
-        loop = asyncio.get_running_loop()
-        future = loop.create_future()
-        
         # 옵션에서 system_prompt, model_name, temperature 추출
         if options:
             system_prompt = options.pop('system_prompt', system_prompt)
             model_name = options.pop('model', model_name)
             temperature = options.pop('temperature', temperature)
-        
+
         # 필수 값 확인
         if not model_name:
             raise ValueError("model_name must be provided either directly or in options")
-        
+
         # 기본 옵션 설정
         default_options = {
             "temperature": temperature if temperature is not None else 0.7,
@@ -167,45 +248,55 @@ class OllamaClient:
         # 사용자 옵션과 기본 옵션 병합
         if options:
             default_options.update(options)
-        
-        task = {
-            'prompt': prompt,
-            'system_prompt': system_prompt,
-            'model_name': model_name,
-            'options': default_options,
-            'future': future
-        }
-        
-        self.request_queue.put(task)
-        return await future
 
-    def __del__(self):
-        """소멸자: 세션 정리"""
-        if hasattr(self, 'session'):
-            self.session.close()
+        self._ensure_session()
+
+        # 최대 동시 요청 수를 넘으면 우선순위 순서대로 슬롯이 배정될 때까지 대기
+        scheduler = self.scheduler
+        await scheduler.acquire(priority)
+        self.active_requests += 1
+        try:
+            return await self._send_request(prompt, system_prompt, model_name, default_options, stop_on)
+        finally:
+            self.active_requests -= 1
+            scheduler.release()
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        우선순위 클래스별 대기열 길이와 대기 시간 통계
+
+        Returns:
+            Dict[str, Any]: 스케줄러 통계 (아직 요청이 없었으면 빈 통계)
+        """
+        if self.scheduler is None:
+            return {"active": 0, "max_concurrency": self.max_concurrency, "classes": {}}
+        return self.scheduler.get_stats()
+
+    async def close(self):
+        """HTTP 세션 정리"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
 
 # 사용 예시:
 """
-client = OllamaClient()
-
-async def handle_response(response):
-    print("응답:", response)
-
-async def handle_error(error):
-    print("에러:", error)
-
-# 프롬프트 처리 요청
-await client.process_prompt(
-    prompt="What is the weather like?",
-    system_prompt="You are a helpful assistant.",
-    model_name="gemma3",
-    options={
-        "temperature": 0.7,
-        "top_p": 0.9,
-        "frequency_penalty": 0.1,
-        "presence_penalty": 0.1
-    },
-    callback=handle_response,
-    error_callback=handle_error
+client = OllamaClient(max_concurrency=4)
+
+# 프롬프트 처리 요청 (여러 에이전트의 요청을 동시에 처리)
+responses = await asyncio.gather(
+    client.process_prompt(
+        prompt="What is the weather like?",
+        system_prompt="You are a helpful assistant.",
+        model_name="gemma3",
+        options={
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "frequency_penalty": 0.1,
+            "presence_penalty": 0.1
+        }
+    ),
+    client.process_prompt(prompt="Hello", model_name="gemma3", priority="interactive")
 )
-""" 
\ No newline at end of file
+
+await client.close()
+"""
@@ -11,6 +11,9 @@ import logging
 import re
 from typing import Dict, List, Any
 from ..ollama_client import OllamaClient
+from ..storage import run_io
+from ..storage.backend import get_agent_store
+from ..prompt_registry import get_prompt_registry
 import datetime
 
 # 로깅 설정
@@ -37,13 +40,25 @@ class PlanGenerator:
         # 파일 경로 설정
         self.plan_file_path = os.path.join(root_dir, "agent", "data", "plans.json")
         self.reflection_file_path = os.path.join(root_dir, "agent", "data", "reflections.json")
+        # 계획/반성 데이터는 에이전트별 파일(plans/, reflections/)에 저장
+        self.plan_store = get_agent_store(self.plan_file_path, {})
+        self.reflection_store = get_agent_store(self.reflection_file_path, {"reflections": []})
         self.ollama_client = ollama_client
         
-        # 프롬프트 파일 경로 설정
-        self.prompt_dir = os.path.join(root_dir, "agent", "prompts", "plan")
-        self.prompt_path = os.path.join(self.prompt_dir, "plan_prompt.txt")
-        self.system_path = os.path.join(self.prompt_dir, "plan_system.txt")
-        self.timeslot_prompt_path = os.path.join(self.prompt_dir, "plan_timeslot_prompt.txt")
+        # 프롬프트 템플릿 (시작 시 한 번 읽고 파일이 바뀌었을 때만 다시 로드)
+        self.prompts = get_prompt_registry()
+        self.prompts.register(
+            "plan/plan_prompt",
+            default="",
+            placeholders=("AGENT_NAME", "DATE", "PLAN_DATE", "REFLECTIONS", "PREVIOUS_PLANS"),
+            strip=True
+        )
+        self.prompts.register(
+            "plan/plan_system",
+            default="You are a helpful AI assistant that creates daily plans in JSON format.",
+            strip=True
+        )
+        self.prompts.register("plan/plan_timeslot_prompt", placeholders=("PLAN_JSON",), strip=True)
         
         # 폴더 생성
         os.makedirs(os.path.dirname(self.plan_file_path), exist_ok=True)
@@ -51,26 +66,16 @@ class PlanGenerator:
         logger.info(f"계획 생성기 초기화 (계획 파일: {self.plan_file_path}, 반성 파일: {self.reflection_file_path})")
     
     def load_plans(self) -> Dict:
-        """계획 JSON 파일 로드"""
-        try:
-            with open(self.plan_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"계획 파일 로드 완료: {self.plan_file_path}")
-            return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"계획 파일 로드 오류 (새 파일 생성 예정): {e}")
-            return {}
+        """모든 에이전트의 계획 데이터 로드"""
+        data = self.plan_store.load_all()
+        logger.info(f"계획 파일 로드 완료: {self.plan_store.location}")
+        return data
     
     def load_reflections(self) -> Dict:
-        """반성 JSON 파일 로드"""
-        try:
-            with open(self.reflection_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"반성 파일 로드 완료: {self.reflection_file_path}")
-            return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"반성 파일 로드 오류: {e}")
-            return {}
+        """모든 에이전트의 반성 데이터 로드"""
+        data = self.reflection_store.load_all()
+        logger.info(f"반성 파일 로드 완료: {self.reflection_store.location}")
+        return data
     
     # def save_plans(self, agent_name: str, date: str, plans: Dict) -> bool:
     #     """계획을 파일에 저장"""
@@ -101,34 +106,30 @@ class PlanGenerator:
     #         logger.error(f"계획 저장 오류: {e}")
     #         return False
     
-    # 새로운 계획 데이터 병합
+    # 새로운 계획 데이터 병합 (에이전트별 파일만 읽고 다시 씀)
     def save_plans(self, new_plan_data: Dict) -> bool:
         try:
-            existing_data = self.load_plans()
-
             for agent_name, agent_data in new_plan_data.items():
-                if agent_name not in existing_data:
-                    existing_data[agent_name] = {"plans": {}}
-                if "plans" not in existing_data[agent_name]:
-                    existing_data[agent_name]["plans"] = {}
-
                 new_plans = agent_data.get("plans", {})
 
-                for date_key, plan_value in new_plans.items():
-                    # 💡 중첩된 plan이 있는 경우 (e.g. plan_value = {"Tom": {"plans": {...}}})
-                    if isinstance(plan_value, dict) and any(
-                        isinstance(v, dict) and "plans" in v for v in plan_value.values()
-                    ):
-                        for inner_agent_key, inner_data in plan_value.items():
-                            if isinstance(inner_data, dict) and "plans" in inner_data:
-                                for nested_date, nested_plan in inner_data["plans"].items():
-                                    existing_data[agent_name]["plans"][nested_date] = nested_plan
-                    else:
-                        # 정상적인 계획이면 그대로 저장
-                        existing_data[agent_name]["plans"][date_key] = plan_value
+                def merge_plans(existing_agent_data: Dict, new_plans=new_plans):
+                    if "plans" not in existing_agent_data:
+                        existing_agent_data["plans"] = {}
 
-            with open(self.plan_file_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+                    for date_key, plan_value in new_plans.items():
+                        # 💡 중첩된 plan이 있는 경우 (e.g. plan_value = {"Tom": {"plans": {...}}})
+                        if isinstance(plan_value, dict) and any(
+                            isinstance(v, dict) and "plans" in v for v in plan_value.values()
+                        ):
+                            for inner_agent_key, inner_data in plan_value.items():
+                                if isinstance(inner_data, dict) and "plans" in inner_data:
+                                    for nested_date, nested_plan in inner_data["plans"].items():
+                                        existing_agent_data["plans"][nested_date] = nested_plan
+                        else:
+                            # 정상적인 계획이면 그대로 저장
+                            existing_agent_data["plans"][date_key] = plan_value
+
+                self.plan_store.update_agent(agent_name, merge_plans)
 
             logger.info("✅ 계획 병합 저장 완료")
             return True
@@ -138,29 +139,9 @@ class PlanGenerator:
             return False
 
 
-    def _load_prompt_template(self) -> str:
-        """프롬프트 템플릿 로드"""
-        try:
-            with open(self.prompt_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error(f"프롬프트 템플릿 로드 실패: {e}")
-            return ""
-    
-    def _load_system_prompt(self) -> str:
-        """시스템 프롬프트 로드"""
-        try:
-            with open(self.system_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error(f"시스템 프롬프트 로드 실패: {e}")
-            return "You are a helpful AI assistant that creates daily plans in JSON format."
-    
     def _create_plan_prompt(self, agent_name: str, plan_date: str, reflection_date: str,
                         reflections: List[Dict], previous_plans: Dict) -> str:
 
-        template = self._load_prompt_template()
-        
         # 반성 데이터 포맷팅
         reflections_text = ""
         for r in reflections:
@@ -172,7 +153,8 @@ class PlanGenerator:
             previous_plans_text = json.dumps(previous_plans, ensure_ascii=False)
         
         # 프롬프트 생성
-        prompt = template.format(
+        prompt = self.prompts.render(
+            "plan/plan_prompt",
             AGENT_NAME=agent_name,
             DATE=reflection_date,      # 🟡 반성 기준 날짜
             PLAN_DATE=plan_date,       # 🟡 계획 생성 대상 날짜
@@ -213,7 +195,7 @@ class PlanGenerator:
             logger.info(f"다음 날짜: {next_date}")
             
             # 반성 데이터 로드
-            reflection_data = self.load_reflections()
+            reflection_data = await run_io(self.load_reflections)
             if not reflection_data or agent_name not in reflection_data:
                 logger.warning(f"{agent_name}의 반성 데이터가 없습니다.")
                 return {}
@@ -229,27 +211,22 @@ class PlanGenerator:
             # 중요도 순으로 정렬
             today_reflections.sort(key=lambda x: x.get("importance", 0), reverse=True)
             
-            # 이전 계획 로드
-            plan_data = self.load_plans()
-            previous_plans = {}
-            if agent_name in plan_data and "plans" in plan_data[agent_name]:
-                # 가장 최근 계획 찾기
-                dates = sorted(plan_data[agent_name]["plans"].keys())
-                if dates:
-                    previous_plans = plan_data[agent_name]["plans"][dates[-1]]
+            # 이전 계획 로드 (가장 최근 날짜의 계획만 조회)
+            previous_plans = await run_io(self.plan_store.latest_plan, agent_name) or {}
             
             # 프롬프트 생성
             prompt = self._create_plan_prompt(agent_name, next_date, current_date_str, today_reflections, previous_plans)
             logger.info(f"생성된 프롬프트:\n{prompt}")
             
-            # 시스템 프롬프트 로드
-            system_prompt = self._load_system_prompt()
+            # 시스템 프롬프트
+            system_prompt = self.prompts.get("plan/plan_system")
             
             # Ollama API 호출
             response = await self.ollama_client.process_prompt(
                 prompt=prompt,
                 system_prompt=system_prompt,
-                model_name="gemma3"
+                model_name="gemma3",
+                priority="background"
             )
             
             if response.get("status") != "success":
@@ -287,7 +264,7 @@ class PlanGenerator:
                 logger.info(f"생성된 계획: {plans}")
                 
                 # 계획 저장 (다음 날짜로 저장)
-                if self.save_plans(plans):
+                if await run_io(self.save_plans, plans):
                     return plans
                 return {}
                 
@@ -315,19 +292,16 @@ class PlanGenerator:
                 logger.error("계획 JSON이 제공되지 않았습니다.")
                 return {}
 
-            # 프롬프트 템플릿 로드
+            # 프롬프트 생성
             try:
-                with open(self.timeslot_prompt_path, 'r', encoding='utf-8') as f:
-                    prompt_template = f.read().strip()
-            except Exception as e:
+                prompt = self.prompts.render(
+                    "plan/plan_timeslot_prompt",
+                    PLAN_JSON=json.dumps(plan_json, ensure_ascii=False, indent=2)
+                )
+            except KeyError as e:
                 logger.error(f"타임슬롯 프롬프트 템플릿 로드 실패: {e}")
                 return {}
 
-            # 프롬프트 생성
-            prompt = prompt_template.format(
-                PLAN_JSON=json.dumps(plan_json, ensure_ascii=False, indent=2)
-            )
-
             # 시스템 프롬프트
             system_prompt = "You are a helpful AI assistant that converts daily plans into Unity-compatible format."
 
@@ -335,7 +309,8 @@ class PlanGenerator:
             response = await self.ollama_client.process_prompt(
                 prompt=prompt,
                 system_prompt=system_prompt,
-                model_name="gemma3"
+                model_name="gemma3",
+                priority="background"
             )
 
             if response.get("status") != "success":
@@ -5,7 +5,7 @@
 """
 
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Callable, Optional
 from .plan_generator import PlanGenerator
 
 # validate_unity_plan.py
@@ -74,13 +74,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger("PlanPipeline")
 
-async def process_plan_request(request_data: Dict[str, Any], ollama_client) -> Tuple[bool, Dict]:
+# 요청마다 새로 만들지 않도록 Ollama 클라이언트별로 계획 생성기 하나를 공유
+_plan_generators = {}
+
+
+def get_plan_generator(ollama_client) -> PlanGenerator:
+    """
+    Ollama 클라이언트별 공유 계획 생성기 반환
+    
+    Args:
+        ollama_client: Ollama API 클라이언트 인스턴스
+    
+    Returns:
+        PlanGenerator: 계획 생성기
+    """
+    plan_generator = _plan_generators.get(id(ollama_client))
+    if plan_generator is None or plan_generator.ollama_client is not ollama_client:
+        plan_generator = PlanGenerator(
+            plan_file_path="agent/data/plans.json",
+            reflection_file_path="agent/data/reflections.json",
+            ollama_client=ollama_client
+        )
+        _plan_generators[id(ollama_client)] = plan_generator
+    return plan_generator
+
+async def process_plan_request(request_data: Dict[str, Any], ollama_client,
+                               progress: Optional[Callable[[str], None]] = None) -> Tuple[bool, Dict]:
     """
     계획 생성 요청 처리
     
     Args:
         request_data: 요청 데이터
         ollama_client: Ollama API 클라이언트 인스턴스
+        progress: 단계가 바뀔 때 단계 이름("plan", "unity_plan", "plan_retry")으로 호출할 함수 (선택적)
     
     Returns:
         Tuple[bool, Dict]: (성공 여부, Unity용 계획 객체)
@@ -104,14 +130,12 @@ async def process_plan_request(request_data: Dict[str, Any], ollama_client) -> T
             logger.error("날짜 정보 누락")
             return False, {}
         
-        # 계획 생성기 초기화
-        plan_generator = PlanGenerator(
-            plan_file_path="agent/data/plans.json",
-            reflection_file_path="agent/data/reflections.json",
-            ollama_client=ollama_client
-        )
+        # 공유 계획 생성기 사용
+        plan_generator = get_plan_generator(ollama_client)
         
         # 1단계: 계획 JSON 생성
+        if progress:
+            progress("plan")
         plans = await plan_generator.generate_plans(agent_name, date)
         
         if not plans:
@@ -121,6 +145,8 @@ async def process_plan_request(request_data: Dict[str, Any], ollama_client) -> T
         logger.info(f"1단계 계획 생성 성공: {plans}")
         
         # 2단계: Unity용 계획 객체 생성
+        if progress:
+            progress("unity_plan")
         unity_plan = await plan_generator.generate_unity_plan(plans)
         
         # 3단계 : 유효성 검사 (맵과 오브젝트, 액션 까지 모두 유효한지 검사) 
@@ -132,6 +158,8 @@ async def process_plan_request(request_data: Dict[str, Any], ollama_client) -> T
             logger.warning(f"유효성 검사 실패: {message} → 1회 재시도 시도 중...")
 
             # 재시도: 1단계, 2단계 다시 실행
+            if progress:
+                progress("plan_retry")
             retry_plans = await plan_generator.generate_plans(agent_name, date)
             retry_unity_plan = await plan_generator.generate_unity_plan(retry_plans)
 
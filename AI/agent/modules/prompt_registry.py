@@ -0,0 +1,240 @@
+"""
+프롬프트 템플릿 레지스트리 모듈
+
+요청마다 프롬프트 파일을 디스크에서 다시 읽지 않도록 agent/prompts/** 템플릿을 시작 시 한 번 읽어 보관합니다.
+- 이름: prompts 디렉토리 기준 상대 경로에서 .txt를 뺀 값 (예: "reaction/reaction_prompt")
+- 로드 시 {플레이스홀더}를 미리 파싱하고, register로 등록한 사용처의 플레이스홀더와 맞는지 검증
+  (형식 오류나 모르는 플레이스홀더가 있으면 기존 버전 또는 기본 템플릿을 계속 사용)
+- 파일 수정 시각(mtime)이 바뀌면 다음 조회 때 다시 읽음 (RELOAD_CHECK_INTERVAL초마다 한 번만 확인)
+- 요청 경로에서는 문자열 포맷팅만 수행
+"""
+
+import string
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, FrozenSet
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+
+def parse_placeholders(text: str) -> FrozenSet[str]:
+    """
+    템플릿의 {플레이스홀더} 이름 집합 ({{ }}로 이스케이프된 중괄호는 제외)
+
+    Raises:
+        ValueError: 중괄호 짝이 맞지 않는 등 str.format으로 쓸 수 없는 템플릿
+    """
+    fields = set()
+    for _, field_name, _, _ in string.Formatter().parse(text):
+        if field_name is None:
+            continue
+        if not field_name or not field_name.isidentifier():
+            raise ValueError(f"사용할 수 없는 플레이스홀더: {{{field_name}}}")
+        fields.add(field_name)
+    return frozenset(fields)
+
+
+class PromptRegistry:
+    # 파일 변경(mtime)을 확인하는 최소 간격 (초)
+    RELOAD_CHECK_INTERVAL = 2.0
+
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR, reload_check_interval: float = None):
+        """
+        프롬프트 레지스트리 초기화 (모든 템플릿을 바로 로드)
+
+        Args:
+            prompts_dir: 프롬프트 루트 디렉토리
+            reload_check_interval: 파일 변경 확인 간격 (초, 0이면 조회마다 확인)
+        """
+        self.prompts_dir = Path(prompts_dir)
+        self.reload_check_interval = (
+            self.RELOAD_CHECK_INTERVAL if reload_check_interval is None else reload_check_interval
+        )
+        # 이름 -> {"path", "text", "placeholders", "mtime", "default", "expected", "strip", "checked_at"}
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.load_all()
+
+    def _name(self, path: Path) -> str:
+        return path.relative_to(self.prompts_dir).with_suffix("").as_posix()
+
+    def load_all(self):
+        """prompts 디렉토리의 모든 .txt 템플릿 로드"""
+        if not self.prompts_dir.exists():
+            print(f"⚠️ 프롬프트 디렉토리가 없습니다: {self.prompts_dir}")
+            return
+        with self._lock:
+            for path in sorted(self.prompts_dir.rglob("*.txt")):
+                entry = self._templates.setdefault(self._name(path), self._new_entry(path))
+                self._load(entry)
+        print(f"📄 프롬프트 템플릿 {len(self._templates)}개 로드 완료 ({self.prompts_dir})")
+
+    @staticmethod
+    def _new_entry(path: Path) -> Dict[str, Any]:
+        return {
+            "path": path,
+            "text": None,
+            "placeholders": None,
+            "mtime": None,
+            "default": None,
+            "expected": None,
+            "strip": False,
+            "checked_at": 0.0
+        }
+
+    def register(
+        self,
+        name: str,
+        default: Optional[str] = None,
+        placeholders: Optional[Iterable[str]] = None,
+        strip: bool = False
+    ):
+        """
+        사용처의 기본 템플릿과 포맷팅에 넘길 플레이스홀더 등록 (파일 내용도 다시 검증)
+
+        Args:
+            name: 템플릿 이름 (예: "reaction/reaction_prompt")
+            default: 파일이 없거나 검증에 실패했을 때 사용할 템플릿
+            placeholders: render에 넘길 값 이름들 (None이면 포맷팅 없이 그대로 쓰는 시스템 프롬프트)
+            strip: 앞뒤 공백 제거 여부
+        """
+        with self._lock:
+            entry = self._templates.get(name)
+            if entry is None:
+                entry = self._new_entry(self.prompts_dir / f"{name}.txt")
+                self._templates[name] = entry
+            entry["default"] = default
+            entry["expected"] = frozenset(placeholders) if placeholders is not None else None
+            entry["strip"] = strip
+            entry["text"] = None
+            entry["mtime"] = None
+            self._load(entry)
+
+    def _load(self, entry: Dict[str, Any]):
+        """파일을 읽어 검증 (실패하면 기존 버전 유지, 없으면 기본 템플릿 사용)"""
+        path = entry["path"]
+        try:
+            mtime = path.stat().st_mtime
+            text = path.read_text(encoding="utf-8")
+        except OSError as e:
+            if entry["text"] is None and entry["default"] is not None:
+                print(f"⚠️ 프롬프트 파일 로드 실패 ({path}): {e}, 기본 템플릿 사용")
+                self._use(entry, entry["default"], None)
+            return
+
+        if entry["strip"]:
+            text = text.strip()
+        error = self._validate(text, entry["expected"])
+        if error:
+            print(f"⚠️ 프롬프트 템플릿 검증 실패 ({path}): {error}")
+            # 다음 확인 때 같은 파일을 다시 검증하지 않도록 mtime은 기록
+            entry["mtime"] = mtime
+            if entry["text"] is None and entry["default"] is not None:
+                print("   기본 템플릿 사용")
+                self._use(entry, entry["default"], mtime)
+            elif entry["text"] is not None:
+                print("   이전 템플릿 계속 사용")
+            return
+        self._use(entry, text, mtime)
+
+    @staticmethod
+    def _validate(text: str, expected: Optional[FrozenSet[str]]) -> Optional[str]:
+        """포맷팅할 템플릿이면 플레이스홀더 검증 (문제가 없으면 None)"""
+        if expected is None:
+            return None
+        try:
+            found = parse_placeholders(text)
+        except ValueError as e:
+            return str(e)
+        unknown = found - expected
+        if unknown:
+            return f"알 수 없는 플레이스홀더 {sorted(unknown)} (사용 가능: {sorted(expected)})"
+        return None
+
+    @staticmethod
+    def _use(entry: Dict[str, Any], text: str, mtime: Optional[float]):
+        entry["text"] = text
+        entry["mtime"] = mtime
+        try:
+            entry["placeholders"] = parse_placeholders(text)
+        except ValueError:
+            # 시스템 프롬프트처럼 포맷팅하지 않는 텍스트
+            entry["placeholders"] = None
+
+    def _refresh(self, entry: Dict[str, Any]):
+        """확인 간격이 지났으면 mtime을 보고 변경된 파일만 다시 로드"""
+        now = time.monotonic()
+        if now - entry["checked_at"] < self.reload_check_interval:
+            return
+        entry["checked_at"] = now
+        try:
+            mtime = entry["path"].stat().st_mtime
+        except OSError:
+            return
+        if mtime != entry["mtime"]:
+            print(f"🔄 프롬프트 템플릿 변경 감지: {entry['path']}")
+            self.reloads += 1
+            self._load(entry)
+
+    def get(self, name: str) -> str:
+        """
+        템플릿 원문 조회 (시스템 프롬프트 등)
+
+        Raises:
+            KeyError: 등록되지 않았고 파일도 없는 템플릿
+        """
+        with self._lock:
+            entry = self._templates.get(name)
+            if entry is None:
+                raise KeyError(f"프롬프트 템플릿이 없습니다: {name}")
+            self._refresh(entry)
+            if entry["text"] is None:
+                raise KeyError(f"프롬프트 템플릿을 로드할 수 없습니다: {name}")
+            return entry["text"]
+
+    def render(self, name: str, **values: Any) -> str:
+        """
+        템플릿에 값을 채워 프롬프트 생성
+
+        Raises:
+            KeyError: 템플릿이 없거나 템플릿의 플레이스홀더 값이 빠진 경우
+        """
+        return self.get(name).format(**values)
+
+    def placeholders(self, name: str) -> Optional[FrozenSet[str]]:
+        """템플릿의 플레이스홀더 이름 집합 (포맷팅할 수 없는 텍스트면 None)"""
+        self.get(name)
+        return self._templates[name]["placeholders"]
+
+    def stats(self) -> Dict[str, Any]:
+        """로드된 템플릿 수와 다시 로드한 횟수"""
+        with self._lock:
+            return {
+                "templates": len(self._templates),
+                "reloads": self.reloads
+            }
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_prompt_registry(prompts_dir: Path = PROMPTS_DIR) -> PromptRegistry:
+    """
+    프롬프트 디렉토리별로 하나의 레지스트리를 공유
+
+    Args:
+        prompts_dir: 프롬프트 루트 디렉토리
+
+    Returns:
+        PromptRegistry: 공유 프롬프트 레지스트리
+    """
+    key = str(Path(prompts_dir).resolve())
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = PromptRegistry(prompts_dir)
+            _registries[key] = registry
+        return registry
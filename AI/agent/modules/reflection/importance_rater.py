@@ -21,20 +21,28 @@ logging.basicConfig(
 logger = logging.getLogger("ImportanceRater")
 
 class ImportanceRater:
-    def __init__(self, ollama_client: OllamaClient):
+    # 한 번의 LLM 호출로 평가할 기본 메모리 개수
+    DEFAULT_BATCH_SIZE = 10
+    # 한 번에 처리할 최대 메모리 개수
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, ollama_client: OllamaClient, batch_size: int = None):
         """
         메모리 중요도 평가기 초기화 (배치 처리 방식)
         
         Args:
             ollama_client: Ollama API 클라이언트 인스턴스
+            batch_size: 한 번의 LLM 호출로 평가할 메모리 개수 (1이면 항상 개별 평가)
         """
         self.ollama_client = ollama_client
-        self.MAX_BATCH_SIZE = 100  # 한 번에 처리할 최대 메모리 개수
-        logger.info(f"메모리 중요도 평가기 초기화 (배치 처리 방식, 최대 배치 크기: {self.MAX_BATCH_SIZE})")
+        if batch_size is None:
+            batch_size = self.DEFAULT_BATCH_SIZE
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        logger.info(f"메모리 중요도 평가기 초기화 (배치 처리 방식, 배치 크기: {self.batch_size})")
     
     async def add_importance_to_memories(self, memories: Dict, agent_name: str, target_memories: Dict[str, Dict]) -> Dict:
         """
-        메모리에 importance 필드 추가 (항상 개별 처리 방식)
+        메모리에 importance 필드 추가 (배치 평가 후 누락된 메모리만 개별 평가)
         
         Parameters:
         - memories: 전체 메모리 데이터
@@ -59,69 +67,124 @@ class ImportanceRater:
             return updated_memories
         
         total_memories_to_rate = len(memories_to_rate)
-        logger.info(f"총 {total_memories_to_rate}개 메모리에 대한 개별 중요도 평가 시작")
+        ratings = {}
         
-        processed_count = 0
-        for memory_id, memory_data in memories_to_rate.items():
-            processed_count += 1
-            logger.info(f"메모리 {processed_count}/{total_memories_to_rate} 평가 중 - ID: {memory_id}, 이벤트: '{memory_data.get('event', '')}'")
-            
-            # 개별 평가 프롬프트 생성
-            # 이전 오류 수정을 위해 _create_single_importance_rating_prompt 내부에서 safe_combined_event_text를 사용하도록 이미 수정됨
-            prompt = self._create_single_importance_rating_prompt(memory_data) 
-            logger.debug(f"생성된 개별 프롬프트 (ID: {memory_id}):\n{prompt}")
+        # 1. 배치 평가 (배치 크기 단위로 나누어 동시에 요청)
+        if self.batch_size > 1 and total_memories_to_rate > 1:
+            memory_ids = list(memories_to_rate.keys())
+            chunks = [memory_ids[i:i + self.batch_size] for i in range(0, len(memory_ids), self.batch_size)]
+            logger.info(f"총 {total_memories_to_rate}개 메모리에 대한 배치 중요도 평가 시작 ({len(chunks)}개 배치)")
             
-            try:
-                logger.info(f"Ollama API 호출 시작 - 메모리 ID: {memory_id}")
-                response = await self.ollama_client.process_prompt(
-                    prompt=prompt,
-                    system_prompt="You are a helpful AI assistant that rates memory importance as instructed. Always respond only with a single integer.",
-                    model_name="gemma3",
-                    options={
-                        "temperature": 0.1,
-                        "top_p": 0.9,
-                        "frequency_penalty": 0.0,
-                        "presence_penalty": 0.0
-                    }
-                )
-                
-                if response and response.get("status") == "success":
-                    logger.info(f"메모리 ID {memory_id} 응답 수신 성공")
-                    importance = self._extract_importance_rating(response["response"])
-                    
-                    if memory_id in updated_memories[agent_name]["memories"]:
-                        updated_memories[agent_name]["memories"][memory_id]["importance"] = importance
-                        logger.info(f"메모리 ID {memory_id}에 중요도 {importance} 추가됨")
-                    else:
-                        logger.warning(f"메모리 ID {memory_id}가 updated_memories에 존재하지 않습니다.")
-                else:
-                    logger.warning(f"메모리 ID {memory_id} 평가 실패 - 응답 상태: {response.get('status') if response else 'None'}. 기본값 5 적용.")
-                    if memory_id in updated_memories[agent_name]["memories"]:
-                        updated_memories[agent_name]["memories"][memory_id]["importance"] = 5
-                    else:
-                        logger.warning(f"메모리 ID {memory_id}가 updated_memories에 존재하지 않아 기본 중요도를 적용할 수 없습니다.")
-            
-            except Exception as e:
-                logger.error(f"메모리 ID {memory_id} 평가 중 오류 발생: {str(e)}")
-                logger.error(f"오류 상세 정보: {type(e).__name__}")
-                import traceback
-                logger.error(f"스택 트레이스:\n{traceback.format_exc()}")
-                logger.info(f"메모리 ID {memory_id}에 기본 중요도 5 적용.")
-                if memory_id in updated_memories[agent_name]["memories"]:
-                    updated_memories[agent_name]["memories"][memory_id]["importance"] = 5
-                else:
-                    logger.warning(f"메모리 ID {memory_id}가 updated_memories에 존재하지 않아 기본 중요도를 적용할 수 없습니다.")
-            
-            # 연속 API 호출 사이에 짧은 지연 추가 (선택 사항, API 정책에 따라 조절)
-            await asyncio.sleep(0.2)
+            batch_results = await asyncio.gather(*[
+                self._rate_memory_batch([memories_to_rate[memory_id] for memory_id in chunk], chunk)
+                for chunk in chunks
+            ])
+            for batch_ratings in batch_results:
+                ratings.update(batch_ratings)
+        
+        # 2. 배치 응답에서 누락된 메모리만 개별 평가
+        missing_ids = [memory_id for memory_id in memories_to_rate if memory_id not in ratings]
+        if missing_ids:
+            logger.info(f"{len(missing_ids)}개 메모리에 대한 개별 중요도 평가 시작")
+            await self._rate_memories_individually(
+                updated_memories, agent_name, missing_ids, [memories_to_rate[memory_id] for memory_id in missing_ids]
+            )
+        
+        for memory_id, importance in ratings.items():
+            if memory_id in updated_memories[agent_name]["memories"]:
+                updated_memories[agent_name]["memories"][memory_id]["importance"] = importance
+                logger.info(f"메모리 ID {memory_id}에 중요도 {importance} 추가됨")
+            else:
+                logger.warning(f"메모리 ID {memory_id}가 updated_memories에 존재하지 않습니다.")
             
         logger.info("모든 메모리 중요도 평가 완료.")
         return updated_memories
     
+    async def _rate_memory_batch(self, target_memories: List[Dict], memory_ids: List[str]) -> Dict[str, int]:
+        """
+        메모리 묶음을 한 번의 LLM 호출로 평가
+        
+        Parameters:
+        - target_memories: 평가할 메모리 목록
+        - memory_ids: 메모리 ID 목록
+        
+        Returns:
+        - 응답에서 유효하게 추출된 중요도 (메모리 ID를 키로 사용, 누락된 ID는 포함하지 않음)
+        """
+        prompt = self._create_batch_importance_rating_prompt(target_memories, memory_ids)
+        
+        try:
+            response = await self.ollama_client.process_prompt(
+                prompt=prompt,
+                system_prompt="You are a helpful AI assistant that rates memory importance as instructed. Always respond only with a JSON object.",
+                model_name="gemma3",
+                options={
+                    "temperature": 0.1,
+                    "top_p": 0.9,
+                    "frequency_penalty": 0.0,
+                    "presence_penalty": 0.0
+                },
+                priority="background",
+                stop_on="json"
+            )
+        except Exception as e:
+            logger.error(f"배치 중요도 평가 중 오류 발생: {str(e)}")
+            return {}
+        
+        if not response or response.get("status") != "success":
+            logger.warning(f"배치 중요도 평가 실패 - 응답 상태: {response.get('status') if response else 'None'}")
+            return {}
+        
+        ratings = self._extract_batch_importance_ratings(response["response"], memory_ids)
+        logger.info(f"배치 중요도 평가 완료: {len(ratings)}/{len(memory_ids)}개 메모리")
+        return ratings
+    
+    async def _rate_single_memory(self, memory_id: str, memory: Dict) -> int:
+        """
+        단일 메모리를 LLM 호출로 평가
+        
+        Parameters:
+        - memory_id: 메모리 ID
+        - memory: 평가할 메모리 데이터
+        
+        Returns:
+        - 중요도 평가 (1-10 정수, 실패 시 기본값 5)
+        """
+        prompt = self._create_single_importance_rating_prompt(memory)
+        logger.debug(f"생성된 개별 프롬프트 (ID: {memory_id}):\n{prompt}")
+        
+        try:
+            logger.info(f"Ollama API 호출 시작 - 메모리 ID: {memory_id}")
+            response = await self.ollama_client.process_prompt(
+                prompt=prompt,
+                system_prompt="You are a helpful AI assistant that rates memory importance as instructed. Always respond only with a single integer.",
+                model_name="gemma3",
+                options={
+                    "temperature": 0.1,
+                    "top_p": 0.9,
+                    "frequency_penalty": 0.0,
+                    "presence_penalty": 0.0
+                },
+                priority="background",
+                stop_on="integer"
+            )
+            
+            if response and response.get("status") == "success":
+                logger.info(f"메모리 ID {memory_id} 응답 수신 성공")
+                return self._extract_importance_rating(response["response"])
+            
+            logger.warning(f"메모리 ID {memory_id} 평가 실패 - 응답 상태: {response.get('status') if response else 'None'}. 기본값 5 적용.")
+        except Exception as e:
+            logger.error(f"메모리 ID {memory_id} 평가 중 오류 발생: {str(e)}")
+            import traceback
+            logger.error(f"스택 트레이스:\n{traceback.format_exc()}")
+            logger.info(f"메모리 ID {memory_id}에 기본 중요도 5 적용.")
+        return 5
+    
     async def _rate_memories_individually(self, memories: Dict, agent_name: str, 
                                         memory_ids: List[str], target_memories: List[Dict]) -> None:
         """
-        각 메모리를 개별적으로 평가 (배치 처리 실패 시 폴백)
+        각 메모리를 개별적으로 평가 (배치 응답에서 누락된 메모리, 요청은 동시에 전송)
         
         Parameters:
         - memories: 전체 메모리
@@ -131,53 +194,19 @@ class ImportanceRater:
         """
         logger.info(f"{len(target_memories)}개 메모리에 대한 개별 평가로 전환")
         
-        for i, memory in enumerate(target_memories):
-            memory_id = memory_ids[i]
-            # 메모리 이벤트 및 시간
-            event = memory.get("event", "")
-            time_str = memory.get("time", "")
-            
-            logger.info(f"메모리 ID {memory_id}, 이벤트 '{event}'의 중요도 개별 평가 중...")
-            
-            # 중요도 평가 프롬프트 생성
-            prompt = self._create_single_importance_rating_prompt(memory)
-            
-            try:
-                response = await self.ollama_client.process_prompt(
-                    prompt=prompt,
-                    system_prompt="You are a helpful AI assistant that rates memory importance.",
-                    model_name="gemma3",
-                    options={
-                        "temperature": 0.1,
-                        "top_p": 0.9,
-                        "frequency_penalty": 0.0,
-                        "presence_penalty": 0.0
-                    }
-                )
-                
-                if response and response.get("status") == "success":
-                    # 중요도 추출
-                    importance = self._extract_importance_rating(response["response"])
-                    
-                    # 원본 메모리에 중요도 추가
-                    if memory_id in memories[agent_name]["memories"]:
-                        memories[agent_name]["memories"][memory_id]["importance"] = importance
-                        logger.info(f"메모리 ID {memory_id}, 이벤트 '{event}'에 중요도 {importance} 추가됨")
-                else:
-                    logger.warning(f"메모리 ID {memory_id}, 이벤트 '{event}'의 중요도 개별 평가 실패 - 기본값 적용")
-                    # 기본 중요도 설정
-                    if memory_id in memories[agent_name]["memories"]:
-                        memories[agent_name]["memories"][memory_id]["importance"] = 5
-                        logger.info(f"메모리 ID {memory_id}, 이벤트 '{event}'에 기본 중요도 5 추가됨")
-            except Exception as e:
-                logger.error(f"메모리 ID {memory_id}, 이벤트 '{event}'의 중요도 개별 평가 중 오류 발생: {str(e)}")
-                # 기본 중요도 설정
-                if memory_id in memories[agent_name]["memories"]:
-                    memories[agent_name]["memories"][memory_id]["importance"] = 5
-                    logger.info(f"메모리 ID {memory_id}, 이벤트 '{event}'에 기본 중요도 5 추가됨")
-                        
-            # 연속 API 호출 사이에 짧은 지연 추가
-            await asyncio.sleep(0.2)
+        # 동시 요청 수는 OllamaClient의 스케줄러가 제한
+        importances = await asyncio.gather(*[
+            self._rate_single_memory(memory_id, memory)
+            for memory_id, memory in zip(memory_ids, target_memories)
+        ])
+        
+        for memory_id, memory, importance in zip(memory_ids, target_memories, importances):
+            if memory_id in memories[agent_name]["memories"]:
+                memories[agent_name]["memories"][memory_id]["importance"] = importance
+                logger.info(f"메모리 ID {memory_id}, 이벤트 '{memory.get('event', '')}'에 중요도 {importance} 추가됨")
+            else:
+                logger.warning(f"메모리 ID {memory_id}가 updated_memories에 존재하지 않아 중요도를 적용할 수 없습니다.")
+    
     
     def _create_batch_importance_rating_prompt(self, memories: List[Dict], memory_ids: List[str]) -> str:
         """
@@ -198,8 +227,9 @@ class ImportanceRater:
             event = memory.get("event", "")
             action = memory.get("action", "")
             feedback = memory.get("feedback", "")
+            feedback_negative = memory.get("feedback_negative", "")
             time_str = memory.get("time", "")
-            # 통합 이벤트 필드 생성
+            # 통합 이벤트 필드 생성 (저장되는 메모리는 수정하지 않음)
             combined_event = ""
             if event_role:
                 combined_event += f"{event_role} "
@@ -209,9 +239,10 @@ class ImportanceRater:
                 combined_event += f"{action} "
             if feedback:
                 combined_event += f"{feedback}"
+            if feedback_negative:
+                combined_event += f"{feedback_negative}"
             
-            memory["combined_event"] = combined_event.strip()
-            logger.debug(f"메모리 ID {memory_id}의 통합 이벤트 필드: '{memory['combined_event']}'")
+            logger.debug(f"메모리 ID {memory_id}의 통합 이벤트 필드: '{combined_event.strip()}'")
 
 
             memory_list += f"MEMORY #{i+1} (ID: {memory_id}):\n"
@@ -255,7 +286,7 @@ Provide a JSON object with ratings for each memory. Each rating should be an int
 
 IMPORTANT: Only provide the JSON object with no additional text.
 """
-        print(prompt)
+        logger.debug(f"생성된 배치 프롬프트:\n{prompt}")
         return prompt
     
     def _create_single_importance_rating_prompt(self, memory: Dict) -> str:
@@ -328,6 +359,7 @@ Provide ONLY a single integer rating from 1 to 10 with no additional text.
         
         Returns:
         - 중요도 평가 딕셔너리 (메모리 ID를 키, 1-10 정수를 값으로 사용)
+          요청하지 않은 ID와 유효하지 않은 값은 제외하므로, 누락된 ID는 호출자가 개별 평가
         """
         try:
             logger.info(f"배치 중요도 추출 시작 - 원본 응답: '{response_text}'")
@@ -362,33 +394,35 @@ Provide ONLY a single integer rating from 1 to 10 with no additional text.
                 return {}
             
             # 중요도 추출
+            requested_ids = {str(memory_id) for memory_id in memory_ids}
             ratings = {}
             for rating_item in data["ratings"]:
+                if not isinstance(rating_item, dict):
+                    continue
                 if "memory_id" in rating_item and "importance" in rating_item:
-                    memory_id = rating_item["memory_id"]
+                    memory_id = str(rating_item["memory_id"])
                     importance = rating_item["importance"]
                     
-                    # 숫자로 변환 및 범위 확인
-                    if isinstance(importance, int) and 1 <= importance <= 10:
-                        ratings[memory_id] = importance
+                    # 요청하지 않은 ID는 무시
+                    if memory_id not in requested_ids:
+                        logger.warning(f"요청하지 않은 메모리 ID {memory_id}의 중요도는 무시합니다.")
+                        continue
+                    
+                    # 숫자로 변환 및 범위 확인 (범위 외 값이나 변환 실패는 누락으로 처리)
+                    try:
+                        importance_int = int(importance)
+                    except (TypeError, ValueError):
+                        logger.warning(f"메모리 ID {memory_id}의 중요도 값을 변환할 수 없습니다: {importance}")
+                        continue
+                    if 1 <= importance_int <= 10:
+                        ratings[memory_id] = importance_int
                     else:
-                        # 문자열인 경우 숫자로 변환 시도
-                        try:
-                            importance_int = int(importance)
-                            if 1 <= importance_int <= 10:
-                                ratings[memory_id] = importance_int
-                            else:
-                                ratings[memory_id] = 5  # 범위 외 값은 중간값으로 대체
-                        except:
-                            ratings[memory_id] = 5  # 변환 실패 시 중간값 사용
+                        logger.warning(f"메모리 ID {memory_id}의 중요도가 범위를 벗어남: {importance_int}")
             
             # 메모리 개수와 일치하는지 확인
-            if len(ratings) != len(memory_ids):
-                logger.warning(f"중요도 개수({len(ratings)})가 메모리 개수({len(memory_ids)})와 일치하지 않습니다.")
-                # 부족한 경우 기본값으로 채우기
-                for memory_id in memory_ids:
-                    if memory_id not in ratings:
-                        ratings[memory_id] = 5
+            if len(ratings) != len(requested_ids):
+                missing_ids = [memory_id for memory_id in requested_ids if memory_id not in ratings]
+                logger.warning(f"중요도 개수({len(ratings)})가 메모리 개수({len(requested_ids)})와 일치하지 않습니다. 누락된 ID: {missing_ids}")
             
             logger.info(f"추출된 중요도 목록: {ratings}")
             return ratings
@@ -485,7 +519,8 @@ if __name__ == "__main__":
         response = await ollama_client.process_prompt(
             prompt=prompt,
             system_prompt="You are a helpful AI assistant that rates memory importance as instructed.",
-            model_name="gemma3"
+            model_name="gemma3",
+            priority="background"
         )
         
         if response and response.get("status") == "success":
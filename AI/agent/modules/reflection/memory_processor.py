@@ -12,6 +12,8 @@ import datetime
 import logging
 from typing import Dict, List, Any, Union
 
+from ..storage.memory_store import get_memory_store
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -28,21 +30,25 @@ class MemoryProcessor:
         - memory_file_path: 메모리 JSON 파일 경로
         """
         self.memory_file_path = memory_file_path
+        # 서버와 같은 프로세스에서 실행되므로 상주 메모리 저장소를 공유
+        self.memory_store = get_memory_store(memory_file_path)
         self.today_str = datetime.datetime.now().strftime("%Y.%m.%d")
         
         logger.info(f"메모리 처리기 초기화 (파일: {memory_file_path})")
     
-    def load_memories(self) -> Dict:
+    def load_memories(self, agent_name: str = None) -> Dict:
         """
-        메모리 JSON 파일 로드
+        메모리 데이터 로드 (상주 저장소의 복사본)
+        
+        Parameters:
+        - agent_name: 지정하면 해당 에이전트 메모리만 복사
         
         Returns:
         - 로드된 메모리 데이터
         """
         try:
-            with open(self.memory_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"메모리 파일 로드 완료: {self.memory_file_path}")
+            data = self.memory_store.snapshot(agent_name)
+            logger.info(f"메모리 데이터 로드 완료: {self.memory_file_path}")
             return data
         except Exception as e:
             logger.error(f"메모리 파일 로드 오류: {e}")
@@ -50,7 +56,7 @@ class MemoryProcessor:
     
     def save_memories(self, memories: Dict) -> bool:
         """
-        메모리 JSON 파일 저장
+        메모리 데이터 저장 (상주 저장소 교체, 디스크에는 write-behind로 기록)
         
         Parameters:
         - memories: 저장할 메모리 데이터
@@ -59,14 +65,46 @@ class MemoryProcessor:
         - 저장 성공 여부
         """
         try:
-            with open(self.memory_file_path, 'w', encoding='utf-8') as f:
-                json.dump(memories, f, ensure_ascii=False, indent=2)
-            logger.info(f"메모리 파일 저장 완료: {self.memory_file_path}")
+            self.memory_store.replace_all(memories)
+            logger.info(f"메모리 데이터 저장 완료: {self.memory_file_path}")
             return True
         except Exception as e:
             logger.error(f"메모리 파일 저장 오류: {e}")
             return False
     
+    def save_importance(self, agent_name: str, memories: Dict, memory_ids: List[str]) -> bool:
+        """
+        평가한 메모리의 중요도만 저장 (나머지 메모리와 다른 에이전트 데이터는 건드리지 않음)
+        
+        Parameters:
+        - agent_name: 에이전트 이름
+        - memories: 중요도가 추가된 메모리 데이터
+        - memory_ids: 중요도를 평가한 메모리 ID 목록
+        
+        Returns:
+        - 저장 성공 여부
+        """
+        try:
+            agent_memories = memories.get(agent_name, {}).get("memories", {})
+            records = []
+            for memory_id in memory_ids:
+                memory = agent_memories.get(memory_id)
+                # 평가하는 동안 삭제된 메모리는 다시 만들지 않음
+                if memory is None or "importance" not in memory or self.memory_store.get_memory(agent_name, memory_id) is None:
+                    continue
+                records.append({
+                    "op": "update_memory",
+                    "agent": agent_name,
+                    "memory_id": str(memory_id),
+                    "fields": {"importance": memory["importance"]}
+                })
+            self.memory_store.apply(records)
+            logger.info(f"{agent_name}의 메모리 {len(records)}개의 중요도를 저장했습니다.")
+            return True
+        except Exception as e:
+            logger.error(f"메모리 중요도 저장 오류: {e}")
+            return False
+    
     def filter_todays_memories(self, agent_name: str, date_str: str = None) -> Dict[str, Dict]:
         """
         오늘 날짜(또는 지정한 날짜)의 메모리 필터링
@@ -84,19 +122,14 @@ class MemoryProcessor:
             if not date_str:
                 date_str = self.today_str
         
-        # 메모리 로드
-        memories = self.load_memories()
-        
-        # 특정 날짜 메모리 필터링
+        # 특정 날짜 메모리 필터링 (시간 인덱스에서 해당 날짜 범위만 조회)
         filtered_memories = {}
         
-        if agent_name in memories and "memories" in memories[agent_name]:
-            for memory_id, memory in memories[agent_name]["memories"].items():
-                time_str = memory.get("time", "")
-                # 날짜 부분만 추출하여 비교
-                memory_date = self._extract_date_from_time(time_str)
-                if memory_date == date_str:
-                    filtered_memories[memory_id] = memory
+        for memory_id in self.memory_store.memory_ids_on_date(agent_name, date_str):
+            memory = self.memory_store.get_memory(agent_name, memory_id)
+            # 날짜 부분만 추출하여 비교
+            if memory is not None and self._extract_date_from_time(memory.get("time", "")) == date_str:
+                filtered_memories[memory_id] = dict(memory)
         
         logger.info(f"에이전트 '{agent_name}'의 {date_str} 날짜 메모리 {len(filtered_memories)}개를 필터링했습니다.")
         return filtered_memories
@@ -123,28 +156,8 @@ class MemoryProcessor:
         Returns:
         - 최신 날짜 (YYYY.MM.DD 형식) 또는 빈 문자열
         """
-        memory_data = self.load_memories()
-        latest_date = ""
-        latest_datetime = datetime.datetime.min
-        
-        for agent_name in memory_data:
-            if "memories" in memory_data[agent_name]:
-                for memory_id, memory in memory_data[agent_name]["memories"].items():
-                    time_str = memory.get("time", "")
-                    if time_str:
-                        # 날짜 부분 추출 (YYYY.MM.DD)
-                        date_str = self._extract_date_from_time(time_str)
-                        if date_str:
-                            try:
-                                # datetime 객체로 변환하여 비교
-                                date_obj = datetime.datetime.strptime(date_str, "%Y.%m.%d")
-                                if date_obj > latest_datetime:
-                                    latest_datetime = date_obj
-                                    latest_date = date_str
-                            except:
-                                pass
-        
-        return latest_date
+        # 에이전트별 시간 인덱스의 마지막 항목만 비교
+        return self.memory_store.latest_memory_date()
 
     def select_important_memories(self, memories: Dict, agent_name: str, date_str: str = None, top_k: int = 3) -> Dict[str, Dict]:
         """
@@ -162,13 +175,13 @@ class MemoryProcessor:
         if date_str is None:
             date_str = self.today_str
         
-        # 해당 날짜의 메모리만 필터링
+        # 해당 날짜의 메모리만 필터링 (날짜 범위는 시간 인덱스로 찾고, 내용은 전달받은 데이터에서 읽음)
         todays_memories = {}
         if agent_name in memories and "memories" in memories[agent_name]:
-            for memory_id, memory in memories[agent_name]["memories"].items():
-                time_str = memory.get("time", "")
-                memory_date = self._extract_date_from_time(time_str)
-                if memory_date == date_str:
+            agent_memories = memories[agent_name]["memories"]
+            for memory_id in self.memory_store.memory_ids_on_date(agent_name, date_str):
+                memory = agent_memories.get(memory_id)
+                if memory is not None and self._extract_date_from_time(memory.get("time", "")) == date_str:
                     todays_memories[memory_id] = memory
         
         # 중요도 필드가 있는 메모리만 필터링
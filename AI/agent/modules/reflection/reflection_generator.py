@@ -13,7 +13,9 @@ import logging
 import asyncio
 from typing import Dict, List, Any, Tuple
 from ..ollama_client import OllamaClient
-import numpy as np
+from ..storage.embedding_sidecar import get_embedding_sidecar, externalize_reflection_embeddings
+from ..storage.backend import get_agent_store
+from ..embedding_cache import get_embedding_cache
 
 # 로깅 설정
 logging.basicConfig(
@@ -33,8 +35,14 @@ class ReflectionGenerator:
             embedding_model: 임베딩 모델 (word2vec 등)
         """
         self.reflection_file_path = reflection_file_path
+        # 반성 임베딩은 사이드카(.npy)에 저장하고 JSON에는 embedding_row만 남김
+        self.reflection_sidecar = get_embedding_sidecar(reflection_file_path, 1)
+        # 반성 데이터는 에이전트별 파일(reflections/<에이전트>.json)에 저장
+        self.reflection_store = get_agent_store(reflection_file_path, {"reflections": []})
         self.ollama_client = ollama_client
         self.embedding_model = embedding_model
+        # 서버의 다른 모듈과 공유하는 문장 임베딩 캐시
+        self.embedding_cache = get_embedding_cache(embedding_model) if embedding_model else None
         
         logger.info(f"ReflectionGenerator 초기화 완료")
         logger.info(f"임베딩 모델 상태: {'사용 가능' if self.embedding_model else '사용 불가'}")
@@ -59,19 +67,28 @@ class ReflectionGenerator:
     
     def load_reflections(self) -> Dict:
         """
-        반성 JSON 파일 로드
+        모든 에이전트의 반성 데이터 로드
         
         Returns:
-        - 로드된 반성 데이터
+        - 로드된 반성 데이터 ({에이전트: {"reflections": [...]}})
+        """
+        data = self.reflection_store.load_all()
+        logger.info(f"반성 파일 로드 완료: {self.reflection_store.location}")
+        return data
+    
+    def load_agent_reflections(self, agent_name: str) -> Dict:
+        """
+        에이전트 하나의 반성 데이터 로드 (다른 에이전트 파일은 읽지 않음)
+        
+        Returns:
+        - {에이전트: {"reflections": [...]}} (없으면 빈 딕셔너리)
         """
         try:
-            with open(self.reflection_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"반성 파일 로드 완료: {self.reflection_file_path}")
-            return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"반성 파일 로드 오류 (새 파일 생성 예정): {e}")
+            agent_data = self.reflection_store.load_agent(agent_name)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"{agent_name} 반성 파일 로드 오류: {e}")
             return {}
+        return {} if agent_data is None else {agent_name: agent_data}
     
     def save_reflections(self, agent_name: str, reflections: List[Dict]) -> bool:
         """
@@ -84,24 +101,23 @@ class ReflectionGenerator:
         Returns:
         - 저장 성공 여부
         """
-        try:
-            # 기존 반성 파일 로드
-            reflection_data = self.load_reflections()
-            
-            # 에이전트가 없으면 생성
-            if agent_name not in reflection_data:
-                reflection_data[agent_name] = {"reflections": []}
+        def append_reflections(agent_data: Dict):
+            agent_data.setdefault("reflections", [])
             
             # 반성 추가
             for reflection in reflections:
-                reflection_data[agent_name]["reflections"].append(reflection)
+                agent_data["reflections"].append(reflection)
                 logger.info(f"{agent_name}의 반성 '{reflection.get('event', '')}' 가 추가되었습니다.")
             
-            # 파일 저장
-            with open(self.reflection_file_path, 'w', encoding='utf-8') as f:
-                json.dump(reflection_data, f, ensure_ascii=False, indent=2)
+            # 임베딩을 사이드카로 옮긴 뒤 파일 저장
+            externalize_reflection_embeddings(self.reflection_sidecar, {agent_name: agent_data})
+            self.reflection_sidecar.flush(agent_name)
+        
+        try:
+            # 해당 에이전트 파일만 읽고 다시 씀 (같은 에이전트의 다른 저장과는 순서대로 처리)
+            self.reflection_store.update_agent(agent_name, append_reflections)
             
-            logger.info(f"반성 파일 저장 완료: {self.reflection_file_path}")
+            logger.info(f"반성 파일 저장 완료: {self.reflection_store.location}")
             return True
             
         except Exception as e:
@@ -125,8 +141,8 @@ class ReflectionGenerator:
             
         logger.info(f"현재 시간: {current_time}")
         
-        # 반성 데이터 로드
-        reflection_data = self.load_reflections()
+        # 반성 데이터 로드 (해당 에이전트 파일만)
+        reflection_data = self.load_agent_reflections(agent_name)
         # logger.info(f"로드된 반성 데이터: {reflection_data}")
         
         if not reflection_data:
@@ -268,7 +284,8 @@ class ReflectionGenerator:
                     "top_p": 0.9,
                     "frequency_penalty": 0.1,
                     "presence_penalty": 0.1
-                }
+                },
+                priority="background"
             )
             
             if response.get("status") != "success":
@@ -298,26 +315,12 @@ class ReflectionGenerator:
                     # reflection["original_event"] = original_event
                     
                     # 통찰(thought)에 대한 임베딩 생성
-                    if self.embedding_model and "thought" in reflection:
+                    if self.embedding_cache and "thought" in reflection:
                         try:
                             thought = reflection.get("thought", "")
                             if thought:
                                 logger.info(f"통찰 '{thought}'에 대한 임베딩 생성 시작")
-                                
-                                # 토큰화 및 소문자 변환
-                                tokens = [w.lower() for w in thought.split() if w.lower() in self.embedding_model]
-                                if not tokens:
-                                    embedding = [0.0] * self.embedding_model.vector_size
-                                else:
-                                    # 단어 벡터의 평균을 문장 벡터로 사용
-                                    word_vectors = [self.embedding_model[w] for w in tokens]
-                                    sentence_vector = np.mean(word_vectors, axis=0)
-                                    # 정규화
-                                    norm = np.linalg.norm(sentence_vector)
-                                    if norm > 0:
-                                        sentence_vector = sentence_vector / norm
-                                    embedding = sentence_vector.tolist()
-                                reflection["embedding"] = embedding
+                                reflection["embedding"] = self.embedding_cache.get(thought).tolist()
                                 logger.info(f"통찰 '{thought}'에 대한 임베딩 생성 완료")
                             else:
                                 logger.warning("통찰이 비어있어 임베딩을 생성할 수 없습니다.")
@@ -15,7 +15,7 @@ import os
 import logging
 import traceback
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from pathlib import Path
 
 # 각 단계별 처리 모듈 가져오기
@@ -23,6 +23,7 @@ from .memory_processor import MemoryProcessor
 from .importance_rater import ImportanceRater
 from .reflection_generator import ReflectionGenerator
 from ..ollama_client import OllamaClient
+from ..storage import run_io, async_agent_lock
 
 # 로깅 설정
 logging.basicConfig(
@@ -50,7 +51,115 @@ def _extract_date_from_time(time_str: str) -> str:
         return match.group(1)
     return ""
 
-async def process_reflection_request(request_data: Dict[str, Any], ollama_client: OllamaClient, word2vec_model=None) -> bool:
+async def _process_agent_reflection(agent_name: str, agent_date: str, memory_file_path: Path, reflection_file_path: Path,
+                                    ollama_client: OllamaClient, word2vec_model=None,
+                                    progress: Optional[Callable[[str], None]] = None) -> bool:
+    """
+    에이전트 하나의 반성 처리 (에이전트 락을 잡은 상태에서 호출)
+    
+    Parameters:
+    - agent_name: 에이전트 이름
+    - agent_date: 요청 시간 (YYYY.MM.DD.HH:MM 형식, 없으면 최신 날짜 사용)
+    - memory_file_path: 메모리 JSON 파일 경로
+    - reflection_file_path: 반성 JSON 파일 경로
+    - ollama_client: Ollama API 클라이언트 인스턴스
+    - word2vec_model: word2vec 임베딩 모델 (선택적)
+    - progress: 단계가 바뀔 때 단계 이름("importance", "reflection")으로 호출할 함수 (선택적)
+    
+    Returns:
+    - 성공 여부 (True/False)
+    """
+    # 1. 메모리 처리기 초기화 및 메모리 로드
+    memory_processor = MemoryProcessor(str(memory_file_path))
+    memories = await run_io(memory_processor.load_memories, agent_name)
+    
+    if not memories or agent_name not in memories:
+        logger.error(f"에이전트 '{agent_name}'의 메모리를 찾을 수 없습니다.")
+        return False
+    
+    # 2. 특정 날짜의 메모리 필터링 (날짜가 제공된 경우)
+    date_str = None
+    if agent_date:
+        # 날짜 부분만 추출
+        date_str = _extract_date_from_time(agent_date)
+        if not date_str:
+            logger.error(f"유효하지 않은 날짜 형식: {agent_date}")
+            return False
+        filtered_memories = memory_processor.filter_todays_memories(agent_name, date_str=date_str)
+        logger.info(f"날짜 '{date_str}'로 특정된 메모리를 필터링합니다.")
+    else:
+        # 날짜가 제공되지 않은 경우 최신 날짜 사용
+        filtered_memories = memory_processor.filter_todays_memories(agent_name)
+        logger.info(f"날짜가 제공되지 않아 최신 메모리를 사용합니다.")
+    
+    if not filtered_memories:
+        # 해당 날짜에 메모리가 없는 경우
+        if agent_date:
+            logger.warning(f"에이전트 '{agent_name}'의 {date_str} 날짜 메모리가 없습니다.")
+        else:
+            logger.warning(f"에이전트 '{agent_name}'의 오늘 메모리가 없습니다.")
+        return False
+    
+    logger.info(f"{len(filtered_memories)}개의 필터링된 메모리를 찾았습니다.")
+    
+    # 3. 메모리 중요도 평가 (배치 처리)
+    if progress:
+        progress("importance")
+    importance_rater = ImportanceRater(ollama_client)
+    logger.info("메모리 중요도 배치 평가 시작...")
+    rated_memories = await importance_rater.add_importance_to_memories(memories, agent_name, filtered_memories)
+    
+    # 4. 업데이트된 중요도만 저장 (평가하는 동안 추가된 메모리나 다른 에이전트 데이터는 덮어쓰지 않음)
+    await run_io(memory_processor.save_importance, agent_name, rated_memories, list(filtered_memories.keys()))
+    logger.info("중요도가 추가된 메모리가 저장되었습니다.")
+    
+    # 5. 중요한 메모리 선택 (특정 날짜에 맞게)
+    important_memories = memory_processor.select_important_memories(
+        rated_memories, 
+        agent_name, 
+        date_str=date_str if agent_date else None
+    )
+    
+    if not important_memories:
+        logger.warning(f"에이전트 '{agent_name}'의 중요한 메모리를 찾을 수 없습니다.")
+        return False
+    
+    logger.info(f"{len(important_memories)}개의 중요한 메모리를 선택했습니다.")
+    
+    if progress:
+        progress("reflection")
+    
+    # 6. 반성 생성기 초기화 (word2vec 모델 직접 전달)
+    reflection_generator = ReflectionGenerator(str(reflection_file_path), ollama_client, embedding_model=word2vec_model)
+    logger.info(f"반성 생성기 초기화 완료 (임베딩 모델: {'사용' if word2vec_model else '미사용'})")
+    
+    # 7. 이전 반성 가져오기
+    previous_reflections = await run_io(reflection_generator.get_previous_reflections, agent_name, agent_date)
+    
+    # 8. 반성 생성
+    reflections = await reflection_generator.generate_reflections(agent_name, important_memories, previous_reflections, time=agent_date)
+    
+    if not reflections:
+        logger.error("반성 생성에 실패했습니다.")
+        return False
+    
+    logger.info(f"{len(reflections)}개의 반성이 생성되었습니다.")
+    
+    # 9. 반성 저장
+    success = await run_io(reflection_generator.save_reflections, agent_name, reflections)
+    
+    if not success:
+        logger.error("반성 저장에 실패했습니다.")
+        return False
+    
+    logger.info("반성이 성공적으로 생성되고 저장되었습니다.")
+    
+    # 성공적으로 모든 단계 완료
+    return True
+
+
+async def process_reflection_request(request_data: Dict[str, Any], ollama_client: OllamaClient, word2vec_model=None,
+                                     progress: Optional[Callable[[str], None]] = None) -> bool:
     """
     AI 브릿지의 반성 요청 처리 파이프라인 (새로운 메모리 구조 대응)
     
@@ -58,6 +167,7 @@ async def process_reflection_request(request_data: Dict[str, Any], ollama_client
     - request_data: AI 브릿지로부터의 요청 데이터
     - ollama_client: Ollama API 클라이언트 인스턴스
     - word2vec_model: word2vec 임베딩 모델 (선택적)
+    - progress: 단계가 바뀔 때 단계 이름으로 호출할 함수 (백그라운드 작업 진행 상황 표시용, 선택적)
     
     Returns:
     - 성공 여부 (True/False)
@@ -86,88 +196,12 @@ async def process_reflection_request(request_data: Dict[str, Any], ollama_client
         logger.info(f"에이전트 '{agent_name}'에 대한 반성 처리 시작 (날짜: {agent_date})")
         logger.info(f"임베딩 모델 상태: {'사용 가능' if word2vec_model else '사용 불가'}")
         
-        # 1. 메모리 처리기 초기화 및 메모리 로드
-        memory_processor = MemoryProcessor(str(memory_file_path))
-        memories = memory_processor.load_memories()
-        
-        if not memories or agent_name not in memories:
-            logger.error(f"에이전트 '{agent_name}'의 메모리를 찾을 수 없습니다.")
-            return False
-        
-        # 2. 특정 날짜의 메모리 필터링 (날짜가 제공된 경우)
-        date_str = None
-        if agent_date:
-            # 날짜 부분만 추출
-            date_str = _extract_date_from_time(agent_date)
-            if not date_str:
-                logger.error(f"유효하지 않은 날짜 형식: {agent_date}")
-                return False
-            filtered_memories = memory_processor.filter_todays_memories(agent_name, date_str=date_str)
-            logger.info(f"날짜 '{date_str}'로 특정된 메모리를 필터링합니다.")
-        else:
-            # 날짜가 제공되지 않은 경우 최신 날짜 사용
-            filtered_memories = memory_processor.filter_todays_memories(agent_name)
-            logger.info(f"날짜가 제공되지 않아 최신 메모리를 사용합니다.")
-        
-        if not filtered_memories:
-            # 해당 날짜에 메모리가 없는 경우
-            if agent_date:
-                logger.warning(f"에이전트 '{agent_name}'의 {date_str} 날짜 메모리가 없습니다.")
-            else:
-                logger.warning(f"에이전트 '{agent_name}'의 오늘 메모리가 없습니다.")
-            return False
-        
-        logger.info(f"{len(filtered_memories)}개의 필터링된 메모리를 찾았습니다.")
-        
-        # 3. 메모리 중요도 평가 (배치 처리)
-        importance_rater = ImportanceRater(ollama_client)
-        logger.info("메모리 중요도 배치 평가 시작...")
-        rated_memories = await importance_rater.add_importance_to_memories(memories, agent_name, filtered_memories)
-        
-        # 4. 업데이트된 메모리 저장
-        memory_processor.save_memories(rated_memories)
-        logger.info("중요도가 추가된 메모리가 저장되었습니다.")
-        
-        # 5. 중요한 메모리 선택 (특정 날짜에 맞게)
-        important_memories = memory_processor.select_important_memories(
-            rated_memories, 
-            agent_name, 
-            date_str=date_str if agent_date else None
-        )
-        
-        if not important_memories:
-            logger.warning(f"에이전트 '{agent_name}'의 중요한 메모리를 찾을 수 없습니다.")
-            return False
-        
-        logger.info(f"{len(important_memories)}개의 중요한 메모리를 선택했습니다.")
-        
-        # 6. 반성 생성기 초기화 (word2vec 모델 직접 전달)
-        reflection_generator = ReflectionGenerator(str(reflection_file_path), ollama_client, embedding_model=word2vec_model)
-        logger.info(f"반성 생성기 초기화 완료 (임베딩 모델: {'사용' if word2vec_model else '미사용'})")
-        
-        # 7. 이전 반성 가져오기
-        previous_reflections = reflection_generator.get_previous_reflections(agent_name, agent_date)
-        
-        # 8. 반성 생성
-        reflections = await reflection_generator.generate_reflections(agent_name, important_memories, previous_reflections, time=agent_date)
-        
-        if not reflections:
-            logger.error("반성 생성에 실패했습니다.")
-            return False
-        
-        logger.info(f"{len(reflections)}개의 반성이 생성되었습니다.")
-        
-        # 9. 반성 저장
-        success = reflection_generator.save_reflections(agent_name, reflections)
-        
-        if not success:
-            logger.error("반성 저장에 실패했습니다.")
-            return False
-        
-        logger.info("반성이 성공적으로 생성되고 저장되었습니다.")
-        
-        # 성공적으로 모든 단계 완료
-        return True
+        # 같은 에이전트의 반성 처리(메모리 중요도 갱신, 반성 추가)는 순서대로 실행하고
+        # 다른 에이전트의 처리와는 동시에 진행
+        async with async_agent_lock(agent_name):
+            return await _process_agent_reflection(
+                agent_name, agent_date, memory_file_path, reflection_file_path, ollama_client, word2vec_model, progress
+            )
         
     except Exception as e:
         logger.error(f"반성 처리 파이프라인 오류: {str(e)}")
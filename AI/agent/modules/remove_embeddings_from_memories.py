@@ -4,13 +4,26 @@ import shutil
 import datetime
 import sys
 
+try:
+    from .storage.memory_store import load_memory_data
+    from .storage.sharded_json import shard_directory
+except ImportError:
+    # 스크립트로 직접 실행하는 경우
+    from storage.memory_store import load_memory_data
+    from storage.sharded_json import shard_directory
+
 def remove_embeddings_from_memories(
     input_file="../data/memories.json", 
     output_file="../data/memories_no_embeddings.json", 
     backup=True
 ):
     """
-    memories.json 파일에서 모든 NPC의 메모리 항목들의 embeddings 섹션을 빈 딕셔너리로 설정합니다.
+    memories.json(에이전트별 파일은 memories/ 디렉토리)에서 모든 NPC의 메모리 항목들의
+    embeddings 섹션을 빈 딕셔너리로 설정한 사본을 만듭니다.
+
+    임베딩 벡터는 사이드카 파일(agent/data/embeddings/)에 저장되고 memories.json에는
+    행 번호만 남으므로, 평소에는 이 스크립트로 임베딩을 제거할 필요가 없습니다.
+    행 참조까지 없는 사본이 필요하거나 이전 형식(실수 리스트) 파일을 정리할 때 사용합니다.
     
     Args:
         input_file (str): 입력 파일 경로 (기본값: ../data/memories.json)
@@ -26,8 +39,9 @@ def remove_embeddings_from_memories(
         input_path = os.path.join(script_dir, input_file)
         output_path = os.path.join(script_dir, output_file)
         
-        # 입력 파일이 존재하는지 확인
-        if not os.path.exists(input_path):
+        # 입력 파일(또는 에이전트별 파일 디렉토리)이 존재하는지 확인
+        shard_dir = shard_directory(input_path)
+        if not os.path.exists(input_path) and not os.path.isdir(shard_dir):
             print(f"오류: {input_path} 파일을 찾을 수 없습니다.")
             return None
         
@@ -39,13 +53,18 @@ def remove_embeddings_from_memories(
         
         # 백업 파일 생성
         if backup:
-            backup_path = f"{input_path}.{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.bak"
-            shutil.copy2(input_path, backup_path)
-            print(f"원본 파일 백업됨: {backup_path}")
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            if os.path.exists(input_path):
+                backup_path = f"{input_path}.{timestamp}.bak"
+                shutil.copy2(input_path, backup_path)
+                print(f"원본 파일 백업됨: {backup_path}")
+            if os.path.isdir(shard_dir):
+                backup_path = f"{shard_dir}.{timestamp}.bak"
+                shutil.copytree(shard_dir, backup_path)
+                print(f"원본 디렉토리 백업됨: {backup_path}")
         
-        # JSON 파일 로드
-        with open(input_path, 'r', encoding='utf-8') as f:
-            memory_data = json.load(f)
+        # 메모리 로드 (에이전트별 파일과 아직 스냅샷에 반영되지 않은 변경 로그까지 포함)
+        memory_data = load_memory_data(input_path)
         
         modified_count = 0
         npc_count = 0
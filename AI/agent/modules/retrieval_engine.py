@@ -0,0 +1,433 @@
+"""
+메모리 검색 엔진 모듈
+
+MemoryRetriever(/make_reaction)와 ReactionDecider(/react)가 같은 점수 계산으로
+유사 메모리를 찾도록 검색 로직과 점수 파라미터를 한 곳에 모읍니다.
+같은 이벤트에 대해 /react 다음 /make_reaction이 이어서 호출되는 경우가 많으므로,
+(에이전트, 이벤트 임베딩, 상태 임베딩) 기준으로 순위를 잠시 캐시해 두 번째 검색은 다시 계산하지 않습니다.
+메모리가 변경되면 (임베딩 인덱스 버전이 바뀌면) 캐시는 자동으로 무효화됩니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+
+def format_state(state: Dict[str, int]) -> str:
+    """
+    상태 정보를 문자열로 변환
+
+    Args:
+        state: 상태 정보 딕셔너리
+
+    Returns:
+        str: 포맷된 상태 문자열
+    """
+    if not state:
+        return ""
+
+    state_strings = []
+
+    # hunger와 loneliness는 양수일 때 해당 욕구가 높음
+    if "hunger" in state:
+        hunger = state["hunger"]
+        if hunger >= 90:
+            state_strings.append("EXTREMELY HUNGRY")
+        elif hunger >= 70:
+            state_strings.append("extremely hungry")
+        elif hunger >= 40:
+            state_strings.append("very hungry")
+        elif hunger >= 20:
+            state_strings.append("slightly hungry")
+        elif hunger < -70:
+            state_strings.append("You are full, can't eat anymore")
+
+    if "loneliness" in state:
+        loneliness = state["loneliness"]
+        if loneliness >= 70:
+            state_strings.append("very lonely")
+        elif loneliness >= 40:
+            state_strings.append("lonely")
+        elif loneliness >= 20:
+            state_strings.append("slightly lonely")
+        elif loneliness < -70:
+            state_strings.append("you want to be alone")
+
+    if "sleepiness" in state and state["sleepiness"] > 0:
+        sleepiness = state["sleepiness"]
+        if sleepiness >= 90:
+            state_strings.append("EXTREMELY SLEEPY")
+        elif sleepiness >= 70:
+            state_strings.append("very sleepy")
+        elif sleepiness >= 40:
+            state_strings.append("sleepy")
+        elif sleepiness >= 20:
+            state_strings.append("slightly sleepy")
+        elif sleepiness <= -70:
+            state_strings.append("you feel completely awake")
+
+    if "stress" in state and state["stress"] > 0:
+        stress = state["stress"]
+        if stress >= 70:
+            state_strings.append("very stressed")
+        elif stress >= 40:
+            state_strings.append("stressed")
+        elif stress >= 10:
+            state_strings.append("slightly stressed")
+        elif stress <= -70:
+            state_strings.append("you feel comfortable")
+
+    ## 빈 배열일 경우 문자열 추가
+    if not state_strings:
+        state_strings.append("completely fine")
+
+    return ", ".join(state_strings) if state_strings else ""
+
+
+def create_event_string(memory: Dict[str, Any], is_reflection: bool) -> str:
+    """
+    메모리를 이벤트 문자열로 변환
+
+    Args:
+        memory: 메모리 데이터
+        is_reflection: 반성 데이터 여부
+
+    Returns:
+        str: 포맷된 이벤트 문자열
+    """
+    # 새 구조에서 어떤 필드에 내용이 있는지 확인
+    event = memory.get("event", "")
+    feedback = memory.get("feedback", "")
+    feedback_negative = memory.get("feedback_negative", "")
+    thought = memory.get("thought", "")  # 반성 데이터 호환성
+    event_role = memory.get("event_role", "")
+
+    content = ""
+    if is_reflection:
+        if thought and thought != "":
+            content = f"Thought: {thought}\n"
+    else:
+        if event and event != "":
+            if event_role != "" and event_role != " ":
+                content = f"Event: {event_role}, {event}\n"
+            else:
+                content = f"Event: {event}\n"
+        if feedback and feedback != "":
+            content = f"Feedback: {feedback + feedback_negative}\n"
+
+    return f"- {content}\n"
+
+
+class RetrievalEngine:
+    # 최종 점수 = ALPHA * 유사도 + BETA * 중요도/10 + GAMMA * 시간 가중치
+    MEMORY_ALPHA = 0.5
+    MEMORY_BETA = 0.2
+    MEMORY_GAMMA = 0.3
+    # 포물선형 시간 가중치를 계산할 최근 순위 범위 (K)
+    TIME_HORIZON = 20
+    # 유사도를 계산할 수 없거나 임계값 미만인 메모리의 기본 유사도
+    DEFAULT_SIMILARITY = 0.01
+    # 근사 검색 인덱스에서 쿼리마다 가져올 후보 수 (top_k 배수, 최소값)
+    ANN_CANDIDATE_FACTOR = 20
+    ANN_MIN_CANDIDATES = 100
+    # 순위 캐시: 유지 시간(초), 최대 항목 수, 항목마다 저장할 최소 순위 수
+    CACHE_TTL = 30.0
+    CACHE_SIZE = 256
+    CACHE_DEPTH = 10
+
+    def __init__(
+        self,
+        memory_store,
+        alpha: float = None,
+        beta: float = None,
+        gamma: float = None,
+        time_horizon: int = None,
+        cache_ttl: float = None,
+        cache_size: int = None
+    ):
+        """
+        검색 엔진 초기화
+
+        Args:
+            memory_store: 공유 메모리 저장소 (MemoryStore)
+            alpha: 유사도 가중치 (기본값: MEMORY_ALPHA)
+            beta: 중요도 가중치 (기본값: MEMORY_BETA)
+            gamma: 시간 가중치 (기본값: MEMORY_GAMMA)
+            time_horizon: 시간 가중치 순위 범위 (기본값: TIME_HORIZON)
+            cache_ttl: 순위 캐시 유지 시간(초, 0이면 캐시 사용 안 함)
+            cache_size: 순위 캐시 최대 항목 수
+        """
+        self.memory_store = memory_store
+        self.alpha = self.MEMORY_ALPHA if alpha is None else alpha
+        self.beta = self.MEMORY_BETA if beta is None else beta
+        self.gamma = self.MEMORY_GAMMA if gamma is None else gamma
+        self.time_horizon = time_horizon or self.TIME_HORIZON
+        self.cache_ttl = self.CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_size = cache_size or self.CACHE_SIZE
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def find_similar_memories(
+        self,
+        event_embedding: List[float],
+        state_embedding: List[float],
+        agent_name: str,
+        top_k: int = 3,
+        similarity_threshold: float = 0.1
+    ) -> List[Tuple[Dict[str, Any], float, bool]]:
+        """
+        유사한 메모리 검색
+
+        Args:
+            event_embedding: 현재 이벤트의 임베딩
+            state_embedding: 현재 상태의 임베딩
+            agent_name: 에이전트 이름
+            top_k: 반환할 메모리 개수
+            similarity_threshold: 유사도 임계값
+
+        Returns:
+            List[Tuple[Dict[str, Any], float, bool]]: (메모리, 최종 점수, 반성 여부) 튜플 리스트
+        """
+        result = []
+        for memory_id, score in self.rank(event_embedding, state_embedding, agent_name, top_k, similarity_threshold):
+            memory = self.memory_store.get_memory(agent_name, memory_id)
+            if memory is None:
+                continue
+            memory_with_id = dict(memory)
+            memory_with_id["memory_id"] = memory_id
+            result.append((memory_with_id, score, False))
+
+        # ### 반성 데이터 불안정성, 추후 개선 필요 (반성은 아직 검색 대상에 포함하지 않음)
+        return result
+
+    def rank(
+        self,
+        event_embedding: List[float],
+        state_embedding: List[float],
+        agent_name: str,
+        top_k: int = 3,
+        similarity_threshold: float = 0.1
+    ) -> List[Tuple[str, float]]:
+        """
+        최종 점수 상위 top_k 메모리 ID (같은 쿼리는 잠시 캐시된 순위 재사용)
+
+        Returns:
+            List[Tuple[str, float]]: (메모리 ID, 최종 점수) 목록 (점수 내림차순, 같은 점수는 최신 메모리 우선)
+        """
+        if top_k <= 0:
+            return []
+        # 에이전트의 정규화된 임베딩 행렬 (변경된 메모리만 갱신된 상태)
+        index = self.memory_store.get_embedding_index(agent_name)
+        if index is None:
+            return []
+
+        key = (
+            agent_name,
+            float(similarity_threshold),
+            self._embedding_key(event_embedding),
+            self._embedding_key(state_embedding)
+        )
+        ranking = self._cached_ranking(key, index, top_k)
+        if ranking is None:
+            depth = max(top_k, self.CACHE_DEPTH)
+            ranking = self._rank(index, event_embedding, state_embedding, depth, similarity_threshold)
+            self._store_ranking(key, index, depth, ranking)
+        return ranking[:top_k]
+
+    # ------------------------------------------------------------------
+    # 순위 캐시
+
+    @staticmethod
+    def _embedding_key(embedding: Optional[List[float]]) -> bytes:
+        """캐시 키로 쓸 임베딩 바이트"""
+        if embedding is None:
+            return b""
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+
+    def _cached_ranking(self, key: Tuple, index, top_k: int) -> Optional[List[Tuple[str, float]]]:
+        """유효한 캐시 순위 (인덱스가 같은 버전이고 유지 시간 안이며 top_k만큼 저장되어 있을 때)"""
+        if self.cache_ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                cached_index, version, created, depth, ranking = entry
+                fresh = cached_index is index and version == index.version and time.monotonic() - created <= self.cache_ttl
+                if fresh and (top_k <= depth or len(ranking) < depth):
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return ranking
+                if not fresh:
+                    del self._cache[key]
+            self.misses += 1
+            return None
+
+    def _store_ranking(self, key: Tuple, index, depth: int, ranking: List[Tuple[str, float]]):
+        """순위 캐시에 저장 (가장 오래 쓰지 않은 항목부터 제거)"""
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (index, index.version, time.monotonic(), depth, ranking)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """순위 캐시 적중/실패 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def clear_cache(self):
+        """순위 캐시 비우기 (통계는 유지)"""
+        with self._lock:
+            self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # 점수 계산
+
+    def _rank(
+        self,
+        index,
+        event_embedding: List[float],
+        state_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float
+    ) -> List[Tuple[str, float]]:
+        """임베딩 인덱스에서 최종 점수 상위 top_k 메모리 ID 계산"""
+        # event와 feedback이 모두 빈 메모리를 제외한 검색 대상 행
+        rows = index.active_rows()
+        if len(rows) == 0:
+            return []
+
+        # (1) 시간 가중치: 최신순 순위 기반 (변경이 없으면 캐시 사용)
+        ranking = index.time_ranking(self.time_horizon)
+        time_weight = ranking["weight"][rows]
+        time_position = ranking["position"][rows]
+
+        # (2) 중요도 정규화
+        imp_norm = index.importance[rows].astype(np.float64) / 10.0
+        base_scores = self.beta * imp_norm + self.gamma * time_weight
+
+        # (3) 유사도: 행렬-벡터 곱으로 이벤트/상태 유사도 계산
+        #     (feedback 임베딩 우선, 없으면 event 임베딩 / 계산 불가 시 0.01)
+        #     근사 검색 인덱스가 있으면 후보 행만 계산, 없으면 모든 행 계산
+        ann = index.ann_candidates([event_embedding, state_embedding], max(top_k * self.ANN_CANDIDATE_FACTOR, self.ANN_MIN_CANDIDATES))
+        if ann is None:
+            evaluated = np.arange(len(rows))
+            sim_max = self._similarity_max(index, None, event_embedding, state_embedding, similarity_threshold)[rows]
+        else:
+            evaluated, sim_max = self._ann_similarity_max(
+                index, rows, ann, base_scores, top_k,
+                event_embedding, state_embedding, similarity_threshold
+            )
+
+        # (4) 최종 점수 계산 (유사도를 계산한 행만)
+        final_scores = self.alpha * sim_max + base_scores[evaluated]
+
+        # 상위 top_k 후보만 부분 정렬 (경계값과 같은 점수는 모두 후보에 포함)
+        if len(evaluated) > top_k:
+            kth_score = np.partition(final_scores, len(final_scores) - top_k)[len(final_scores) - top_k]
+            candidates = np.flatnonzero(final_scores >= kth_score)
+        else:
+            candidates = np.arange(len(evaluated))
+
+        # final_score 내림차순, 같은 점수는 최신 메모리 우선
+        order = candidates[np.lexsort((time_position[evaluated[candidates]], -final_scores[candidates]))]
+        return [
+            (index.memory_ids[rows[evaluated[position]]], float(final_scores[position]))
+            for position in order[:top_k]
+        ]
+
+    def _similarity_max(
+        self,
+        index,
+        rows: Optional[np.ndarray],
+        event_embedding: List[float],
+        state_embedding: List[float],
+        similarity_threshold: float
+    ) -> np.ndarray:
+        """행별 이벤트/상태 유사도 중 큰 값 (rows가 None이면 모든 행, 임계값 미만이면 기본 유사도)"""
+        sim_max = np.maximum(
+            index.similarities(event_embedding, rows),
+            index.similarities(state_embedding, rows)
+        ).astype(np.float64)
+        # 평균 <= 최대이므로 최대값만 비교하면 됨
+        return np.where(sim_max >= similarity_threshold, sim_max, self.DEFAULT_SIMILARITY)
+
+    def _ann_similarity_max(
+        self,
+        index,
+        rows: np.ndarray,
+        ann: Tuple[np.ndarray, float],
+        base_scores: np.ndarray,
+        top_k: int,
+        event_embedding: List[float],
+        state_embedding: List[float],
+        similarity_threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        근사 검색 후보로 유사도를 계산할 행 선택
+
+        근사 검색 후보의 점수로 top_k 경계 점수를 구한 뒤, 후보가 아닌 행 중
+        (경계 유사도 기준) 최대 가능 점수가 경계 점수 이상인 행(중요도가 높거나 최근 메모리)도 함께 계산합니다.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (rows 기준 위치 배열, 위치별 유사도)
+        """
+        candidate_rows, bound = ann
+        position_of = np.full(index.size, -1, dtype=np.int64)
+        position_of[rows] = np.arange(len(rows))
+        evaluated = position_of[candidate_rows]
+        evaluated = evaluated[evaluated >= 0]
+        sim_max = self._similarity_max(index, rows[evaluated], event_embedding, state_embedding, similarity_threshold)
+
+        if len(evaluated) >= top_k:
+            scores = self.alpha * sim_max + base_scores[evaluated]
+            kth_score = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            upper_scores = self.alpha * max(bound, self.DEFAULT_SIMILARITY) + base_scores
+            extra_mask = upper_scores >= kth_score
+        else:
+            extra_mask = np.ones(len(rows), dtype=bool)
+        extra_mask[evaluated] = False
+        extra = np.flatnonzero(extra_mask)
+        if len(extra):
+            evaluated = np.concatenate([evaluated, extra])
+            sim_max = np.concatenate([
+                sim_max,
+                self._similarity_max(index, rows[extra], event_embedding, state_embedding, similarity_threshold)
+            ])
+        return evaluated, sim_max
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_retrieval_engine(memory_store) -> RetrievalEngine:
+    """
+    메모리 저장소별로 하나의 검색 엔진(과 순위 캐시)을 공유
+
+    Args:
+        memory_store: 메모리 저장소 (MemoryStore)
+
+    Returns:
+        RetrievalEngine: 공유 검색 엔진
+    """
+    with _engines_lock:
+        engine = _engines.get(id(memory_store))
+        if engine is None or engine.memory_store is not memory_store:
+            engine = RetrievalEngine(memory_store)
+            _engines[id(memory_store)] = engine
+        return engine
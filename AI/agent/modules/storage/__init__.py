@@ -0,0 +1,27 @@
+"""
+메모리 저장소 모듈
+
+memories.json을 매번 통째로 다시 쓰지 않도록 저장 계층을 제공합니다:
+1. append-only 로그 + 주기적 스냅샷 압축 (MemoryLog)
+2. 프로세스 내 상주 메모리 + write-behind 기록 (MemoryStore)
+3. 에이전트별 정규화 임베딩 행렬 (AgentEmbeddingIndex)과 선택형 근사 검색 인덱스 (IVFIndex, MEMORY_ANN=1)
+4. 블로킹 I/O를 이벤트 루프 밖에서 실행하는 스레드 풀 (run_io)
+5. 에이전트별 샤드 파일과 에이전트별 락 (ShardedJsonStore, AgentLocks, async_agent_lock)
+6. 선택형 SQLite 백엔드 (STORAGE_BACKEND=sqlite, SQLiteDatabase, SQLiteDocumentStore)
+"""
+
+from .memory_log import MemoryLog
+from .memory_store import MemoryStore, get_memory_store
+from .embedding_index import AgentEmbeddingIndex
+from .ann_index import IVFIndex
+from .io_executor import run_io, shutdown_io_executor
+from .agent_locks import AgentLocks, async_agent_lock
+from .sharded_json import ShardedJsonStore, get_sharded_json
+from .sqlite_store import SQLiteDatabase, SQLiteDocumentStore, get_sqlite_database
+from .backend import sqlite_enabled, get_database, get_agent_store
+
+__all__ = [
+    'MemoryLog', 'MemoryStore', 'get_memory_store', 'AgentEmbeddingIndex', 'IVFIndex', 'run_io', 'shutdown_io_executor',
+    'AgentLocks', 'async_agent_lock', 'ShardedJsonStore', 'get_sharded_json',
+    'SQLiteDatabase', 'SQLiteDocumentStore', 'get_sqlite_database', 'sqlite_enabled', 'get_database', 'get_agent_store'
+]
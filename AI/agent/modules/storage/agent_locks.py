@@ -0,0 +1,65 @@
+"""
+에이전트별 락 모듈
+
+같은 에이전트의 읽기-수정-쓰기는 순서대로 처리하고, 다른 에이전트의 작업은 서로 기다리지 않도록
+에이전트 이름별로 락을 나눠 줍니다.
+- AgentLocks: 스레드 락 (저장소 I/O 스레드에서 실행되는 동기 코드용)
+- async_agent_lock: asyncio 락 (LLM 응답을 기다리는 동안에도 유지해야 하는 비동기 작업용)
+"""
+
+import asyncio
+import threading
+import weakref
+
+
+class AgentLocks:
+    """에이전트 이름별 스레드 락 모음 (같은 스레드에서 다시 잡을 수 있는 RLock)"""
+
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, agent_name: str) -> threading.RLock:
+        """
+        에이전트 락 조회 (없으면 생성)
+
+        Args:
+            agent_name: 에이전트 이름
+
+        Returns:
+            threading.RLock: 에이전트 전용 락
+        """
+        with self._lock:
+            lock = self._locks.get(agent_name)
+            if lock is None:
+                lock = threading.RLock()
+                self._locks[agent_name] = lock
+            return lock
+
+
+# 이벤트 루프별 에이전트 asyncio 락 (asyncio 락은 만들어진 루프에서만 사용할 수 있음)
+_async_locks = weakref.WeakKeyDictionary()
+_async_locks_lock = threading.Lock()
+
+
+def async_agent_lock(agent_name: str) -> asyncio.Lock:
+    """
+    현재 이벤트 루프에서 사용할 에이전트 asyncio 락
+
+    Args:
+        agent_name: 에이전트 이름
+
+    Returns:
+        asyncio.Lock: 에이전트 전용 락 (async with로 사용)
+    """
+    loop = asyncio.get_running_loop()
+    with _async_locks_lock:
+        locks = _async_locks.get(loop)
+        if locks is None:
+            locks = {}
+            _async_locks[loop] = locks
+        lock = locks.get(agent_name)
+        if lock is None:
+            lock = asyncio.Lock()
+            locks[agent_name] = lock
+        return lock
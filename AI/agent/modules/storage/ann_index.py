@@ -0,0 +1,189 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 모듈
+
+메모리가 수만 개까지 쌓인 에이전트의 유사도 검색에서 전체 행렬과의 곱 대신
+IVF(inverted file) 방식으로 후보 행만 계산합니다.
+- 정규화된 임베딩을 구면 k-means로 묶어 군집 중심(centroid)과 군집별 행 목록을 유지
+- 검색 시 쿼리와 가까운 군집 n_probe개의 행만 유사도를 계산
+- 메모리 추가/변경/삭제는 해당 행만 가장 가까운 군집에 다시 배정 (재학습 없음)
+- 학습 이후 벡터 수가 두 배가 되면 다음 검색 때 다시 학습
+
+MEMORY_ANN=1 로 켜고, 검색 대상이 MEMORY_ANN_MIN_ROWS개 이상인 에이전트에만 사용합니다.
+(그보다 작으면 전체 검색이 충분히 빠르고 정확합니다)
+"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+ANN_ENABLED = os.environ.get("MEMORY_ANN", "0") == "1"
+ANN_MIN_ROWS = int(os.environ.get("MEMORY_ANN_MIN_ROWS", "5000"))
+
+
+class IVFIndex:
+    # 군집 하나당 학습 샘플 수 / k-means 반복 횟수
+    TRAIN_SAMPLES_PER_LIST = 64
+    TRAIN_ITERATIONS = 10
+    # 학습 이후 벡터 수가 이 배수를 넘으면 다시 학습
+    RETRAIN_GROWTH = 2.0
+    # 전체 배정 시 한 번에 계산할 행 수
+    ASSIGN_CHUNK = 8192
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: Optional[int] = None, seed: int = 0):
+        """
+        IVF 인덱스 초기화 (실제 구성은 train 시 수행)
+
+        Args:
+            n_lists: 군집 수 (None이면 학습 시 sqrt(벡터 수) 기준으로 결정)
+            n_probe: 검색할 군집 수 (None이면 군집 수의 약 1/8)
+            seed: k-means 초기화 난수 시드
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids = None              # (n_lists, dim) float32, 정규화된 군집 중심
+        self.assignment = np.zeros(0, dtype=np.int64)  # 행 번호 -> 군집 번호 (-1: 없음)
+        self.trained_count = 0
+
+        self._lists: List[List[int]] = []
+        self._arrays: List[Optional[np.ndarray]] = []
+        self._count = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def needs_retrain(self, vector_count: int) -> bool:
+        """학습 이후 벡터 수가 충분히 늘어 다시 학습해야 하는지 여부"""
+        return not self.trained or vector_count > self.trained_count * self.RETRAIN_GROWTH
+
+    # ------------------------------------------------------------------
+    # 학습 / 배정
+
+    def train(self, matrix: np.ndarray, rows: np.ndarray):
+        """
+        구면 k-means로 군집 중심을 학습하고 모든 행을 배정
+
+        Args:
+            matrix: (행 수, dim) 정규화된 임베딩 행렬
+            rows: 인덱스에 넣을 행 번호 배열
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        n_lists = self.n_lists or int(np.clip(round(np.sqrt(len(rows))), 1, 4096))
+        n_lists = max(1, min(n_lists, len(rows)))
+        rng = np.random.default_rng(self.seed)
+
+        sample_size = min(len(rows), n_lists * self.TRAIN_SAMPLES_PER_LIST)
+        sample = matrix[rng.choice(rows, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(self.TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            # 비어 있는 군집은 기존 중심 유지
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        self.centroids = centroids.astype(np.float32, copy=False)
+        self._lists = [[] for _ in range(n_lists)]
+        self._arrays = [None] * n_lists
+        self.assignment = np.full(int(rows.max()) + 1 if len(rows) else 0, -1, dtype=np.int64)
+        self._count = 0
+
+        for start in range(0, len(rows), self.ASSIGN_CHUNK):
+            chunk = rows[start:start + self.ASSIGN_CHUNK]
+            labels = np.argmax(matrix[chunk] @ self.centroids.T, axis=1)
+            for row, label in zip(chunk.tolist(), labels.tolist()):
+                self._append(row, label)
+        self.trained_count = len(rows)
+
+    def _ensure_capacity(self, row: int):
+        """행 번호 배열 크기 확보 (두 배씩 증가)"""
+        if row < len(self.assignment):
+            return
+        grown = np.full(max(row + 1, len(self.assignment) * 2, 16), -1, dtype=np.int64)
+        grown[:len(self.assignment)] = self.assignment
+        self.assignment = grown
+
+    def _append(self, row: int, label: int):
+        self._ensure_capacity(row)
+        self.assignment[row] = label
+        self._lists[label].append(row)
+        self._arrays[label] = None
+        self._count += 1
+
+    def add(self, row: int, vector: np.ndarray):
+        """행 하나를 가장 가까운 군집에 배정 (이미 있으면 다시 배정)"""
+        if not self.trained:
+            return
+        self.remove(row)
+        self._append(row, int(np.argmax(self.centroids @ vector)))
+
+    def remove(self, row: int):
+        """행 하나를 인덱스에서 제거"""
+        if row >= len(self.assignment) or self.assignment[row] < 0:
+            return
+        label = int(self.assignment[row])
+        self._lists[label].remove(row)
+        self._arrays[label] = None
+        self.assignment[row] = -1
+        self._count -= 1
+
+    def _list_array(self, label: int) -> np.ndarray:
+        """군집의 행 번호 배열 (변경이 없으면 캐시 사용)"""
+        array = self._arrays[label]
+        if array is None:
+            array = np.asarray(self._lists[label], dtype=np.int64)
+            self._arrays[label] = array
+        return array
+
+    # ------------------------------------------------------------------
+    # 검색
+
+    def search(self, matrix: np.ndarray, queries: Sequence[np.ndarray], count: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, float]:
+        """
+        쿼리들과 가까운 후보 행 검색
+
+        Args:
+            matrix: (행 수, dim) 정규화된 임베딩 행렬 (학습에 사용한 행 번호 기준)
+            queries: 정규화된 쿼리 벡터 목록 (이벤트, 상태 등)
+            count: 쿼리마다 반환할 후보 수
+            n_probe: 검색할 군집 수 (None이면 기본값)
+
+        Returns:
+            Tuple[np.ndarray, float]: (후보 행 번호 배열, 경계 유사도)
+                경계 유사도는 쿼리별 count번째 후보 유사도 중 가장 큰 값으로,
+                후보에 들지 못한 행의 유사도는 (근사적으로) 이 값 이하입니다.
+        """
+        if not self.trained or not queries or count <= 0:
+            return np.zeros(0, dtype=np.int64), -1.0
+        n_lists = len(self._lists)
+        n_probe = n_probe or self.n_probe or max(1, int(np.ceil(n_lists / 8)))
+        n_probe = min(n_probe, n_lists)
+
+        found = []
+        bound = -1.0
+        for query in queries:
+            centroid_scores = self.centroids @ query
+            if n_probe < n_lists:
+                probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+            else:
+                probes = np.arange(n_lists)
+            arrays = [self._list_array(label) for label in probes.tolist() if self._lists[label]]
+            if not arrays:
+                continue
+            rows = np.concatenate(arrays)
+            scores = matrix[rows] @ query
+            if len(rows) > count:
+                top = np.argpartition(-scores, count - 1)[:count]
+                rows, scores = rows[top], scores[top]
+            bound = max(bound, float(scores.min()))
+            found.append(rows)
+
+        if not found:
+            return np.zeros(0, dtype=np.int64), bound
+        return np.unique(np.concatenate(found)), bound
@@ -0,0 +1,88 @@
+"""
+저장소 백엔드 선택 모듈
+
+STORAGE_BACKEND 환경 변수로 메모리/반성/계획/이벤트 ID/대화의 저장 방식을 고릅니다.
+- json (기본값): 에이전트별 JSON 샤드 파일 (memories/, reflections/, plans/ 등)
+- sqlite: agent/data/agent_data.sqlite3 하나에 저장 (WAL 모드, STORAGE_SQLITE_PATH로 경로 변경 가능)
+
+SQLite로 바꾸기 전에 migrate_to_sqlite.py로 기존 JSON 데이터를 가져와야 합니다.
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional, Union
+
+from .sharded_json import ShardedJsonStore, get_sharded_json, load_sharded_json
+from .sqlite_store import SQLiteDatabase, SQLiteDocumentStore, get_sqlite_database
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json").strip().lower()
+SQLITE_FILE_NAME = "agent_data.sqlite3"
+
+
+def sqlite_enabled() -> bool:
+    """SQLite 백엔드를 사용하는지 여부"""
+    return STORAGE_BACKEND == "sqlite"
+
+
+def sqlite_database_path(file_path: str) -> str:
+    """데이터 파일과 같은 디렉토리의 데이터베이스 경로 (STORAGE_SQLITE_PATH가 있으면 그 경로)"""
+    env_path = os.environ.get("STORAGE_SQLITE_PATH")
+    if env_path:
+        return os.path.abspath(env_path)
+    return os.path.join(os.path.dirname(os.path.abspath(str(file_path))), SQLITE_FILE_NAME)
+
+
+def get_database(file_path: str) -> Optional[SQLiteDatabase]:
+    """
+    데이터 파일에 대응하는 SQLite 데이터베이스
+
+    Args:
+        file_path: 기존 JSON 데이터 파일 경로 (memories.json, event_ids.json 등)
+
+    Returns:
+        SQLiteDatabase: 공유 데이터베이스 (JSON 백엔드면 None)
+    """
+    if not sqlite_enabled():
+        return None
+    return get_sqlite_database(sqlite_database_path(file_path))
+
+
+_document_stores = {}
+_document_stores_lock = threading.Lock()
+
+
+def get_agent_store(file_path: str, default_agent_data: Any = None) -> Union[ShardedJsonStore, SQLiteDocumentStore]:
+    """
+    에이전트별 문서 저장소 (reflections.json, plans.json)
+
+    JSON 백엔드면 ShardedJsonStore, SQLite 백엔드면 같은 인터페이스의 SQLiteDocumentStore를 반환합니다.
+
+    Args:
+        file_path: 기존 단일 JSON 파일 경로 (파일 이름이 문서 종류: reflections / plans)
+        default_agent_data: 에이전트 데이터 기본값 (처음 생성할 때만 적용)
+    """
+    database = get_database(file_path)
+    if database is None:
+        return get_sharded_json(file_path, default_agent_data)
+
+    kind = os.path.splitext(os.path.basename(str(file_path)))[0]
+    key = (database.db_path, kind)
+    with _document_stores_lock:
+        if key not in _document_stores:
+            _document_stores[key] = SQLiteDocumentStore(database, kind, default_agent_data)
+        return _document_stores[key]
+
+
+def load_agent_documents(file_path: str) -> Dict[str, Any]:
+    """
+    저장소를 만들지 않고 에이전트별 문서를 읽음 (스크립트/도구용, JSON 파일은 수정하지 않음)
+
+    Args:
+        file_path: 기존 단일 JSON 파일 경로 (reflections.json, plans.json)
+
+    Returns:
+        Dict[str, Any]: {에이전트: 데이터}
+    """
+    if get_database(file_path) is None:
+        return load_sharded_json(file_path)
+    return get_agent_store(file_path).load_all()
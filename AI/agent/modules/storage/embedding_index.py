@@ -0,0 +1,281 @@
+"""
+에이전트별 임베딩 행렬 모듈
+
+에이전트의 메모리 임베딩을 정규화된 float32 행렬 하나로 모아두고,
+검색 시 행렬-벡터 곱 한 번으로 모든 메모리와의 유사도를 계산합니다.
+메모리 저장소가 변경된 메모리 ID를 알려주면 다음 조회 시 해당 행만 갱신합니다.
+"""
+
+from typing import Dict, List, Any, Callable, Optional, Tuple
+import numpy as np
+
+from .time_index import parse_timestamp
+from .ann_index import ANN_ENABLED, ANN_MIN_ROWS, IVFIndex
+
+
+class AgentEmbeddingIndex:
+    # 검색에서 제외할 메모리가 전체 행의 절반을 넘으면 행렬을 다시 구성
+    REBUILD_RATIO = 0.5
+    # 유사도를 계산할 수 없는 메모리의 기본 유사도
+    DEFAULT_SIMILARITY = 0.01
+
+    def __init__(self):
+        """에이전트 임베딩 인덱스 초기화 (실제 구성은 첫 sync 시 수행)"""
+        self.dim = None
+        self.matrix = None                 # (capacity, dim) float32, 정규화된 벡터
+        self.memory_ids = []               # 행 번호 -> 메모리 ID (삭제된 행은 None)
+        self.rows = {}                     # 메모리 ID -> 행 번호
+        self.timestamps = np.zeros(0, dtype=np.int64)  # 행 번호 -> 정수 타임스탬프
+        self.has_vector = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+        self.importance = np.zeros(0, dtype=np.float32)
+
+        self._size = 0
+        self._deleted = 0
+        self._dirty_ids = set()
+        self._needs_rebuild = True
+        self._time_cache = None
+        # 근사 검색 인덱스 (MEMORY_ANN=1이고 행이 충분히 많을 때 sync 시 구성)
+        self.ann: Optional[IVFIndex] = None
+        # 변경이 반영될 때마다 증가 (검색 결과 캐시 무효화용)
+        self.version = 0
+
+    @property
+    def size(self) -> int:
+        """사용 중인 행 수 (삭제된 행 포함)"""
+        return self._size
+
+    def mark_dirty(self, memory_id: str):
+        """메모리가 추가/변경/삭제되었음을 표시"""
+        self._dirty_ids.add(str(memory_id))
+
+    def sync(self, agent_data: Dict[str, Any], read_vector: Callable[[str], Optional[np.ndarray]]):
+        """
+        변경된 메모리만 행렬에 반영
+
+        Args:
+            agent_data: 에이전트의 {"memories": ..., "embeddings": ...} 데이터
+            read_vector: 메모리 ID -> 검색용 임베딩 (feedback 우선, 없으면 event / 없으면 None)
+        """
+        if self._needs_rebuild:
+            self._rebuild(agent_data, read_vector)
+        elif self._dirty_ids:
+            for memory_id in self._dirty_ids:
+                self._refresh_row(memory_id, agent_data, read_vector)
+            if self._deleted > 0 and self._deleted >= self._size * self.REBUILD_RATIO:
+                self._rebuild(agent_data, read_vector)
+        else:
+            return
+        self._dirty_ids.clear()
+        self._time_cache = None
+        self.version += 1
+        self._refresh_ann()
+
+    def _refresh_ann(self):
+        """
+        근사 검색 인덱스 구성/재학습 (MEMORY_ANN=1일 때만)
+
+        벡터가 있는 검색 대상 행이 MEMORY_ANN_MIN_ROWS개 이상이면 처음 한 번 학습하고,
+        이후에는 행 단위로 추가/삭제하다가 학습 시점보다 두 배 이상 늘면 다시 학습합니다.
+        """
+        if not ANN_ENABLED or self.matrix is None:
+            return
+        searchable = np.flatnonzero(self.active[:self._size] & self.has_vector[:self._size])
+        if len(searchable) < ANN_MIN_ROWS:
+            self.ann = None
+        elif self.ann is None or self.ann.needs_retrain(len(searchable)):
+            ann = IVFIndex()
+            ann.train(self.matrix, searchable)
+            self.ann = ann
+
+    def _rebuild(self, agent_data: Dict[str, Any], read_vector: Callable[[str], Optional[np.ndarray]]):
+        """메모리 딕셔너리 순서대로 행렬 전체 재구성"""
+        memories = agent_data.get("memories", {}) or {}
+        capacity = max(len(memories), 16)
+
+        self.matrix = None if self.dim is None else np.zeros((capacity, self.dim), dtype=np.float32)
+        self.memory_ids = []
+        self.rows = {}
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.has_vector = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.importance = np.zeros(capacity, dtype=np.float32)
+        self._size = 0
+        self._deleted = 0
+        self._needs_rebuild = False
+        # 행 번호가 바뀌므로 근사 검색 인덱스는 다음 검색 때 다시 학습
+        self.ann = None
+
+        for memory_id in memories:
+            self._refresh_row(str(memory_id), agent_data, read_vector)
+
+    def _ensure_capacity(self, size: int):
+        """행 배열 크기 확보 (두 배씩 증가)"""
+        capacity = len(self.active)
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2, 16)
+
+        def grow(array):
+            grown = np.zeros((new_capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:capacity] = array
+            return grown
+
+        self.has_vector = grow(self.has_vector)
+        self.active = grow(self.active)
+        self.importance = grow(self.importance)
+        self.timestamps = grow(self.timestamps)
+        if self.matrix is not None:
+            self.matrix = grow(self.matrix)
+
+    def _refresh_row(self, memory_id: str, agent_data: Dict[str, Any], read_vector: Callable[[str], Optional[np.ndarray]]):
+        """메모리 하나의 행 갱신"""
+        memory = (agent_data.get("memories", {}) or {}).get(memory_id)
+
+        # 삭제된 메모리
+        if memory is None:
+            row = self.rows.pop(memory_id, None)
+            if row is not None:
+                self.memory_ids[row] = None
+                self.active[row] = False
+                self.has_vector[row] = False
+                self._deleted += 1
+                if self.ann is not None:
+                    self.ann.remove(row)
+            return
+
+        row = self.rows.get(memory_id)
+        if row is None:
+            row = self._size
+            self._ensure_capacity(row + 1)
+            self.rows[memory_id] = row
+            self.memory_ids.append(memory_id)
+            self._size += 1
+
+        # event와 feedback이 모두 빈 메모리는 검색 대상에서 제외
+        self.active[row] = not (memory.get("event") == "" and memory.get("feedback") == "")
+        self.timestamps[row] = parse_timestamp(memory.get("time", ""))
+        try:
+            self.importance[row] = float(memory.get("importance", 3))
+        except (TypeError, ValueError):
+            self.importance[row] = 3.0
+
+        # feedback 임베딩이 있으면 feedback, 없으면 event 임베딩 사용
+        self.has_vector[row] = False
+        self._set_vector(row, read_vector(memory_id))
+
+        # 근사 검색 인덱스에는 검색 대상이면서 벡터가 있는 행만 유지
+        if self.ann is not None:
+            if self.active[row] and self.has_vector[row]:
+                self.ann.add(row, self.matrix[row])
+            else:
+                self.ann.remove(row)
+
+    def _set_vector(self, row: int, vector: Optional[np.ndarray]):
+        """행의 정규화된 벡터 기록 (벡터가 없거나 차원이 다르면 기록하지 않음)"""
+        if vector is None or vector.ndim != 1:
+            return
+
+        if self.dim is None:
+            self.dim = vector.shape[0]
+            self.matrix = np.zeros((len(self.active), self.dim), dtype=np.float32)
+        if vector.shape != (self.dim,):
+            return
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            self.matrix[row] = vector / norm
+            self.has_vector[row] = True
+
+    def _normalized_query(self, query: Optional[List[float]]) -> Optional[np.ndarray]:
+        """정규화된 쿼리 벡터 (행렬이 없거나 차원이 다르거나 0이면 None)"""
+        if self.matrix is None or query is None:
+            return None
+        query = np.asarray(query, dtype=np.float32)
+        if query.shape != (self.dim,):
+            return None
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        return query / norm
+
+    def similarities(self, query: List[float], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        행과 쿼리 벡터의 코사인 유사도
+
+        Args:
+            query: 쿼리 임베딩
+            rows: 계산할 행 번호 배열 (None이면 모든 행)
+
+        Returns:
+            np.ndarray: 행별 유사도 (계산할 수 없는 행은 DEFAULT_SIMILARITY)
+        """
+        count = self._size if rows is None else len(rows)
+        result = np.full(count, self.DEFAULT_SIMILARITY, dtype=np.float32)
+        query = self._normalized_query(query) if count else None
+        if query is None:
+            return result
+
+        if rows is None:
+            scores = self.matrix[:self._size] @ query
+            mask = self.has_vector[:self._size]
+        else:
+            scores = self.matrix[rows] @ query
+            mask = self.has_vector[rows]
+        result[mask] = scores[mask]
+        return result
+
+    def ann_candidates(self, queries: List[List[float]], count: int) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        근사 검색 인덱스로 쿼리들과 가까운 후보 행 검색
+
+        근사 검색 인덱스가 없으면 (MEMORY_ANN이 꺼져 있거나 벡터가 있는 검색 대상 행이
+        MEMORY_ANN_MIN_ROWS개 미만) None을 반환하며, 이때는 전체 행을 검색합니다.
+
+        Args:
+            queries: 쿼리 임베딩 목록 (이벤트, 상태)
+            count: 쿼리마다 찾을 후보 수
+
+        Returns:
+            Optional[Tuple[np.ndarray, float]]: (후보 행 번호 배열, 경계 유사도) 또는 None
+        """
+        ann = self.ann
+        if ann is None:
+            return None
+
+        normalized = [q for q in (self._normalized_query(query) for query in queries) if q is not None]
+        if not normalized:
+            # 쿼리로 유사도를 계산할 수 없으면 모든 행이 기본 유사도 (후보 없음)
+            return np.zeros(0, dtype=np.int64), self.DEFAULT_SIMILARITY
+        return ann.search(self.matrix, normalized, count)
+
+    def time_ranking(self, horizon: int) -> Dict[str, np.ndarray]:
+        """
+        시간 역순 순위 기반 값 (변경이 없으면 캐시 사용)
+
+        Args:
+            horizon: 시간 가중치를 계산할 최근 순위 범위 (K)
+
+        Returns:
+            Dict: "position" (행별 시간 역순 순위), "weight" (행별 포물선형 시간 가중치)
+        """
+        if self._time_cache is not None and self._time_cache[0] == horizon:
+            return self._time_cache[1]
+
+        active_rows = self.active_rows()
+        # 정수 타임스탬프 내림차순 (같은 시간은 기존 메모리 순서를 유지하는 안정 정렬)
+        active_rows = active_rows[np.argsort(-self.timestamps[active_rows], kind="stable")]
+
+        position = np.full(self._size, self._size, dtype=np.int64)
+        position[active_rows] = np.arange(len(active_rows))
+
+        t = np.minimum(position, horizon) / horizon
+        weight = np.maximum(1.0 - t ** 2, 0.01)
+
+        ranking = {"position": position, "weight": weight}
+        self._time_cache = (horizon, ranking)
+        return ranking
+
+    def active_rows(self) -> np.ndarray:
+        """검색 대상 행 번호 배열"""
+        return np.flatnonzero(self.active[:self._size])
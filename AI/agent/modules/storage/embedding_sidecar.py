@@ -0,0 +1,365 @@
+"""
+임베딩 사이드카 모듈
+
+임베딩 벡터를 JSON 실수 리스트 대신 에이전트별 .npy 파일(memory-mapped)에 저장합니다.
+JSON에는 사이드카 행 번호만 남습니다.
+
+- 메모리: agent/data/embeddings/memories/<에이전트>.npy, shape = (행, 3, dim)
+  (슬롯 순서: event, action, feedback)
+  memories.json의 embeddings[memory_id] = {"row": 행 번호, "fields": [값이 있는 필드], "hashes": {필드: 텍스트 해시}}
+- 반성: agent/data/embeddings/reflections/<에이전트>.npy, shape = (행, 1, dim)
+  reflections.json의 반성 항목에 "embedding" 대신 "embedding_row" (+ "embedding_hash")
+- 텍스트 해시(EmbeddingCache.content_hash)는 벡터를 어떤 텍스트로 만들었는지 기록하며,
+  EmbeddingUpdater가 바뀐 텍스트만 다시 임베딩하는 데 사용 (해시가 없으면 다시 계산)
+"""
+
+import heapq
+import os
+import re
+import threading
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+# 메모리 임베딩 필드 (사이드카 슬롯 순서)
+MEMORY_EMBEDDING_FIELDS = ("event", "action", "feedback")
+
+
+class EmbeddingSidecar:
+    # 새 파일의 초기 행 수
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, directory: str, slots: int):
+        """
+        임베딩 사이드카 초기화
+
+        Args:
+            directory: .npy 파일을 저장할 디렉토리
+            slots: 행 하나에 들어가는 벡터 수
+        """
+        self.directory = str(directory)
+        self.slots = slots
+
+        self._lock = threading.RLock()
+        self._arrays = {}       # 에이전트 -> np.memmap (파일이 없으면 None)
+        self._free_rows = {}    # 에이전트 -> 재사용 가능한 행 (min-heap)
+        self._next_rows = {}    # 에이전트 -> 아직 한 번도 쓰지 않은 첫 행
+
+    def _path(self, agent_name: str) -> str:
+        """에이전트 사이드카 파일 경로"""
+        safe_name = re.sub(r'[^\w\-]', '_', str(agent_name))
+        return os.path.join(self.directory, f"{safe_name}.npy")
+
+    def _array(self, agent_name: str) -> Optional[np.memmap]:
+        """에이전트 사이드카 열기 (없으면 None)"""
+        if agent_name not in self._arrays:
+            path = self._path(agent_name)
+            array = None
+            if os.path.exists(path):
+                try:
+                    array = np.load(path, mmap_mode='r+')
+                    if array.ndim != 3 or array.shape[1] != self.slots:
+                        print(f"⚠️ 임베딩 사이드카 형식이 올바르지 않습니다: {path}")
+                        array = None
+                except Exception as e:
+                    print(f"⚠️ 임베딩 사이드카 로드 실패: {path} ({e})")
+                    array = None
+            self._arrays[agent_name] = array
+        return self._arrays[agent_name]
+
+    def dim(self, agent_name: str) -> Optional[int]:
+        """에이전트 사이드카의 벡터 차원 (아직 파일이 없으면 None)"""
+        array = self._array(agent_name)
+        return None if array is None else array.shape[2]
+
+    def _ensure_row(self, agent_name: str, row: int, dim: int) -> np.memmap:
+        """행이 들어갈 수 있도록 파일 생성 또는 확장"""
+        array = self._array(agent_name)
+        if array is not None and row < array.shape[0]:
+            return array
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(agent_name)
+
+        if array is None:
+            capacity = max(self.INITIAL_CAPACITY, row + 1)
+            array = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(capacity, self.slots, dim))
+            self._arrays[agent_name] = array
+            return array
+
+        # 두 배로 확장한 새 파일을 만든 뒤 교체 (기존 매핑은 교체 전에 닫음)
+        old_capacity = array.shape[0]
+        capacity = max(row + 1, old_capacity * 2)
+        tmp_path = path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(capacity, self.slots, array.shape[2]))
+        grown[:old_capacity] = array
+        grown.flush()
+        del grown
+        self._arrays[agent_name] = None
+        del array
+        os.replace(tmp_path, path)
+
+        array = np.load(path, mmap_mode='r+')
+        self._arrays[agent_name] = array
+        return array
+
+    # ------------------------------------------------------------------
+    # 행 할당
+
+    def set_used_rows(self, agent_name: str, used_rows: Iterable[int], reserved_rows: Iterable[int] = ()):
+        """
+        JSON에서 참조 중인 행을 기준으로 빈 행 목록 재구성
+
+        Args:
+            agent_name: 에이전트 이름
+            used_rows: 사용 중인 행 번호들
+            reserved_rows: 아직 디스크의 스냅샷/로그가 참조하고 있어 나중에 release로 돌려받을 행들
+        """
+        with self._lock:
+            used = set(used_rows) | {row for row in reserved_rows if _is_row(row)}
+            next_row = max(used) + 1 if used else 0
+            free_rows = [row for row in range(next_row) if row not in used]
+            heapq.heapify(free_rows)
+            self._free_rows[agent_name] = free_rows
+            self._next_rows[agent_name] = next_row
+
+    def allocate(self, agent_name: str) -> int:
+        """빈 행 하나 할당"""
+        with self._lock:
+            free_rows = self._free_rows.setdefault(agent_name, [])
+            if free_rows:
+                return heapq.heappop(free_rows)
+            row = self._next_rows.get(agent_name, 0)
+            self._next_rows[agent_name] = row + 1
+            return row
+
+    def release(self, agent_name: str, row: int):
+        """행 반환 (이후 다른 항목이 재사용)"""
+        with self._lock:
+            if not isinstance(row, int) or row < 0:
+                return
+            free_rows = self._free_rows.setdefault(agent_name, [])
+            if row < self._next_rows.get(agent_name, 0) and row not in free_rows:
+                heapq.heappush(free_rows, row)
+
+    # ------------------------------------------------------------------
+    # 읽기 / 쓰기
+
+    def write(self, agent_name: str, row: int, slot: int, vector: List[float]):
+        """
+        벡터 저장
+
+        Args:
+            agent_name: 에이전트 이름
+            row: 행 번호
+            slot: 슬롯 번호
+            vector: 저장할 벡터
+
+        Raises:
+            ValueError: 기존 사이드카와 벡터 차원이 다른 경우
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            dim = self.dim(agent_name)
+            if vector.ndim != 1 or (dim is not None and vector.shape[0] != dim):
+                raise ValueError(f"임베딩 차원 불일치: {vector.shape} (사이드카: {dim})")
+            array = self._ensure_row(agent_name, row, vector.shape[0])
+            array[row, slot] = vector
+
+    def read(self, agent_name: str, row: int, slot: int) -> Optional[np.ndarray]:
+        """
+        벡터 읽기 (복사본)
+
+        Returns:
+            np.ndarray: float32 벡터 (없으면 None)
+        """
+        with self._lock:
+            array = self._array(agent_name)
+            if array is None or not isinstance(row, int) or not 0 <= row < array.shape[0]:
+                return None
+            return np.array(array[row, slot])
+
+    def flush(self, agent_name: str = None):
+        """변경된 내용을 디스크에 기록 (agent_name이 있으면 해당 에이전트 파일만)"""
+        with self._lock:
+            if agent_name is not None:
+                arrays = [self._arrays.get(agent_name)]
+            else:
+                arrays = list(self._arrays.values())
+            for array in arrays:
+                if array is not None:
+                    array.flush()
+
+    def clear(self):
+        """모든 에이전트의 행 할당 초기화 (파일 내용은 이후 덮어씀)"""
+        with self._lock:
+            self._free_rows = {}
+            self._next_rows = {}
+
+
+_sidecars = {}
+_sidecars_lock = threading.Lock()
+
+
+def get_embedding_sidecar(json_file_path: str, slots: int) -> EmbeddingSidecar:
+    """
+    JSON 파일에 대응하는 사이드카를 경로별로 하나씩 공유
+
+    agent/data/memories.json -> agent/data/embeddings/memories/
+
+    Args:
+        json_file_path: 행 번호를 저장하는 JSON 파일 경로
+        slots: 행 하나에 들어가는 벡터 수
+
+    Returns:
+        EmbeddingSidecar: 공유 사이드카
+    """
+    json_file_path = os.path.abspath(str(json_file_path))
+    stem = os.path.splitext(os.path.basename(json_file_path))[0]
+    directory = os.path.join(os.path.dirname(json_file_path), "embeddings", stem)
+    with _sidecars_lock:
+        if directory not in _sidecars:
+            _sidecars[directory] = EmbeddingSidecar(directory, slots)
+        return _sidecars[directory]
+
+
+def _is_row(value: Any) -> bool:
+    """유효한 행 번호인지 여부 (bool 제외)"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def store_memory_embeddings(sidecar: EmbeddingSidecar, agent_name: str, entry: Dict[str, Any], row: int = None) -> Dict[str, Any]:
+    """
+    메모리 임베딩 항목의 벡터를 사이드카에 쓰고 행 참조로 변환
+
+    Args:
+        sidecar: 메모리 사이드카
+        agent_name: 에이전트 이름
+        entry: {"event": [...], "action": [...], "feedback": [...]} (행 참조와 섞여 있어도 됨)
+        row: 사용할 행 번호 (없으면 entry의 행 또는 새 행)
+
+    Returns:
+        Dict: {"row": 행 번호, "fields": [값이 있는 필드]}
+              (entry에 "hashes"가 있으면 값이 있는 필드의 텍스트 해시도 "hashes"로 유지)
+    """
+    if row is None:
+        row = entry.get("row") if _is_row(entry.get("row")) else sidecar.allocate(agent_name)
+    fields = list(entry.get("fields", [])) if "row" in entry else []
+
+    for slot, field in enumerate(MEMORY_EMBEDDING_FIELDS):
+        vector = entry.get(field)
+        if not isinstance(vector, list):
+            continue
+        if field in fields:
+            fields.remove(field)
+        if not vector:
+            continue
+        try:
+            sidecar.write(agent_name, row, slot, vector)
+            fields.append(field)
+        except ValueError as e:
+            print(f"⚠️ {agent_name}의 {field} 임베딩을 저장하지 못했습니다: {e}")
+
+    result = {"row": row, "fields": fields}
+    hashes = entry.get("hashes")
+    if isinstance(hashes, dict):
+        hashes = {field: value for field, value in hashes.items() if field in fields}
+        if hashes:
+            result["hashes"] = hashes
+    return result
+
+
+def externalize_memory_embeddings(sidecar: EmbeddingSidecar, data: Dict[str, Any], reserved_rows: Dict[str, Iterable[int]] = None) -> bool:
+    """
+    전체 메모리 데이터의 리스트 임베딩을 사이드카 행 참조로 변환 (제자리 수정)
+
+    이미 행 참조인 항목은 그대로 두고, 참조되지 않는 행은 재사용 대상으로 돌립니다.
+
+    Args:
+        sidecar: 메모리 사이드카
+        data: 전체 메모리 데이터
+        reserved_rows: 에이전트 -> 재사용하면 안 되는 행 (교체 전 데이터가 참조하던 행, 기록 후 release로 반환)
+
+    Returns:
+        bool: 변환된 항목이 있는지 여부
+    """
+    changed = False
+    for agent_name, agent_data in data.items():
+        if not isinstance(agent_data, dict) or not isinstance(agent_data.get("embeddings"), dict):
+            continue
+        embeddings = agent_data["embeddings"]
+
+        # 1) 행 참조 수집 (같은 행을 가리키는 중복 참조는 새 행을 받도록 제외)
+        used_rows = set()
+        needs_row = []
+        for memory_id, entry in embeddings.items():
+            if not isinstance(entry, dict):
+                continue
+            row = entry.get("row")
+            if _is_row(row) and row not in used_rows:
+                used_rows.add(row)
+                if any(isinstance(entry.get(field), list) for field in MEMORY_EMBEDDING_FIELDS):
+                    needs_row.append((memory_id, row))
+            else:
+                needs_row.append((memory_id, None))
+        sidecar.set_used_rows(agent_name, used_rows, (reserved_rows or {}).get(agent_name, ()))
+
+        # 2) 리스트 임베딩을 사이드카로 이동
+        for memory_id, row in needs_row:
+            entry = embeddings[memory_id]
+            if row is None:
+                entry = {key: value for key, value in entry.items() if key not in ("row", "fields")}
+            embeddings[memory_id] = store_memory_embeddings(sidecar, agent_name, entry, row)
+            changed = True
+    return changed
+
+
+def externalize_reflection_embeddings(sidecar: EmbeddingSidecar, data: Dict[str, Any]) -> bool:
+    """
+    반성 데이터의 "embedding" 리스트를 사이드카 행("embedding_row")으로 변환 (제자리 수정)
+
+    Args:
+        sidecar: 반성 사이드카
+        data: 전체 반성 데이터
+
+    Returns:
+        bool: 변환된 항목이 있는지 여부
+    """
+    changed = False
+    for agent_name, agent_data in data.items():
+        if not isinstance(agent_data, dict) or not isinstance(agent_data.get("reflections"), list):
+            continue
+        reflections = agent_data["reflections"]
+
+        used_rows = set()
+        needs_row = []
+        for reflection in reflections:
+            if not isinstance(reflection, dict):
+                continue
+            row = reflection.get("embedding_row")
+            if _is_row(row) and row not in used_rows:
+                used_rows.add(row)
+                if "embedding" in reflection:
+                    needs_row.append((reflection, row))
+            elif "embedding" in reflection or "embedding_row" in reflection:
+                needs_row.append((reflection, None))
+        sidecar.set_used_rows(agent_name, used_rows)
+
+        for reflection, row in needs_row:
+            vector = reflection.pop("embedding", None)
+            if not isinstance(vector, list) or not vector:
+                reflection.pop("embedding_row", None)
+                reflection.pop("embedding_hash", None)
+                changed = True
+                continue
+            if row is None:
+                row = sidecar.allocate(agent_name)
+            try:
+                sidecar.write(agent_name, row, 0, vector)
+                reflection["embedding_row"] = row
+            except ValueError as e:
+                print(f"⚠️ {agent_name}의 반성 임베딩을 저장하지 못했습니다: {e}")
+                reflection.pop("embedding_row", None)
+                reflection.pop("embedding_hash", None)
+            changed = True
+    return changed
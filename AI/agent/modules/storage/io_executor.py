@@ -0,0 +1,52 @@
+"""
+저장소 I/O 실행기 모듈
+
+파일 읽기/쓰기와 JSON 직렬화처럼 블로킹되는 작업을 전용 스레드 풀에서 실행하여
+FastAPI 이벤트 루프가 디스크 작업 때문에 멈추지 않도록 합니다.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# 저장소 I/O 전용 스레드 수 (환경 변수로 변경 가능)
+STORAGE_IO_WORKERS = int(os.environ.get("STORAGE_IO_WORKERS", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """저장소 I/O 스레드 풀 (처음 사용할 때 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=STORAGE_IO_WORKERS, thread_name_prefix="storage-io")
+        return _executor
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    블로킹 함수를 저장소 I/O 스레드 풀에서 실행하고 결과를 기다림
+
+    Args:
+        func: 실행할 블로킹 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        Any: 함수 반환값 (예외는 그대로 전달)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor(wait: bool = True):
+    """스레드 풀 종료 (진행 중인 기록은 끝날 때까지 대기)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
@@ -0,0 +1,75 @@
+"""
+에이전트별 위치 메모리 인덱스 모듈
+
+(event_type, event_location) -> 메모리 ID 집합을 유지하여, 위치 정보를 덮어쓸 때
+에이전트의 모든 메모리를 훑지 않고 같은 위치/종류의 기존 메모리를 바로 찾습니다.
+메모리 저장소가 변경된 메모리 ID를 알려주면 다음 조회 시 해당 항목만 갱신합니다.
+"""
+
+from typing import Dict, Any, Hashable, Optional, Set, Tuple
+
+
+def location_key(memory: Dict[str, Any]) -> Optional[Tuple[Hashable, Hashable]]:
+    """메모리의 (event_type, event_location) 키 (해시할 수 없는 값이면 None)"""
+    key = (memory.get("event_type"), memory.get("event_location"))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class AgentLocationIndex:
+    def __init__(self):
+        """에이전트 위치 인덱스 초기화 (실제 구성은 첫 sync 시 수행)"""
+        self._ids: Dict[Tuple[Hashable, Hashable], Set[str]] = {}
+        self._keys: Dict[str, Tuple[Hashable, Hashable]] = {}
+        self._dirty_ids = set()
+        self._needs_rebuild = True
+
+    def mark_dirty(self, memory_id: str):
+        """메모리가 추가/변경/삭제되었음을 표시"""
+        self._dirty_ids.add(str(memory_id))
+
+    def sync(self, agent_data: Dict[str, Any]):
+        """
+        변경된 메모리만 인덱스에 반영
+
+        Args:
+            agent_data: 에이전트의 {"memories": ..., "embeddings": ...} 데이터
+        """
+        memories = agent_data.get("memories", {}) or {}
+        if self._needs_rebuild:
+            self._ids = {}
+            self._keys = {}
+            self._needs_rebuild = False
+            for memory_id, memory in memories.items():
+                self._update(str(memory_id), memory)
+        else:
+            for memory_id in self._dirty_ids:
+                self._update(memory_id, memories.get(memory_id))
+        self._dirty_ids.clear()
+
+    def _update(self, memory_id: str, memory: Optional[Dict[str, Any]]):
+        """메모리 하나의 항목 갱신"""
+        key = location_key(memory) if isinstance(memory, dict) else None
+        old_key = self._keys.get(memory_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            ids = self._ids.get(old_key)
+            if ids is not None:
+                ids.discard(memory_id)
+                if not ids:
+                    del self._ids[old_key]
+            del self._keys[memory_id]
+        if key is not None:
+            self._ids.setdefault(key, set()).add(memory_id)
+            self._keys[memory_id] = key
+
+    def memory_ids(self, event_type: Any, event_location: Any) -> Set[str]:
+        """event_type과 event_location이 같은 메모리 ID 집합 (복사본)"""
+        try:
+            return set(self._ids.get((event_type, event_location), ()))
+        except TypeError:
+            return set()
@@ -0,0 +1,217 @@
+"""
+append-only 메모리 로그 모듈
+
+memories.json(스냅샷)과 memories.log.jsonl(변경 로그)로 메모리를 저장합니다.
+새 메모리, 피드백 갱신, 임베딩 갱신은 로그에 한 줄씩 추가하고,
+로그가 일정 개수 이상 쌓이면 전체 데이터를 스냅샷으로 압축한 뒤 로그를 비웁니다.
+fsync=True이면 기록한 파일(과 스냅샷을 교체한 디렉토리)을 fsync한 뒤 반환하여,
+전원이 꺼지거나 OS가 멈춰도 반환된 변경은 남습니다.
+"""
+
+import json
+import os
+from typing import Dict, List, Any
+
+
+class MemoryLog:
+    # 로그 레코드가 이 개수 이상 쌓이면 스냅샷으로 압축
+    COMPACT_THRESHOLD = 500
+
+    def __init__(self, snapshot_path: str, log_path: str = None, compact_threshold: int = None, fsync: bool = False):
+        """
+        메모리 로그 초기화
+
+        Args:
+            snapshot_path: 스냅샷 JSON 파일 경로 (memories.json)
+            log_path: 로그 파일 경로 (기본값: <스냅샷 이름>.log.jsonl)
+            compact_threshold: 압축 기준 레코드 수
+            fsync: 기록 후 fsync 여부 (MEMORY_DURABILITY=sync)
+        """
+        self.snapshot_path = str(snapshot_path)
+        if log_path is None:
+            log_path = os.path.splitext(self.snapshot_path)[0] + ".log.jsonl"
+        self.log_path = str(log_path)
+        self.compact_threshold = compact_threshold or self.COMPACT_THRESHOLD
+        self.fsync = fsync
+
+        # 마지막 압축 이후 로그에 기록된 레코드 수
+        self.pending_records = 0
+
+    def load(self) -> Dict[str, Any]:
+        """
+        스냅샷을 읽고 로그를 재생하여 현재 메모리 데이터를 복원
+
+        Returns:
+            Dict[str, Any]: 메모리 데이터
+        """
+        data = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        replayed = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 도중 종료되어 잘린 마지막 줄 등은 건너뜀
+                        print(f"⚠️ 메모리 로그 {line_no}번째 줄을 읽을 수 없어 건너뜁니다.")
+                        continue
+                    self.apply_record(data, record)
+                    replayed += 1
+
+        self.pending_records = replayed
+        return data
+
+    def append(self, records: List[Dict[str, Any]]):
+        """
+        변경 레코드를 로그 파일 끝에 추가
+
+        Args:
+            records: 추가할 레코드 목록
+        """
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._sync_file(f)
+        self.pending_records += len(records)
+
+    def needs_compaction(self) -> bool:
+        """압축이 필요한지 여부"""
+        return self.pending_records >= self.compact_threshold
+
+    def compact(self, data: Dict[str, Any]):
+        """
+        전체 데이터를 스냅샷으로 저장하고 로그를 비움
+
+        스냅샷은 임시 파일에 쓴 뒤 교체하므로 중간에 종료되어도 기존 스냅샷이 보존됩니다.
+        스냅샷 교체 후 로그를 비우기 전에 종료되더라도 로그 레코드는 다시 적용해도
+        같은 결과가 되므로 데이터가 어긋나지 않습니다.
+
+        Args:
+            data: 저장할 전체 메모리 데이터
+        """
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            self._sync_file(f)
+        os.replace(tmp_path, self.snapshot_path)
+        # 교체된 디렉토리 항목까지 기록해야 스냅샷 교체가 유지됨
+        self._sync_directory(self.snapshot_path)
+
+        with open(self.log_path, 'w', encoding='utf-8') as f:
+            self._sync_file(f)
+        self.pending_records = 0
+
+    def _sync_file(self, f):
+        """fsync 모드이면 파일 내용을 디스크에 기록"""
+        if not self.fsync:
+            return
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _sync_directory(self, path: str):
+        """fsync 모드이면 파일이 있는 디렉토리 항목을 디스크에 기록 (디렉토리를 열 수 없는 OS에서는 건너뜀)"""
+        if not self.fsync:
+            return
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def remove(self):
+        """스냅샷과 로그 파일 삭제"""
+        for path in (self.snapshot_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._sync_directory(self.snapshot_path)
+        self.pending_records = 0
+
+    @staticmethod
+    def apply_record(data: Dict[str, Any], record: Dict[str, Any]):
+        """
+        레코드 하나를 메모리 데이터에 적용
+
+        Args:
+            data: 메모리 데이터 (직접 수정됨)
+            record: 적용할 레코드
+                - put_memory: 메모리 전체 저장 (embeddings 포함 가능)
+                - update_memory: 메모리 일부 필드 갱신
+                - put_embedding: 메모리의 특정 임베딩 필드 저장
+                  (벡터 대신 사이드카 행 번호("row", "present")가 올 수 있음,
+                   "hash"가 있으면 필드의 텍스트 해시로 기록하고 없으면 기존 해시 제거)
+                - delete_memory: 메모리와 임베딩 삭제
+        """
+        op = record.get("op")
+        agent_name = record.get("agent")
+        memory_id = str(record.get("memory_id", ""))
+
+        if agent_name not in data:
+            data[agent_name] = {"memories": {}, "embeddings": {}}
+        agent_data = data[agent_name]
+        if "memories" not in agent_data:
+            agent_data["memories"] = {}
+        if "embeddings" not in agent_data:
+            agent_data["embeddings"] = {}
+
+        if op == "put_memory":
+            agent_data["memories"][memory_id] = record.get("memory", {})
+            if "embeddings" in record:
+                agent_data["embeddings"][memory_id] = record["embeddings"]
+        elif op == "update_memory":
+            if memory_id not in agent_data["memories"]:
+                agent_data["memories"][memory_id] = {}
+            agent_data["memories"][memory_id].update(record.get("fields", {}))
+        elif op == "put_embedding" and "row" in record:
+            # 벡터는 사이드카에 있고 행 참조만 갱신
+            entry = agent_data["embeddings"].get(memory_id)
+            if not isinstance(entry, dict) or "row" not in entry:
+                entry = {"row": record["row"], "fields": []}
+            field = record.get("field", "event")
+            fields = [name for name in entry.get("fields", []) if name != field]
+            hashes = {name: value for name, value in (entry.get("hashes") or {}).items() if name != field}
+            if record.get("present"):
+                fields.append(field)
+                if record.get("hash"):
+                    hashes[field] = record["hash"]
+            entry = {"row": record["row"], "fields": fields}
+            if hashes:
+                entry["hashes"] = hashes
+            agent_data["embeddings"][memory_id] = entry
+        elif op == "put_embedding":
+            if memory_id not in agent_data["embeddings"]:
+                agent_data["embeddings"][memory_id] = {
+                    "event": [],
+                    "action": [],
+                    "feedback": []
+                }
+            entry = agent_data["embeddings"][memory_id]
+            field = record.get("field", "event")
+            entry[field] = record.get("vector", [])
+            hashes = {name: value for name, value in (entry.get("hashes") or {}).items() if name != field}
+            if record.get("hash") and entry[field]:
+                hashes[field] = record["hash"]
+            if hashes:
+                entry["hashes"] = hashes
+            else:
+                entry.pop("hashes", None)
+        elif op == "delete_memory":
+            agent_data["memories"].pop(memory_id, None)
+            agent_data["embeddings"].pop(memory_id, None)
+        else:
+            print(f"⚠️ 알 수 없는 메모리 로그 레코드: {op}")
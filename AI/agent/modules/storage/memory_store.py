@@ -0,0 +1,806 @@
+"""
+상주 메모리 저장소 모듈
+
+서버 시작 시 에이전트별 메모리 샤드(memories/<에이전트>.json + 변경 로그)를 한 번만 읽어
+메모리에 올려두고, 모든 모듈이 같은 데이터를 공유합니다. 변경 사항은 메모리에 바로 반영하고
+디스크에는 write-behind 방식(dirty 플래그 + 디바운스 타이머)으로 모아서 에이전트별로 기록합니다.
+기존 단일 memories.json(+ memories.log.jsonl)이 있으면 처음 열 때 샤드로 나눕니다.
+SQLite 백엔드(STORAGE_BACKEND=sqlite)에서는 샤드 파일 대신 데이터베이스의 메모리 행을 갱신합니다.
+날짜/위치별 조회는 두 백엔드 모두 상주 데이터 위의 시간/위치 인덱스로 처리합니다.
+
+디스크 기록 방식(MEMORY_DURABILITY):
+- group (기본값): 변경을 메모리에 반영하면 바로 반환하고, 짧은 타이머 또는 대기 레코드 수 기준으로
+  그동안 쌓인 변경을 에이전트별로 한 번에 기록 (group commit)
+- sync: 변경을 디스크에 기록하고 fsync(로그 파일, 스냅샷 임시 파일과 디렉토리)한 뒤 반환.
+  같은 에이전트에 동시에 들어온 변경은 먼저 기록하는 쪽이 함께 기록
+  (SQLite 백엔드는 데이터베이스의 synchronous 설정을 따름)
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .memory_log import MemoryLog
+from .agent_locks import AgentLocks
+from .sharded_json import shard_directory, shard_path
+from .backend import get_database
+from .sqlite_store import SQLiteDatabase
+from .embedding_index import AgentEmbeddingIndex
+from .time_index import AgentTimeIndex, MIN_TIMESTAMP, format_date
+from .location_index import AgentLocationIndex
+from .embedding_sidecar import (
+    MEMORY_EMBEDDING_FIELDS,
+    get_embedding_sidecar,
+    store_memory_embeddings,
+    externalize_memory_embeddings
+)
+
+DURABILITY_MODES = ("group", "sync")
+DURABILITY_MODE = os.environ.get("MEMORY_DURABILITY", "group").strip().lower()
+MEMORY_FLUSH_DELAY = float(os.environ.get("MEMORY_FLUSH_DELAY", "1.0"))
+MEMORY_MAX_FLUSH_DELAY = float(os.environ.get("MEMORY_MAX_FLUSH_DELAY", "5.0"))
+MEMORY_FLUSH_MAX_RECORDS = int(os.environ.get("MEMORY_FLUSH_MAX_RECORDS", "256"))
+
+
+class MemoryStore:
+    # 마지막 변경 후 이 시간(초) 동안 추가 변경이 없으면 디스크에 기록
+    FLUSH_DELAY = MEMORY_FLUSH_DELAY
+    # 변경이 계속 들어와도 첫 변경 후 이 시간(초)이 지나면 기록
+    MAX_FLUSH_DELAY = MEMORY_MAX_FLUSH_DELAY
+    # 기록 대기 레코드가 이 수에 이르면 타이머를 기다리지 않고 바로 기록
+    FLUSH_MAX_RECORDS = MEMORY_FLUSH_MAX_RECORDS
+
+    def __init__(self, memory_file_path: str, flush_delay: float = None, max_flush_delay: float = None,
+                 database: Optional[SQLiteDatabase] = None, durability: str = None, flush_max_records: int = None):
+        """
+        메모리 저장소 초기화
+
+        Args:
+            memory_file_path: 메모리 JSON 파일 경로 (샤드는 확장자를 뺀 디렉토리에 저장)
+            flush_delay: 디바운스 시간 (초)
+            max_flush_delay: 최대 기록 지연 시간 (초)
+            database: SQLite 데이터베이스 (지정하면 샤드 파일 대신 데이터베이스에 기록)
+            durability: 디스크 기록 방식 ("group" 또는 "sync", None이면 MEMORY_DURABILITY)
+            flush_max_records: 바로 기록할 대기 레코드 수
+        """
+        self.memory_file_path = str(memory_file_path)
+        self.database = database
+        # 에이전트별 샤드: memories/<에이전트>.json (스냅샷) + memories/<에이전트>.log.jsonl (변경 로그)
+        self.shard_dir = shard_directory(self.memory_file_path)
+        self._logs = {}
+        # 임베딩 벡터는 사이드카(.npy)에 두고 JSON에는 행 번호만 저장
+        self.sidecar = get_embedding_sidecar(self.memory_file_path, len(MEMORY_EMBEDDING_FIELDS))
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None else flush_delay
+        self.max_flush_delay = self.MAX_FLUSH_DELAY if max_flush_delay is None else max_flush_delay
+        self.flush_max_records = flush_max_records or self.FLUSH_MAX_RECORDS
+        self.durability = (durability or DURABILITY_MODE).strip().lower()
+        if self.durability not in DURABILITY_MODES:
+            print(f"⚠️ 알 수 없는 메모리 기록 방식입니다: {self.durability} (group 사용)")
+            self.durability = "group"
+
+        self._lock = threading.RLock()
+        # 디스크 기록은 에이전트별로 하나씩 (데이터 락과 분리하여 기록 중에도 조회/변경 가능,
+        # 다른 에이전트의 기록과는 동시에 진행)
+        self._flush_locks = AgentLocks()
+        # 같은 에이전트의 읽기-수정-쓰기 묶음용 락
+        self._agent_locks = AgentLocks()
+        self._data = self._load()
+        self._next_ids = {}
+        # 에이전트별 임베딩 행렬, 시간 인덱스, 위치 인덱스 (첫 조회 시 구성)
+        self._embedding_indexes = {}
+        self._time_indexes = {}
+        self._location_indexes = {}
+
+        # write-behind 상태 (에이전트별)
+        self._pending_records = {}      # 에이전트 -> 기록 대기 레코드
+        # 에이전트 -> 삭제가 아직 기록되지 않아 재사용하면 안 되는 사이드카 행
+        # (기록 전에 종료되면 삭제된 메모리가 로그에서 되살아나므로 기록 후에 반환)
+        self._pending_free_rows = {}
+        # 에이전트 -> 데이터 교체 횟수 (교체 전에 시작된 기록은 새 할당 기준에 행을 반환하지 않음)
+        self._row_generations = {}
+        self._dirty_agents = set()      # 스냅샷을 다시 써야 하는 에이전트
+        self._removed_agents = set()    # 샤드를 지워야 하는 에이전트
+        self._dirty_since = None
+        self._timer = None
+        self._pending_count = 0
+        # 기록 통계 (변경 레코드 수 대비 실제 기록 횟수)
+        self._applied_records = 0
+        self._flushes = 0
+        self._written_records = 0
+
+        # 기존 JSON 실수 리스트 임베딩이 있었다면 사이드카로 옮긴 스냅샷을 다시 기록
+        if self._migrated:
+            print("📦 메모리 임베딩을 사이드카 파일로 옮겼습니다. 스냅샷을 다시 기록합니다.")
+            self._dirty_agents.update(self._data.keys())
+            self.flush()
+
+        atexit.register(self.flush)
+
+    def _load(self) -> Dict[str, Any]:
+        """디스크에서 메모리 데이터 로드"""
+        self._migrated = False
+        if self.database is not None:
+            return self._load_from_database()
+        try:
+            self._migrate_legacy_files()
+            data = {}
+            for snapshot_path in _shard_snapshot_paths(self.shard_dir):
+                log = MemoryLog(snapshot_path, fsync=self.durability == "sync")
+                for agent_name, agent_data in log.load().items():
+                    data[agent_name] = agent_data
+                    self._logs[agent_name] = log
+            self._migrated = externalize_memory_embeddings(self.sidecar, data)
+            return data
+        except Exception as e:
+            print(f"메모리 로드 중 오류 발생: {e}")
+            return {
+                "Tom": {
+                    "memories": {},
+                    "embeddings": {}
+                },
+                "Jane": {
+                    "memories": {},
+                    "embeddings": {}
+                }
+            }
+
+    def _load_from_database(self) -> Dict[str, Any]:
+        """
+        SQLite에서 메모리 데이터 로드
+
+        데이터베이스의 BLOB 임베딩을 사이드카에 올려 검색용 행렬을 구성합니다.
+        (사이드카는 데이터베이스에서 다시 만들 수 있는 작업용 사본)
+        """
+        data = self.database.load_memories()
+        if not data and os.path.isdir(self.shard_dir):
+            print(f"⚠️ SQLite에 메모리가 없습니다. 기존 JSON 데이터는 migrate_to_sqlite.py로 가져올 수 있습니다: {self.shard_dir}")
+        self.sidecar.clear()
+        externalize_memory_embeddings(self.sidecar, data)
+        return data
+
+    def _migrate_legacy_files(self):
+        """기존 단일 memories.json(+ 변경 로그)을 에이전트별 샤드로 나눔 (이미 있는 샤드는 덮어쓰지 않음)"""
+        legacy_log = MemoryLog(self.memory_file_path)
+        legacy_paths = [path for path in (legacy_log.snapshot_path, legacy_log.log_path) if os.path.exists(path)]
+        if not legacy_paths:
+            return
+
+        for agent_name, agent_data in legacy_log.load().items():
+            log = MemoryLog(shard_path(self.shard_dir, agent_name))
+            if not os.path.exists(log.snapshot_path) and not os.path.exists(log.log_path):
+                log.compact({agent_name: agent_data})
+
+        # 샤드를 모두 쓴 뒤에 기존 파일 이름을 바꿈 (중간에 종료되면 다음 시작 때 다시 나눔)
+        for path in legacy_paths:
+            os.replace(path, path + ".migrated")
+        print(f"📦 {os.path.basename(self.memory_file_path)}을(를) 에이전트별 파일로 나눴습니다: {self.shard_dir}")
+
+    def _log_for(self, agent_name: str) -> MemoryLog:
+        """에이전트 샤드 로그 (락을 잡은 상태에서 호출)"""
+        log = self._logs.get(agent_name)
+        if log is None:
+            log = MemoryLog(shard_path(self.shard_dir, agent_name), fsync=self.durability == "sync")
+            self._logs[agent_name] = log
+        return log
+
+    def exists(self) -> bool:
+        """디스크에 메모리 데이터가 만들어졌는지 여부 (샤드 디렉토리 또는 데이터베이스의 에이전트)"""
+        if self.database is not None:
+            return bool(self._data)
+        return os.path.isdir(self.shard_dir)
+
+    def agent_lock(self, agent_name: str) -> threading.RLock:
+        """
+        같은 에이전트의 읽기-수정-쓰기(조회 후 덮어쓰기 등)를 묶을 때 사용하는 락
+
+        다른 에이전트의 작업은 이 락을 기다리지 않습니다.
+        """
+        return self._agent_locks.get(agent_name)
+
+    # ------------------------------------------------------------------
+    # 읽기
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        상주 중인 전체 메모리 데이터
+
+        복사본이 아니므로 읽기 전용으로만 사용해야 합니다.
+        변경은 apply() / replace_all()을 통해서만 합니다.
+        """
+        return self._data
+
+    def get_agent(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """에이전트의 {"memories": ..., "embeddings": ...} 데이터 (읽기 전용)"""
+        return self._data.get(agent_name)
+
+    def get_memory(self, agent_name: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """메모리 하나 조회 (읽기 전용)"""
+        agent_data = self._data.get(agent_name)
+        if not agent_data:
+            return None
+        return agent_data.get("memories", {}).get(str(memory_id))
+
+    def snapshot(self, agent_name: str = None) -> Dict[str, Any]:
+        """
+        호출자가 자유롭게 수정할 수 있는 데이터 복사본
+
+        메모리/임베딩 딕셔너리까지 복사하고, 임베딩 벡터 리스트는 공유합니다.
+        (벡터는 항상 새 리스트로 교체될 뿐 제자리에서 수정되지 않음)
+
+        Args:
+            agent_name: 지정하면 해당 에이전트만 복사 ({에이전트: 데이터}, 없으면 빈 딕셔너리)
+        """
+        with self._lock:
+            if agent_name is not None:
+                if agent_name not in self._data:
+                    return {}
+                return {agent_name: self._copy_agent_data(self._data[agent_name])}
+            return {
+                name: self._copy_agent_data(agent_data)
+                for name, agent_data in self._data.items()
+            }
+
+    @staticmethod
+    def _copy_agent_data(agent_data: Any) -> Any:
+        """에이전트 데이터 복사 (메모리/임베딩 딕셔너리까지)"""
+        if not isinstance(agent_data, dict):
+            return agent_data
+        copied = {}
+        for key, value in agent_data.items():
+            if key in ("memories", "embeddings") and isinstance(value, dict):
+                copied[key] = {
+                    item_id: dict(item) if isinstance(item, dict) else item
+                    for item_id, item in value.items()
+                }
+            else:
+                copied[key] = value
+        return copied
+
+    def next_memory_id(self, agent_name: str) -> str:
+        """
+        에이전트의 새 메모리 ID 예약 (현재 가장 큰 ID + 1)
+
+        호출할 때마다 다음 ID를 예약하므로, 같은 에이전트의 메모리를 여러 스레드에서
+        동시에 저장해도 ID가 겹쳐 서로 덮어쓰지 않습니다.
+        """
+        with self._lock:
+            if agent_name not in self._next_ids:
+                agent_data = self._data.get(agent_name) or {}
+                max_id = 0
+                for memory_id in agent_data.get("memories", {}):
+                    try:
+                        max_id = max(max_id, int(memory_id))
+                    except ValueError:
+                        continue
+                self._next_ids[agent_name] = max_id + 1
+            memory_id = self._next_ids[agent_name]
+            self._next_ids[agent_name] = memory_id + 1
+            return str(memory_id)
+
+    # ------------------------------------------------------------------
+    # 인덱스 조회
+
+    def _time_index(self, agent_name: str) -> Optional[AgentTimeIndex]:
+        """에이전트 시간 인덱스 (락을 잡은 상태에서 호출, 변경된 메모리만 반영)"""
+        agent_data = self._data.get(agent_name)
+        if not agent_data:
+            return None
+        index = self._time_indexes.get(agent_name)
+        if index is None:
+            index = AgentTimeIndex()
+            self._time_indexes[agent_name] = index
+        index.sync(agent_data)
+        return index
+
+    def memory_ids_on_date(self, agent_name: str, date_str: str) -> List[str]:
+        """해당 날짜(YYYY.MM.DD)의 메모리 ID (시간순, 시간 인덱스 이분 탐색)"""
+        with self._lock:
+            index = self._time_index(agent_name)
+            return index.on_date(date_str) if index is not None else []
+
+    def latest_memory_ids(self, agent_name: str, count: int) -> List[str]:
+        """가장 최근 메모리 ID count개 (최신순)"""
+        with self._lock:
+            index = self._time_index(agent_name)
+            return index.latest(count) if index is not None else []
+
+    def memory_ids_newest_first(self, agent_name: str) -> List[str]:
+        """에이전트의 모든 메모리 ID (최신순, 같은 시간은 먼저 추가된 메모리 우선)"""
+        with self._lock:
+            index = self._time_index(agent_name)
+            return list(index.newest_first()) if index is not None else []
+
+    def latest_memory_date(self) -> str:
+        """
+        모든 에이전트 메모리 중 가장 늦은 날짜
+
+        Returns:
+            str: 'YYYY.MM.DD' (시간을 알 수 있는 메모리가 없으면 빈 문자열)
+        """
+        with self._lock:
+            latest = MIN_TIMESTAMP
+            for agent_name in self._data:
+                index = self._time_index(agent_name)
+                if index is not None:
+                    latest = max(latest, index.latest_timestamp())
+            return format_date(latest) if latest > MIN_TIMESTAMP else ""
+
+    def location_memory_ids(self, agent_name: str, event_type: str, event_location: str) -> List[str]:
+        """
+        event_type과 event_location이 같은 메모리 ID (최신순, 위치 인덱스로 바로 조회)
+
+        Returns:
+            List[str]: 메모리 ID 목록 (같은 시간은 먼저 추가된 메모리 우선)
+        """
+        with self._lock:
+            agent_data = self._data.get(agent_name)
+            if not agent_data:
+                return []
+            index = self._location_indexes.get(agent_name)
+            if index is None:
+                index = AgentLocationIndex()
+                self._location_indexes[agent_name] = index
+            index.sync(agent_data)
+            memory_ids = index.memory_ids(event_type, event_location)
+            if len(memory_ids) <= 1:
+                return list(memory_ids)
+            time_index = self._time_index(agent_name)
+            return sorted(memory_ids, key=time_index.sort_key, reverse=True)
+
+    def _read_entry_vector(self, agent_name: str, entry: Any, field: str) -> Optional[np.ndarray]:
+        """임베딩 항목(행 참조)에서 필드 벡터 읽기"""
+        if not isinstance(entry, dict) or field not in entry.get("fields", []):
+            return None
+        return self.sidecar.read(agent_name, entry.get("row"), MEMORY_EMBEDDING_FIELDS.index(field))
+
+    def get_embeddings(self, agent_name: str, memory_id: str) -> Dict[str, List[float]]:
+        """
+        메모리 하나의 임베딩을 리스트 형태로 조회
+
+        Returns:
+            Dict: {"event": [...], "action": [...], "feedback": [...]} (값이 없는 필드는 [], 항목이 없으면 {})
+        """
+        with self._lock:
+            agent_data = self._data.get(agent_name) or {}
+            entry = agent_data.get("embeddings", {}).get(str(memory_id))
+            if not entry:
+                return {}
+            result = {}
+            for field in MEMORY_EMBEDDING_FIELDS:
+                vector = self._read_entry_vector(agent_name, entry, field)
+                result[field] = [] if vector is None else vector.tolist()
+            return result
+
+    def get_embedding_index(self, agent_name: str) -> Optional[AgentEmbeddingIndex]:
+        """
+        에이전트의 임베딩 행렬 (변경된 메모리만 반영한 최신 상태)
+
+        Args:
+            agent_name: 에이전트 이름
+
+        Returns:
+            AgentEmbeddingIndex: 임베딩 인덱스 (에이전트가 없으면 None)
+        """
+        with self._lock:
+            agent_data = self._data.get(agent_name)
+            if not agent_data:
+                return None
+            index = self._embedding_indexes.get(agent_name)
+            if index is None:
+                index = AgentEmbeddingIndex()
+                self._embedding_indexes[agent_name] = index
+            embeddings = agent_data.get("embeddings", {}) or {}
+
+            def read_vector(memory_id):
+                entry = embeddings.get(memory_id)
+                vector = self._read_entry_vector(agent_name, entry, "feedback")
+                if vector is None:
+                    vector = self._read_entry_vector(agent_name, entry, "event")
+                return vector
+
+            index.sync(agent_data, read_vector)
+            return index
+
+    # ------------------------------------------------------------------
+    # 쓰기
+
+    def apply(self, records: List[Dict[str, Any]]):
+        """
+        변경 레코드를 메모리에 반영하고 디스크 기록을 예약
+
+        Args:
+            records: MemoryLog 레코드 목록
+        """
+        if not records:
+            return
+        with self._lock:
+            self._applied_records += len(records)
+            records = [self._externalize_record(record) for record in records]
+            for record in records:
+                released_row = None
+                if record.get("op") == "delete_memory":
+                    entry = (self._data.get(record.get("agent")) or {}).get("embeddings", {}).get(str(record.get("memory_id", "")))
+                    if isinstance(entry, dict):
+                        released_row = entry.get("row")
+                MemoryLog.apply_record(self._data, record)
+                if released_row is not None:
+                    self._pending_free_rows.setdefault(record.get("agent"), []).append(released_row)
+                self._track_memory_id(record)
+                for indexes in (self._embedding_indexes, self._time_indexes, self._location_indexes):
+                    index = indexes.get(record.get("agent"))
+                    if index is not None:
+                        index.mark_dirty(record.get("memory_id", ""))
+                self._pending_records.setdefault(record.get("agent"), []).append(record)
+                self._pending_count += 1
+            agents = {record.get("agent") for record in records}
+            if self.durability != "sync":
+                self._schedule_flush()
+
+        if self.durability == "sync":
+            # 같은 에이전트에 동시에 들어온 변경은 먼저 기록하는 쪽이 함께 기록 (group commit)
+            for agent_name in sorted(agents, key=str):
+                self.flush_agent(agent_name)
+
+    def replace_all(self, data: Dict[str, Any]):
+        """
+        전체 데이터를 교체하고 스냅샷 기록을 예약
+
+        Args:
+            data: 새 전체 메모리 데이터
+        """
+        with self._lock:
+            # 교체 전 데이터가 참조하던 행은 새 스냅샷이 기록될 때까지 재사용하지 않음
+            # (기록 전에 종료되면 이전 스냅샷/로그가 그 행을 다시 참조하므로)
+            reserved = {agent_name: self._reserved_rows(agent_name) for agent_name in data}
+            self.sidecar.clear()
+            externalize_memory_embeddings(self.sidecar, data, reserved)
+            # 새 데이터에 없는 에이전트의 샤드는 삭제
+            self._removed_agents.update((set(self._data) | set(self._logs)) - set(data))
+            self._data = data
+            self._next_ids = {}
+            self._embedding_indexes = {}
+            self._time_indexes = {}
+            self._location_indexes = {}
+            # 스냅샷을 통째로 다시 쓰므로 대기 중인 로그 레코드는 필요 없음
+            self._pending_records = {}
+            self._pending_count = 0
+            # 새 데이터가 쓰지 않는 이전 행은 스냅샷 기록 후 반환
+            self._pending_free_rows = {
+                agent_name: sorted(rows - self._agent_rows(data[agent_name]))
+                for agent_name, rows in reserved.items()
+            }
+            for agent_name in set(self._row_generations) | set(data):
+                self._row_generations[agent_name] = self._row_generations.get(agent_name, 0) + 1
+            self._dirty_agents = set(data.keys())
+            if self.durability != "sync":
+                self._schedule_flush()
+
+        if self.durability == "sync":
+            self.flush()
+
+    def replace_agent(self, agent_name: str, agent_data: Dict[str, Any]):
+        """
+        에이전트 하나의 데이터만 교체하고 해당 샤드의 스냅샷 기록을 예약
+
+        Args:
+            agent_name: 에이전트 이름
+            agent_data: 새 {"memories": ..., "embeddings": ...} 데이터
+        """
+        with self._lock:
+            # 참조되지 않는 사이드카 행은 이 에이전트 안에서만 재사용 대상으로 돌림
+            # (교체 전 데이터가 참조하던 행은 새 스냅샷이 기록된 뒤에 반환)
+            reserved = self._reserved_rows(agent_name)
+            externalize_memory_embeddings(self.sidecar, {agent_name: agent_data}, {agent_name: reserved})
+            self._data[agent_name] = agent_data
+            self._next_ids.pop(agent_name, None)
+            self._embedding_indexes.pop(agent_name, None)
+            self._time_indexes.pop(agent_name, None)
+            self._location_indexes.pop(agent_name, None)
+            self._pending_count -= len(self._pending_records.pop(agent_name, []))
+            self._pending_free_rows[agent_name] = sorted(reserved - self._agent_rows(agent_data))
+            self._row_generations[agent_name] = self._row_generations.get(agent_name, 0) + 1
+            self._removed_agents.discard(agent_name)
+            self._dirty_agents.add(agent_name)
+            if self.durability != "sync":
+                self._schedule_flush()
+
+        if self.durability == "sync":
+            self.flush_agent(agent_name)
+
+    @staticmethod
+    def _agent_rows(agent_data: Any) -> set:
+        """에이전트 데이터의 임베딩 항목이 참조하는 사이드카 행"""
+        if not isinstance(agent_data, dict):
+            return set()
+        return {
+            entry["row"] for entry in (agent_data.get("embeddings") or {}).values()
+            if isinstance(entry, dict) and isinstance(entry.get("row"), int)
+        }
+
+    def _reserved_rows(self, agent_name: str) -> set:
+        """디스크의 스냅샷/로그가 아직 참조할 수 있는 행 (현재 데이터의 행 + 반환 대기 중인 행, 락을 잡은 상태에서 호출)"""
+        return self._agent_rows(self._data.get(agent_name)) | set(self._pending_free_rows.get(agent_name, []))
+
+    def _externalize_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        레코드의 임베딩 벡터를 사이드카에 쓰고, 행 참조만 담은 레코드로 변환
+
+        로그와 스냅샷에는 행 참조만 기록됩니다.
+        """
+        op = record.get("op")
+        agent_name = record.get("agent")
+        memory_id = str(record.get("memory_id", ""))
+        agent_data = self._data.get(agent_name) or {}
+        current = agent_data.get("embeddings", {}).get(memory_id)
+        current_row = current.get("row") if isinstance(current, dict) and "row" in current else None
+
+        if op == "put_memory" and isinstance(record.get("embeddings"), dict) and "row" not in record["embeddings"]:
+            # 메모리 전체를 덮어쓰므로 임베딩 필드도 새로 구성 (행은 재사용)
+            entry = store_memory_embeddings(self.sidecar, agent_name, record["embeddings"], current_row)
+            return dict(record, embeddings=entry)
+
+        if op == "put_embedding" and "vector" in record:
+            field = record.get("field", "event")
+            row = current_row if current_row is not None else self.sidecar.allocate(agent_name)
+            vector = record.get("vector") or []
+            present = False
+            if vector and field in MEMORY_EMBEDDING_FIELDS:
+                try:
+                    self.sidecar.write(agent_name, row, MEMORY_EMBEDDING_FIELDS.index(field), vector)
+                    present = True
+                except ValueError as e:
+                    print(f"⚠️ {agent_name}의 {field} 임베딩을 저장하지 못했습니다: {e}")
+            converted = {key: value for key, value in record.items() if key != "vector"}
+            converted.update({"row": row, "present": present})
+            return converted
+
+        return record
+
+    def _track_memory_id(self, record: Dict[str, Any]):
+        """새 메모리가 추가되면 다음 ID 캐시 갱신"""
+        if record.get("op") != "put_memory":
+            return
+        agent_name = record.get("agent")
+        if agent_name not in self._next_ids:
+            return
+        try:
+            memory_id = int(record.get("memory_id", ""))
+        except ValueError:
+            return
+        if memory_id >= self._next_ids[agent_name]:
+            self._next_ids[agent_name] = memory_id + 1
+
+    def _schedule_flush(self):
+        """디바운스 타이머 설정 (락을 잡은 상태에서 호출)"""
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+
+        # 변경이 계속 들어오더라도 최대 지연 시간은 넘기지 않음
+        delay = min(self.flush_delay, max(0.0, self._dirty_since + self.max_flush_delay - now))
+        # 대기 레코드가 많이 쌓였으면 바로 기록
+        if self._pending_count >= self.flush_max_records:
+            delay = 0.0
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """
+        대기 중인 변경 사항을 즉시 디스크에 기록
+
+        변경된 에이전트의 샤드만 기록합니다. 기록할 레코드(또는 스냅샷 복사본)만 락 안에서 가져오고
+        실제 파일 쓰기는 락 밖에서 하므로, 기록 중에도 다른 스레드/이벤트 루프의 조회와 변경이 멈추지 않습니다.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._dirty_since = None
+            agents = set(self._pending_records) | self._dirty_agents | self._removed_agents
+
+        for agent_name in sorted(agents, key=str):
+            self.flush_agent(agent_name)
+
+    def flush_agent(self, agent_name: str):
+        """
+        에이전트 하나의 대기 중인 변경 사항을 디스크에 기록
+
+        같은 에이전트의 기록은 순서대로 처리되고, 다른 에이전트의 기록과는 동시에 진행할 수 있습니다.
+        """
+        with self._flush_locks.get(agent_name):
+            with self._lock:
+                records = self._pending_records.pop(agent_name, [])
+                self._pending_count -= len(records)
+                # 반환 대기 행은 기록이 끝날 때까지 목록에 남겨 두어 그 사이의 교체에서도 예약되게 함
+                freed_rows = list(self._pending_free_rows.get(agent_name, []))
+                generation = self._row_generations.get(agent_name, 0)
+                snapshot_dirty = agent_name in self._dirty_agents
+                removed = agent_name in self._removed_agents
+                self._dirty_agents.discard(agent_name)
+                self._removed_agents.discard(agent_name)
+
+                if removed and agent_name in self._data:
+                    # 삭제 후 다시 추가된 에이전트는 스냅샷으로 새로 기록
+                    removed, snapshot_dirty = False, True
+                if not records and not snapshot_dirty and not removed:
+                    return
+
+                if self.database is not None:
+                    log = None
+                    write = self._prepare_database_write(agent_name, records, snapshot_dirty, removed)
+                else:
+                    log = self._log_for(agent_name)
+                    write = self._prepare_log_write(log, agent_name, records, snapshot_dirty, removed)
+                    if removed:
+                        self._logs.pop(agent_name, None)
+
+            try:
+                write()
+                with self._lock:
+                    self._flushes += 1
+                    self._written_records += len(records)
+                    # 삭제/교체가 디스크에 기록되었으므로 행을 재사용 대상으로 반환
+                    # (기록 중에 데이터가 교체되었으면 새 스냅샷 기록 때 반환)
+                    if generation == self._row_generations.get(agent_name, 0):
+                        pending = self._pending_free_rows.get(agent_name, [])
+                        self._pending_free_rows[agent_name] = pending[len(freed_rows):]
+                        if not removed:
+                            for row in freed_rows:
+                                self.sidecar.release(agent_name, row)
+            except Exception as e:
+                print(f"{agent_name} 메모리 저장 중 오류 발생: {e}")
+                # 기록하지 못한 변경 사항은 다음 기록 때 다시 시도
+                with self._lock:
+                    self._pending_records[agent_name] = records + self._pending_records.get(agent_name, [])
+                    self._pending_count += len(records)
+                    if snapshot_dirty:
+                        self._dirty_agents.add(agent_name)
+                    if removed:
+                        if log is not None:
+                            self._logs.setdefault(agent_name, log)
+                        self._removed_agents.add(agent_name)
+                    self._schedule_flush()
+
+    def _prepare_log_write(self, log: MemoryLog, agent_name: str, records: List[Dict[str, Any]], snapshot_dirty: bool, removed: bool):
+        """샤드 로그/스냅샷 기록 준비 (락을 잡은 상태에서 호출, 실제 기록 함수를 반환)"""
+        # 로그가 압축 기준을 넘으면 로그 대신 스냅샷으로 기록
+        compact = not removed and (
+            snapshot_dirty or log.pending_records + len(records) >= log.compact_threshold
+        )
+        data = {agent_name: self._copy_agent_data(self._data.get(agent_name, {}))} if compact else None
+
+        def write():
+            if removed:
+                log.remove()
+                return
+            # 행 참조가 기록되기 전에 벡터부터 디스크에 반영
+            self.sidecar.flush(agent_name)
+            if compact:
+                log.compact(data)
+            else:
+                log.append(records)
+        return write
+
+    def _prepare_database_write(self, agent_name: str, records: List[Dict[str, Any]], snapshot_dirty: bool, removed: bool):
+        """
+        SQLite 기록 준비 (락을 잡은 상태에서 호출, 실제 기록 함수를 반환)
+
+        레코드를 그대로 쓰지 않고, 레코드가 건드린 메모리의 현재 상태(메모리 + 임베딩 벡터)를 행으로 기록합니다.
+        """
+        if removed:
+            return lambda: self.database.delete_agent_memories(agent_name)
+
+        agent_data = self._data.get(agent_name) or {}
+        memories = agent_data.get("memories", {})
+        embeddings = agent_data.get("embeddings", {})
+        if snapshot_dirty:
+            memory_ids = list(memories)
+        else:
+            memory_ids = list(dict.fromkeys(str(record.get("memory_id", "")) for record in records))
+
+        upserts, deletes = [], []
+        for memory_id in memory_ids:
+            memory = memories.get(memory_id)
+            if memory is None:
+                deletes.append(memory_id)
+                continue
+            entry = embeddings.get(memory_id)
+            vectors = {
+                field: self._read_entry_vector(agent_name, entry, field)
+                for field in MEMORY_EMBEDDING_FIELDS
+            }
+            upserts.append((memory_id, dict(memory), vectors))
+
+        if snapshot_dirty:
+            return lambda: self.database.replace_agent_memories(agent_name, upserts)
+        return lambda: self.database.write_memories(agent_name, upserts, deletes)
+
+    @property
+    def is_dirty(self) -> bool:
+        """디스크에 기록되지 않은 변경 사항이 있는지 여부"""
+        return bool(self._pending_records or self._dirty_agents or self._removed_agents)
+
+    def write_stats(self) -> Dict[str, Any]:
+        """디스크 기록 방식과 통계 (반영한 변경 레코드 수, 에이전트별 기록 횟수, 대기 레코드 수)"""
+        with self._lock:
+            return {
+                "durability": self.durability,
+                "applied_records": self._applied_records,
+                "flushes": self._flushes,
+                "written_records": self._written_records,
+                "pending_records": self._pending_count,
+                "records_per_flush": self._written_records / self._flushes if self._flushes else 0.0
+            }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_memory_store(memory_file_path: str) -> MemoryStore:
+    """
+    파일 경로별로 하나의 MemoryStore를 공유
+
+    Args:
+        memory_file_path: 메모리 JSON 파일 경로
+
+    Returns:
+        MemoryStore: 공유 메모리 저장소
+    """
+    key = os.path.abspath(str(memory_file_path))
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = MemoryStore(key, database=get_database(key))
+        return _stores[key]
+
+
+def _shard_snapshot_paths(shard_dir: str) -> List[str]:
+    """샤드 디렉토리의 에이전트 스냅샷 경로 (로그만 있는 에이전트 포함)"""
+    if not os.path.isdir(shard_dir):
+        return []
+    stems = set()
+    for name in os.listdir(shard_dir):
+        if name.endswith(".log.jsonl"):
+            stems.add(name[:-len(".log.jsonl")])
+        elif name.endswith(".json"):
+            stems.add(name[:-len(".json")])
+    return [os.path.join(shard_dir, stem + ".json") for stem in sorted(stems)]
+
+
+def load_memory_data(memory_file_path: str) -> Dict[str, Any]:
+    """
+    저장소를 만들지 않고 디스크의 메모리 데이터만 읽음 (스크립트/도구용, 파일은 수정하지 않음)
+
+    에이전트별 샤드를 읽고, 아직 샤드로 나누지 않은 기존 단일 파일이 있으면 그 데이터도 포함합니다.
+
+    Args:
+        memory_file_path: 메모리 JSON 파일 경로
+
+    Returns:
+        Dict[str, Any]: {에이전트: {"memories": ..., "embeddings": ...}}
+    """
+    database = get_database(memory_file_path)
+    if database is not None:
+        return database.load_memories()
+    return load_json_memory_data(memory_file_path)
+
+
+def load_json_memory_data(memory_file_path: str) -> Dict[str, Any]:
+    """
+    JSON 샤드(+ 기존 단일 파일)의 메모리 데이터만 읽음 (SQLite 마이그레이션용)
+
+    임베딩은 사이드카 행 참조({"row", "fields"}) 또는 기존 실수 리스트 형태 그대로 반환됩니다.
+    """
+    data = MemoryLog(str(memory_file_path)).load()
+    for snapshot_path in _shard_snapshot_paths(shard_directory(memory_file_path)):
+        data.update(MemoryLog(snapshot_path).load())
+    return data
@@ -0,0 +1,236 @@
+"""
+에이전트별 JSON 샤드 저장소 모듈
+
+모든 에이전트를 담은 JSON 파일 하나(reflections.json, plans.json) 대신
+<이름>/<에이전트>.json에 에이전트별로 나눠 저장합니다.
+각 샤드는 기존 형식 그대로 {에이전트 이름: 데이터} 하나만 담으므로,
+한 에이전트를 저장할 때 다른 에이전트의 데이터는 읽거나 쓰지 않습니다.
+기존 단일 파일이 있으면 처음 열 때 샤드로 나누고 <파일>.migrated로 이름을 바꿉니다.
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Any, Callable, Optional
+
+from .agent_locks import AgentLocks
+
+
+def shard_directory(file_path: str) -> str:
+    """단일 JSON 파일 경로에 대응하는 샤드 디렉토리 (agent/data/plans.json -> agent/data/plans/)"""
+    return os.path.splitext(os.path.abspath(str(file_path)))[0]
+
+
+def shard_path(directory: str, agent_name: str) -> str:
+    """에이전트 샤드 파일 경로 (파일 이름에 쓸 수 없는 문자는 _로 바꿈)"""
+    safe_name = re.sub(r'[^\w\-]', '_', str(agent_name))
+    return os.path.join(directory, f"{safe_name}.json")
+
+
+def write_json_atomic(path: str, data: Any):
+    """임시 파일에 쓴 뒤 교체 (중간에 종료되어도 기존 파일이 보존됨)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_sharded_json(file_path: str) -> Dict[str, Any]:
+    """
+    저장소를 만들지 않고 디스크의 데이터만 읽음 (스크립트/도구용, 파일은 수정하지 않음)
+
+    에이전트별 샤드를 읽고, 아직 샤드로 나누지 않은 기존 단일 파일이 있으면 그 데이터도 포함합니다.
+    """
+    data = {}
+    file_path = os.path.abspath(str(file_path))
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data.update(json.load(f))
+    directory = shard_directory(file_path)
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    data.update(json.load(f))
+    return data
+
+
+class ShardedJsonStore:
+    def __init__(self, file_path: str, default_agent_data: Any = None):
+        """
+        샤드 저장소 초기화
+
+        Args:
+            file_path: 기존 단일 JSON 파일 경로 (샤드 디렉토리는 확장자를 뺀 경로)
+            default_agent_data: 에이전트 데이터가 없을 때 사용할 기본값 (update_agent에서 복사하여 사용)
+        """
+        self.file_path = os.path.abspath(str(file_path))
+        self.directory = shard_directory(self.file_path)
+        self.location = self.directory
+        self.default_agent_data = {} if default_agent_data is None else default_agent_data
+
+        # 같은 에이전트의 읽기-수정-쓰기는 순서대로, 다른 에이전트는 동시에
+        self._agent_locks = AgentLocks()
+        self._migrate_legacy_file()
+
+    def _migrate_legacy_file(self):
+        """기존 단일 파일을 에이전트별 샤드로 나눔 (이미 있는 샤드는 덮어쓰지 않음)"""
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ {self.file_path}을(를) 읽을 수 없어 샤드로 옮기지 못했습니다: {e}")
+            return
+
+        if isinstance(data, dict):
+            for agent_name, agent_data in data.items():
+                path = shard_path(self.directory, agent_name)
+                if not os.path.exists(path):
+                    write_json_atomic(path, {agent_name: agent_data})
+        os.replace(self.file_path, self.file_path + ".migrated")
+        print(f"📦 {os.path.basename(self.file_path)}을(를) 에이전트별 파일로 나눴습니다: {self.directory}")
+
+    def lock(self, agent_name: str) -> threading.RLock:
+        """에이전트 샤드의 읽기-수정-쓰기용 락"""
+        return self._agent_locks.get(agent_name)
+
+    def exists(self) -> bool:
+        """샤드 디렉토리가 만들어졌는지 여부"""
+        return os.path.isdir(self.directory)
+
+    def _shard_files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    @staticmethod
+    def _read_shard(path: str) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+
+    # ------------------------------------------------------------------
+    # 읽기
+
+    def agent_names(self) -> List[str]:
+        """샤드가 있는 에이전트 이름 목록"""
+        return list(self.load_all().keys())
+
+    def load_agent(self, agent_name: str) -> Optional[Any]:
+        """
+        에이전트 데이터 하나 로드
+
+        Returns:
+            에이전트 데이터 (샤드가 없으면 None)
+        """
+        path = shard_path(self.directory, agent_name)
+        with self.lock(agent_name):
+            if not os.path.exists(path):
+                return None
+            return self._read_shard(path).get(agent_name)
+
+    def load_all(self) -> Dict[str, Any]:
+        """
+        모든 샤드를 읽어 기존 단일 파일과 같은 {에이전트: 데이터} 형식으로 반환
+
+        읽을 수 없는 샤드는 건너뜁니다.
+        """
+        data = {}
+        for path in self._shard_files():
+            try:
+                data.update(self._read_shard(path))
+            except Exception as e:
+                print(f"⚠️ 샤드 파일 로드 실패: {path} ({e})")
+        return data
+
+    def latest_plan(self, agent_name: str) -> Optional[Any]:
+        """가장 늦은 날짜의 계획 (plans.json 형식의 {"plans": {날짜: 계획}} 기준)"""
+        agent_data = self.load_agent(agent_name)
+        plans = agent_data.get("plans") if isinstance(agent_data, dict) else None
+        if not isinstance(plans, dict) or not plans:
+            return None
+        return plans[max(plans)]
+
+    # ------------------------------------------------------------------
+    # 쓰기
+
+    def save_agent(self, agent_name: str, agent_data: Any):
+        """에이전트 데이터 하나 저장 (해당 에이전트 샤드만 다시 씀)"""
+        with self.lock(agent_name):
+            write_json_atomic(shard_path(self.directory, agent_name), {agent_name: agent_data})
+
+    def update_agent(self, agent_name: str, update: Callable[[Any], Any]) -> Any:
+        """
+        에이전트 데이터를 읽고 수정한 뒤 저장 (같은 에이전트의 다른 갱신과 겹치지 않음)
+
+        Args:
+            agent_name: 에이전트 이름
+            update: 에이전트 데이터를 받아 수정하는 함수 (새 값을 반환하면 그 값을 저장)
+
+        Returns:
+            저장된 에이전트 데이터
+        """
+        with self.lock(agent_name):
+            agent_data = self.load_agent(agent_name)
+            if agent_data is None:
+                agent_data = copy.deepcopy(self.default_agent_data)
+            result = update(agent_data)
+            if result is not None:
+                agent_data = result
+            self.save_agent(agent_name, agent_data)
+            return agent_data
+
+    def save_all(self, data: Dict[str, Any]):
+        """
+        여러 에이전트 데이터 저장 (data에 있는 에이전트의 샤드만 다시 씀)
+
+        data에 없는 에이전트의 샤드는 그대로 둡니다. 모두 지우려면 clear()를 사용합니다.
+        """
+        for agent_name, agent_data in data.items():
+            self.save_agent(agent_name, agent_data)
+
+    def delete_agent(self, agent_name: str):
+        """에이전트 샤드 삭제"""
+        with self.lock(agent_name):
+            path = shard_path(self.directory, agent_name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear(self):
+        """모든 에이전트 샤드 삭제"""
+        for path in self._shard_files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sharded_json(file_path: str, default_agent_data: Any = None) -> ShardedJsonStore:
+    """
+    파일 경로별로 하나의 ShardedJsonStore를 공유 (에이전트 락도 함께 공유됨)
+
+    Args:
+        file_path: 기존 단일 JSON 파일 경로
+        default_agent_data: 에이전트 데이터 기본값 (처음 생성할 때만 적용)
+
+    Returns:
+        ShardedJsonStore: 공유 샤드 저장소
+    """
+    key = os.path.abspath(str(file_path))
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ShardedJsonStore(key, default_agent_data)
+        return _stores[key]
@@ -0,0 +1,518 @@
+"""
+SQLite 저장소 모듈
+
+메모리, 반성, 계획, 이벤트 ID, 대화를 JSON 파일 대신 SQLite 데이터베이스 하나(WAL 모드)에 저장합니다.
+STORAGE_BACKEND=sqlite일 때만 사용하며, 기존 JSON 파일은 migrate_to_sqlite.py로 가져옵니다.
+
+- memories: 에이전트/메모리 ID별 행 (agent, time, importance, event_type, event_location 컬럼에 인덱스)
+- memory_embeddings: 메모리 임베딩 필드별 float32 BLOB
+- reflections, plans: 에이전트 문서의 반성 목록/날짜별 계획을 행으로 나눠 저장
+- event_ids, conversations: event_ids.json과 대화 파일을 대신하는 테이블
+
+스레드마다 별도 연결을 사용하므로 WAL 모드에서 읽기는 기록을 기다리지 않습니다.
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .agent_locks import AgentLocks
+from .embedding_sidecar import MEMORY_EMBEDDING_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_agents (
+    agent TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS memories (
+    agent TEXT NOT NULL,
+    memory_id TEXT NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    importance INTEGER,
+    event_type TEXT NOT NULL DEFAULT '',
+    event_location TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL,
+    PRIMARY KEY (agent, memory_id)
+);
+CREATE INDEX IF NOT EXISTS idx_memories_time ON memories (agent, time);
+CREATE INDEX IF NOT EXISTS idx_memories_importance ON memories (agent, importance);
+CREATE TABLE IF NOT EXISTS memory_embeddings (
+    agent TEXT NOT NULL,
+    memory_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (agent, memory_id, field)
+);
+CREATE TABLE IF NOT EXISTS agent_documents (
+    kind TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    data TEXT NOT NULL,
+    split INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, agent)
+);
+CREATE TABLE IF NOT EXISTS reflections (
+    agent TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    time TEXT NOT NULL DEFAULT '',
+    importance INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (agent, position)
+);
+CREATE INDEX IF NOT EXISTS idx_reflections_time ON reflections (agent, time);
+CREATE TABLE IF NOT EXISTS plans (
+    agent TEXT NOT NULL,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (agent, date)
+);
+CREATE TABLE IF NOT EXISTS event_ids (
+    id INTEGER PRIMARY KEY,
+    agent TEXT NOT NULL,
+    data TEXT NOT NULL,
+    embedding BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_event_ids_agent ON event_ids (agent);
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_id TEXT PRIMARY KEY,
+    last_updated TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# 문서 종류별로 행으로 나눠 저장하는 필드 (반성 목록, 날짜별 계획)
+DOCUMENT_ITEM_FIELDS = {
+    "reflections": "reflections",
+    "plans": "plans"
+}
+
+
+def encode_vector(vector: Any) -> bytes:
+    """벡터를 float32 BLOB으로 변환"""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(blob: bytes) -> List[float]:
+    """float32 BLOB을 실수 리스트로 변환"""
+    return np.frombuffer(blob, dtype=np.float32).tolist()
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _importance_value(value: Any) -> Optional[int]:
+    """인덱스 컬럼에 넣을 중요도 (정수로 바꿀 수 없으면 NULL)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLiteDatabase:
+    def __init__(self, db_path: str):
+        """
+        SQLite 데이터베이스 초기화 (WAL 모드, 스키마가 없으면 생성)
+
+        Args:
+            db_path: 데이터베이스 파일 경로
+        """
+        self.db_path = os.path.abspath(str(db_path))
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (처음 사용할 때 생성)"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            # 트랜잭션은 transaction()에서 직접 시작
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL 모드에서는 NORMAL이어도 비정상 종료 시 데이터베이스가 손상되지 않음
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        쓰기 트랜잭션 (예외가 나면 롤백)
+
+        BEGIN IMMEDIATE로 시작하므로 다른 연결의 기록과는 순서대로 처리됩니다.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """읽기 쿼리 실행"""
+        return self._connection().execute(sql, params).fetchall()
+
+    # ------------------------------------------------------------------
+    # 메모리
+
+    def load_memories(self, agent_name: str = None) -> Dict[str, Any]:
+        """
+        메모리 데이터 로드 (기존 memories.json과 같은 형식, 임베딩은 실수 리스트)
+
+        Args:
+            agent_name: 지정하면 해당 에이전트만 로드
+
+        Returns:
+            Dict[str, Any]: {에이전트: {"memories": ..., "embeddings": ...}}
+        """
+        where, params = ("WHERE agent = ?", (agent_name,)) if agent_name is not None else ("", ())
+        data = {}
+        for (agent,) in self.query(f"SELECT agent FROM memory_agents {where}", params):
+            data[agent] = {"memories": {}, "embeddings": {}}
+        for agent, memory_id, raw in self.query(f"SELECT agent, memory_id, data FROM memories {where}", params):
+            agent_data = data.setdefault(agent, {"memories": {}, "embeddings": {}})
+            agent_data["memories"][memory_id] = json.loads(raw)
+        for agent, memory_id, field, blob in self.query(
+            f"SELECT agent, memory_id, field, vector FROM memory_embeddings {where}", params
+        ):
+            agent_data = data.setdefault(agent, {"memories": {}, "embeddings": {}})
+            entry = agent_data["embeddings"].setdefault(
+                memory_id, {name: [] for name in MEMORY_EMBEDDING_FIELDS}
+            )
+            entry[field] = decode_vector(blob)
+        return data
+
+    @staticmethod
+    def _put_memory_rows(conn: sqlite3.Connection, agent_name: str, memory_id: str, memory: Dict[str, Any], vectors: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO memories (agent, memory_id, time, importance, event_type, event_location, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                agent_name,
+                memory_id,
+                str(memory.get("time", "") or ""),
+                _importance_value(memory.get("importance")),
+                str(memory.get("event_type", "") or ""),
+                str(memory.get("event_location", "") or ""),
+                _dumps(memory)
+            )
+        )
+        conn.execute("DELETE FROM memory_embeddings WHERE agent = ? AND memory_id = ?", (agent_name, memory_id))
+        conn.executemany(
+            "INSERT INTO memory_embeddings (agent, memory_id, field, vector) VALUES (?, ?, ?, ?)",
+            [
+                (agent_name, memory_id, field, encode_vector(vector))
+                for field, vector in vectors.items()
+                if vector is not None and len(vector) > 0
+            ]
+        )
+
+    def write_memories(self, agent_name: str, upserts: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], deletes: List[str]):
+        """
+        변경된 메모리만 한 트랜잭션으로 기록
+
+        Args:
+            agent_name: 에이전트 이름
+            upserts: (메모리 ID, 메모리, {필드: 벡터}) 목록
+            deletes: 삭제할 메모리 ID 목록
+        """
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO memory_agents (agent) VALUES (?)", (agent_name,))
+            for memory_id, memory, vectors in upserts:
+                self._put_memory_rows(conn, agent_name, str(memory_id), memory, vectors)
+            for memory_id in deletes:
+                conn.execute("DELETE FROM memories WHERE agent = ? AND memory_id = ?", (agent_name, str(memory_id)))
+                conn.execute("DELETE FROM memory_embeddings WHERE agent = ? AND memory_id = ?", (agent_name, str(memory_id)))
+
+    def replace_agent_memories(self, agent_name: str, upserts: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        """에이전트의 메모리를 모두 지우고 다시 기록"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM memories WHERE agent = ?", (agent_name,))
+            conn.execute("DELETE FROM memory_embeddings WHERE agent = ?", (agent_name,))
+            conn.execute("INSERT OR IGNORE INTO memory_agents (agent) VALUES (?)", (agent_name,))
+            for memory_id, memory, vectors in upserts:
+                self._put_memory_rows(conn, agent_name, str(memory_id), memory, vectors)
+
+    def delete_agent_memories(self, agent_name: str):
+        """에이전트와 메모리 삭제"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM memories WHERE agent = ?", (agent_name,))
+            conn.execute("DELETE FROM memory_embeddings WHERE agent = ?", (agent_name,))
+            conn.execute("DELETE FROM memory_agents WHERE agent = ?", (agent_name,))
+
+    # ------------------------------------------------------------------
+    # 이벤트 ID
+
+    def load_event_ids(self) -> Dict[str, Any]:
+        """event_ids.json과 같은 형식으로 전체 이벤트 ID 로드"""
+        data = {"next_id": self.next_event_id(), "agents": {}}
+        for agent_name in self._event_agents():
+            data["agents"][agent_name] = self.load_agent_event_ids(agent_name)
+        return data
+
+    def _event_agents(self) -> List[str]:
+        return [agent for (agent,) in self.query("SELECT DISTINCT agent FROM event_ids ORDER BY agent")]
+
+    def next_event_id(self) -> int:
+        rows = self.query("SELECT value FROM meta WHERE key = 'event_next_id'")
+        if rows:
+            return int(rows[0][0])
+        rows = self.query("SELECT MAX(id) FROM event_ids")
+        return (rows[0][0] or 0) + 1
+
+    def load_agent_event_ids(self, agent_name: str) -> List[Dict[str, Any]]:
+        """에이전트의 이벤트 ID 목록 (임베딩은 실수 리스트)"""
+        result = []
+        for event_id, raw, blob in self.query(
+            "SELECT id, data, embedding FROM event_ids WHERE agent = ? ORDER BY id", (agent_name,)
+        ):
+            entry = json.loads(raw)
+            entry["id"] = event_id
+            entry["embedding"] = decode_vector(blob) if blob is not None else []
+            result.append(entry)
+        return result
+
+    @staticmethod
+    def _insert_event_id(conn: sqlite3.Connection, event_id: int, agent_name: str, entry: Dict[str, Any]):
+        embedding = entry.get("embedding")
+        data = {key: value for key, value in entry.items() if key not in ("id", "embedding")}
+        conn.execute(
+            "INSERT OR REPLACE INTO event_ids (id, agent, data, embedding) VALUES (?, ?, ?, ?)",
+            (event_id, agent_name, _dumps(data), encode_vector(embedding) if embedding is not None and len(embedding) > 0 else None)
+        )
+
+    def add_event_id(self, agent_name: str, entry: Dict[str, Any]) -> int:
+        """
+        새 이벤트 ID를 발급하고 저장
+
+        Returns:
+            int: 발급된 이벤트 ID
+        """
+        with self.transaction() as conn:
+            event_id = self.next_event_id()
+            self._insert_event_id(conn, event_id, agent_name, entry)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('event_next_id', ?)", (str(event_id + 1),)
+            )
+        return event_id
+
+    def replace_event_ids(self, data: Dict[str, Any]):
+        """event_ids.json 형식 데이터로 전체 이벤트 ID 교체"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM event_ids")
+            max_id = 0
+            for agent_name, entries in (data.get("agents") or {}).items():
+                for entry in entries:
+                    event_id = int(entry.get("id"))
+                    max_id = max(max_id, event_id)
+                    self._insert_event_id(conn, event_id, agent_name, entry)
+            next_id = max(int(data.get("next_id", 1)), max_id + 1)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('event_next_id', ?)", (str(next_id),))
+
+    # ------------------------------------------------------------------
+    # 대화
+
+    def load_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        rows = self.query("SELECT data FROM conversations WHERE conversation_id = ?", (conversation_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversations (conversation_id, last_updated, data) VALUES (?, ?, ?)",
+                (conversation["conversation_id"], str(conversation.get("last_updated", "")), _dumps(conversation))
+            )
+
+
+class SQLiteDocumentStore:
+    def __init__(self, database: SQLiteDatabase, kind: str, default_agent_data: Any = None):
+        """
+        에이전트별 문서 저장소 (ShardedJsonStore와 같은 인터페이스)
+
+        반성 목록과 날짜별 계획은 각각 reflections/plans 테이블의 행으로 나눠 저장하고,
+        나머지 필드는 agent_documents에 JSON으로 저장합니다.
+
+        Args:
+            database: SQLite 데이터베이스
+            kind: 문서 종류 ("reflections" 또는 "plans")
+            default_agent_data: 에이전트 데이터가 없을 때 사용할 기본값
+        """
+        self.database = database
+        self.kind = kind
+        self.item_field = DOCUMENT_ITEM_FIELDS.get(kind)
+        self.default_agent_data = {} if default_agent_data is None else default_agent_data
+        self.location = f"{database.db_path} ({kind})"
+        self._agent_locks = AgentLocks()
+
+    def lock(self, agent_name: str) -> threading.RLock:
+        """에이전트 문서의 읽기-수정-쓰기용 락"""
+        return self._agent_locks.get(agent_name)
+
+    def exists(self) -> bool:
+        """저장된 에이전트 문서가 있는지 여부"""
+        return bool(self.database.query("SELECT 1 FROM agent_documents WHERE kind = ? LIMIT 1", (self.kind,)))
+
+    # ------------------------------------------------------------------
+    # 읽기
+
+    def agent_names(self) -> List[str]:
+        rows = self.database.query("SELECT agent FROM agent_documents WHERE kind = ? ORDER BY agent", (self.kind,))
+        return [agent for (agent,) in rows]
+
+    def _load_items(self, agent_name: str) -> Any:
+        if self.kind == "reflections":
+            rows = self.database.query(
+                "SELECT data FROM reflections WHERE agent = ? ORDER BY position", (agent_name,)
+            )
+            return [json.loads(raw) for (raw,) in rows]
+        rows = self.database.query("SELECT date, data FROM plans WHERE agent = ? ORDER BY date", (agent_name,))
+        return {date: json.loads(raw) for date, raw in rows}
+
+    def load_agent(self, agent_name: str) -> Optional[Any]:
+        """
+        에이전트 데이터 하나 로드
+
+        Returns:
+            에이전트 데이터 (없으면 None)
+        """
+        rows = self.database.query(
+            "SELECT data, split FROM agent_documents WHERE kind = ? AND agent = ?", (self.kind, agent_name)
+        )
+        if not rows:
+            return None
+        raw, split = rows[0]
+        agent_data = json.loads(raw)
+        if split:
+            agent_data[self.item_field] = self._load_items(agent_name)
+        return agent_data
+
+    def load_all(self) -> Dict[str, Any]:
+        """모든 에이전트 데이터를 {에이전트: 데이터} 형식으로 반환"""
+        return {agent_name: self.load_agent(agent_name) for agent_name in self.agent_names()}
+
+    def latest_plan(self, agent_name: str) -> Optional[Any]:
+        """가장 늦은 날짜의 계획 (plans 테이블에서 날짜 역순 첫 행)"""
+        rows = self.database.query(
+            "SELECT data FROM plans WHERE agent = ? ORDER BY date DESC LIMIT 1", (agent_name,)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    # ------------------------------------------------------------------
+    # 쓰기
+
+    def _split(self, agent_data: Any) -> Tuple[Any, Any]:
+        """문서를 (나머지 필드, 행으로 나눌 항목)으로 분리 (나눌 수 없으면 항목은 None)"""
+        if not isinstance(agent_data, dict) or self.item_field is None:
+            return agent_data, None
+        items = agent_data.get(self.item_field)
+        expected = list if self.kind == "reflections" else dict
+        if not isinstance(items, expected):
+            return agent_data, None
+        rest = {key: value for key, value in agent_data.items() if key != self.item_field}
+        return rest, items
+
+    def save_agent(self, agent_name: str, agent_data: Any):
+        """에이전트 데이터 하나를 한 트랜잭션으로 저장"""
+        rest, items = self._split(agent_data)
+        with self.lock(agent_name), self.database.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO agent_documents (kind, agent, data, split) VALUES (?, ?, ?, ?)",
+                (self.kind, agent_name, _dumps(rest), int(items is not None))
+            )
+            if self.kind == "reflections":
+                conn.execute("DELETE FROM reflections WHERE agent = ?", (agent_name,))
+                conn.executemany(
+                    "INSERT INTO reflections (agent, position, time, importance, data) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            agent_name,
+                            position,
+                            str(item.get("time", "") or "") if isinstance(item, dict) else "",
+                            _importance_value(item.get("importance")) if isinstance(item, dict) else None,
+                            _dumps(item)
+                        )
+                        for position, item in enumerate(items or [])
+                    ]
+                )
+            elif self.kind == "plans":
+                conn.execute("DELETE FROM plans WHERE agent = ?", (agent_name,))
+                conn.executemany(
+                    "INSERT INTO plans (agent, date, data) VALUES (?, ?, ?)",
+                    [(agent_name, str(date), _dumps(plan)) for date, plan in (items or {}).items()]
+                )
+
+    def update_agent(self, agent_name: str, update: Callable[[Any], Any]) -> Any:
+        """
+        에이전트 데이터를 읽고 수정한 뒤 저장 (같은 에이전트의 다른 갱신과 겹치지 않음)
+
+        Args:
+            agent_name: 에이전트 이름
+            update: 에이전트 데이터를 받아 수정하는 함수 (새 값을 반환하면 그 값을 저장)
+
+        Returns:
+            저장된 에이전트 데이터
+        """
+        with self.lock(agent_name):
+            agent_data = self.load_agent(agent_name)
+            if agent_data is None:
+                agent_data = copy.deepcopy(self.default_agent_data)
+            result = update(agent_data)
+            if result is not None:
+                agent_data = result
+            self.save_agent(agent_name, agent_data)
+            return agent_data
+
+    def save_all(self, data: Dict[str, Any]):
+        """여러 에이전트 데이터 저장 (data에 없는 에이전트는 그대로 둠)"""
+        for agent_name, agent_data in data.items():
+            self.save_agent(agent_name, agent_data)
+
+    def _delete_rows(self, conn: sqlite3.Connection, agent_name: str = None):
+        where, params = ("WHERE agent = ?", (agent_name,)) if agent_name is not None else ("", ())
+        if self.kind in DOCUMENT_ITEM_FIELDS:
+            conn.execute(f"DELETE FROM {self.kind} {where}", params)
+        if agent_name is None:
+            conn.execute("DELETE FROM agent_documents WHERE kind = ?", (self.kind,))
+        else:
+            conn.execute("DELETE FROM agent_documents WHERE kind = ? AND agent = ?", (self.kind, agent_name))
+
+    def delete_agent(self, agent_name: str):
+        """에이전트 문서 삭제"""
+        with self.lock(agent_name), self.database.transaction() as conn:
+            self._delete_rows(conn, agent_name)
+
+    def clear(self):
+        """모든 에이전트 문서 삭제"""
+        with self.database.transaction() as conn:
+            self._delete_rows(conn)
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_sqlite_database(db_path: str) -> SQLiteDatabase:
+    """
+    파일 경로별로 하나의 SQLiteDatabase를 공유
+
+    Args:
+        db_path: 데이터베이스 파일 경로
+
+    Returns:
+        SQLiteDatabase: 공유 데이터베이스
+    """
+    key = os.path.abspath(str(db_path))
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = SQLiteDatabase(key)
+        return _databases[key]
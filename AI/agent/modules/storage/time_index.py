@@ -0,0 +1,169 @@
+"""
+에이전트별 메모리 시간 인덱스 모듈
+
+메모리의 time 문자열을 정수 타임스탬프(YYYYMMDDHHMMSS)로 한 번만 파싱해 두고,
+(타임스탬프, 순서) 기준으로 정렬된 목록을 유지합니다.
+"특정 날짜의 메모리", "최근 N개 메모리", "최신순 정렬"을 매번 전체 메모리를 훑거나
+문자열을 다시 파싱하지 않고 이분 탐색(O(log n + k))으로 조회합니다.
+메모리 저장소가 변경된 메모리 ID를 알려주면 다음 조회 시 해당 항목만 갱신합니다.
+"""
+
+import bisect
+import re
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# 파싱할 수 없는 시간 (가장 오래된 것으로 취급)
+MIN_TIMESTAMP = 0
+# 타임스탬프에서 날짜(YYYYMMDD)를 얻기 위한 단위
+DAY_UNIT = 1000000
+
+# 게임 시간 (YYYY.MM.DD[.HH:MM[:SS]], 월/일/시/분/초는 한 자리도 허용, 시간이 없으면 자정)
+_GAME_TIME_PATTERN = re.compile(r'^(\d{4})\.(\d{1,2})\.(\d{1,2})(?:\.(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?$')
+_DATE_PATTERN = re.compile(r'^(\d{4})\.(\d{1,2})\.(\d{1,2})$')
+_FALLBACK_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%fZ",  # ISO 8601 format
+    "%Y-%m-%d %H:%M:%S"       # 다른 일반적인 포맷
+)
+
+
+def parse_timestamp(time_str: Any) -> int:
+    """
+    시간 문자열을 정렬 가능한 정수 타임스탬프(YYYYMMDDHHMMSS)로 변환
+
+    게임 시간 형식(YYYY.MM.DD.HH:MM[:SS], 자리수를 채우지 않은 값과 날짜만 있는 값 포함)은
+    정규식으로 바로 변환하고, 그 밖의 형식은 strptime으로 시도합니다.
+
+    Returns:
+        int: 타임스탬프 (파싱할 수 없으면 MIN_TIMESTAMP)
+    """
+    if not isinstance(time_str, str) or not time_str:
+        return MIN_TIMESTAMP
+    match = _GAME_TIME_PATTERN.match(time_str)
+    if match:
+        year, month, day, hour, minute, second = (int(value or 0) for value in match.groups())
+        if 1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 60:
+            return int(f"{year:04d}{month:02d}{day:02d}{hour:02d}{minute:02d}{second:02d}")
+        return MIN_TIMESTAMP
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return int(datetime.strptime(time_str, fmt).strftime("%Y%m%d%H%M%S"))
+        except ValueError:
+            continue
+    return MIN_TIMESTAMP
+
+
+def date_key(date_str: str) -> Optional[int]:
+    """'YYYY.MM.DD' (한 자리 월/일 허용) 날짜 문자열을 정수 날짜(YYYYMMDD)로 변환 (형식이 다르면 None)"""
+    match = _DATE_PATTERN.match(date_str or "")
+    if not match:
+        return None
+    year, month, day = (int(value) for value in match.groups())
+    return year * 10000 + month * 100 + day
+
+
+def format_date(timestamp: int) -> str:
+    """타임스탬프의 날짜 부분을 'YYYY.MM.DD' 문자열로 변환"""
+    day = str(timestamp // DAY_UNIT)
+    return f"{day[:4]}.{day[4:6]}.{day[6:8]}"
+
+
+class AgentTimeIndex:
+    def __init__(self):
+        """에이전트 시간 인덱스 초기화 (실제 구성은 첫 sync 시 수행)"""
+        # (타임스탬프, -순서, 메모리 ID) 오름차순 정렬 목록
+        # 같은 시간은 먼저 추가된 메모리가 최신순 조회에서 앞에 오도록 순서를 음수로 저장
+        self._entries: List[Tuple[int, int, str]] = []
+        self._keys: Dict[str, Tuple[int, int, str]] = {}
+        self._sequence = 0
+        self._dirty_ids = set()
+        self._needs_rebuild = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def mark_dirty(self, memory_id: str):
+        """메모리가 추가/변경/삭제되었음을 표시"""
+        self._dirty_ids.add(str(memory_id))
+
+    def sync(self, agent_data: Dict[str, Any]):
+        """
+        변경된 메모리만 인덱스에 반영
+
+        Args:
+            agent_data: 에이전트의 {"memories": ..., "embeddings": ...} 데이터
+        """
+        memories = agent_data.get("memories", {}) or {}
+        if self._needs_rebuild:
+            self._entries = []
+            self._keys = {}
+            self._sequence = 0
+            self._needs_rebuild = False
+            for memory_id, memory in memories.items():
+                self._entries.append(self._new_key(str(memory_id), memory))
+            self._entries.sort()
+        else:
+            for memory_id in self._dirty_ids:
+                self._update(memory_id, memories.get(memory_id))
+        self._dirty_ids.clear()
+
+    def _new_key(self, memory_id: str, memory: Dict[str, Any]) -> Tuple[int, int, str]:
+        """메모리의 정렬 키를 만들고 등록"""
+        key = (parse_timestamp(memory.get("time", "")), -self._sequence, memory_id)
+        self._sequence += 1
+        self._keys[memory_id] = key
+        return key
+
+    def _update(self, memory_id: str, memory: Optional[Dict[str, Any]]):
+        """메모리 하나의 항목 갱신 (시간이 그대로면 기존 위치 유지)"""
+        old_key = self._keys.get(memory_id)
+        if memory is not None and old_key is not None and old_key[0] == parse_timestamp(memory.get("time", "")):
+            return
+        if old_key is not None:
+            position = bisect.bisect_left(self._entries, old_key)
+            if position < len(self._entries) and self._entries[position] == old_key:
+                self._entries.pop(position)
+            del self._keys[memory_id]
+        if memory is not None:
+            bisect.insort(self._entries, self._new_key(memory_id, memory))
+
+    # ------------------------------------------------------------------
+    # 조회
+
+    def timestamp(self, memory_id: str) -> int:
+        """메모리의 정수 타임스탬프 (인덱스에 없으면 MIN_TIMESTAMP)"""
+        key = self._keys.get(str(memory_id))
+        return key[0] if key is not None else MIN_TIMESTAMP
+
+    def sort_key(self, memory_id: str) -> Tuple[int, int, str]:
+        """최신순 정렬용 키 (내림차순으로 정렬하면 newest_first와 같은 순서, 인덱스에 없으면 가장 오래된 것으로 취급)"""
+        return self._keys.get(str(memory_id), (MIN_TIMESTAMP, 0, ""))
+
+    def on_date(self, date_str: str) -> List[str]:
+        """
+        해당 날짜(YYYY.MM.DD)의 메모리 ID (시간순)
+
+        Returns:
+            List[str]: 메모리 ID 목록 (날짜 형식이 다르면 빈 목록)
+        """
+        day = date_key(date_str)
+        if day is None:
+            return []
+        start = bisect.bisect_left(self._entries, (day * DAY_UNIT,))
+        end = bisect.bisect_left(self._entries, ((day + 1) * DAY_UNIT,))
+        return [entry[2] for entry in self._entries[start:end]]
+
+    def newest_first(self) -> Iterator[str]:
+        """최신순 메모리 ID (같은 시간은 먼저 추가된 메모리 우선)"""
+        for entry in reversed(self._entries):
+            yield entry[2]
+
+    def latest(self, count: int) -> List[str]:
+        """가장 최근 메모리 ID count개 (최신순)"""
+        if count <= 0:
+            return []
+        return [entry[2] for entry in reversed(self._entries[-count:])]
+
+    def latest_timestamp(self) -> int:
+        """가장 늦은 타임스탬프 (메모리가 없으면 MIN_TIMESTAMP)"""
+        return self._entries[-1][0] if self._entries else MIN_TIMESTAMP
@@ -0,0 +1,140 @@
+"""
+스트리밍 응답 조기 종료 판별 모듈
+
+올라마 스트리밍 응답을 토큰 단위로 받으면서, 필요한 결과(최상위 JSON 객체 하나 또는 정수 하나)가
+완성되는 즉시 생성을 멈출 수 있도록 완성 시점을 판별합니다.
+"""
+
+import json
+from typing import Optional
+
+STOP_ON_JSON = "json"
+STOP_ON_INTEGER = "integer"
+
+
+class JsonObjectDetector:
+    """최상위 JSON 객체가 완성되었는지 판별 (문자열 안의 중괄호와 이스케이프 처리)"""
+
+    def __init__(self):
+        self.text = ""
+        self.end = None
+
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # 첫 번째 객체가 JSON으로 파싱되지 않으면 조기 종료하지 않고 응답 끝까지 받음
+        self._gave_up = False
+
+    def feed(self, chunk: str) -> bool:
+        """
+        응답 조각 추가
+
+        Args:
+            chunk: 새로 받은 응답 텍스트
+
+        Returns:
+            bool: JSON 객체가 완성되어 생성을 멈춰도 되는지 여부
+        """
+        self.text += chunk
+        if self.end is not None:
+            return True
+        if self._gave_up:
+            return False
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._start is None:
+                if char == "{":
+                    self._start = i
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    try:
+                        json.loads(text[self._start:i + 1])
+                    except json.JSONDecodeError:
+                        self._gave_up = True
+                        return False
+                    self.end = i + 1
+                    return True
+
+        self._pos = len(text)
+        return False
+
+    def result(self) -> str:
+        """완성된 경우 JSON 객체까지의 응답, 아니면 전체 응답"""
+        return self.text if self.end is None else self.text[:self.end]
+
+
+class IntegerDetector:
+    """첫 번째 정수가 완성되었는지 판별 (숫자 뒤에 숫자가 아닌 문자가 오면 완성)"""
+
+    def __init__(self):
+        self.text = ""
+        self.end = None
+        self._pos = 0
+        self._start = None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        응답 조각 추가
+
+        Args:
+            chunk: 새로 받은 응답 텍스트
+
+        Returns:
+            bool: 정수가 완성되어 생성을 멈춰도 되는지 여부
+        """
+        self.text += chunk
+        if self.end is not None:
+            return True
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if text[i].isdecimal():
+                if self._start is None:
+                    self._start = i
+            elif self._start is not None:
+                self.end = i
+                return True
+
+        self._pos = len(text)
+        return False
+
+    def result(self) -> str:
+        """완성된 경우 정수까지의 응답, 아니면 전체 응답"""
+        return self.text if self.end is None else self.text[:self.end]
+
+
+def create_stop_detector(stop_on: Optional[str]):
+    """
+    조기 종료 판별기 생성
+
+    Args:
+        stop_on: "json" (최상위 JSON 객체) 또는 "integer" (첫 번째 정수)
+
+    Returns:
+        판별기 (stop_on이 없거나 알 수 없으면 None)
+    """
+    if stop_on == STOP_ON_JSON:
+        return JsonObjectDetector()
+    if stop_on == STOP_ON_INTEGER:
+        return IntegerDetector()
+    return None
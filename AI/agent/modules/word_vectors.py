@@ -0,0 +1,231 @@
+"""
+게임 어휘 Word2Vec 모델 모듈
+
+전체 word2vec-google-news-300 모델(300만 단어)에서 자주 쓰이는 상위 N개 단어와
+게임 도메인 단어(프롬프트, 오브젝트 사전, 위치, 저장된 메모리)만 남긴
+축소 KeyedVectors를 만들고 불러옵니다.
+축소 모델에 없는 단어는 필요할 때만 전체 모델을 매핑하여 조회합니다.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import List, Any, Iterable, Set, Tuple
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+# 특수문자 제거 (EmbeddingCache 정규화와 동일)
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# 축소 모델에 포함할 빈도 상위 단어 수
+DEFAULT_TOP_N = 50000
+
+
+class FallbackKeyedVectors:
+    """축소 모델을 먼저 조회하고, 없는 단어는 전체 모델에서 조회하는 KeyedVectors 래퍼"""
+
+    def __init__(self, pruned_model: KeyedVectors, fallback_path: str = None, known_oov: Iterable[str] = None):
+        """
+        Args:
+            pruned_model: 축소 KeyedVectors
+            fallback_path: 전체 모델(.kv) 경로 (None이면 축소 모델만 사용)
+            known_oov: 전체 모델에도 없는 것으로 확인된 게임 어휘 (전체 모델을 매핑하지 않고 바로 제외)
+        """
+        self.pruned_model = pruned_model
+        self.fallback_path = fallback_path
+        self.known_oov = set(known_oov or ())
+        self.vector_size = pruned_model.vector_size
+
+        self._fallback_model = None
+        self._fallback_failed = False
+        self._lock = threading.Lock()
+        self.fallback_hits = 0
+
+    def _get_fallback_model(self):
+        """전체 모델을 처음 필요할 때 매핑(mmap)하여 반환"""
+        if self._fallback_model is not None or self._fallback_failed or not self.fallback_path:
+            return self._fallback_model
+
+        with self._lock:
+            if self._fallback_model is None and not self._fallback_failed:
+                if not os.path.exists(self.fallback_path):
+                    self._fallback_failed = True
+                    print(f"⚠️ 전체 Word2Vec 모델이 없어 축소 모델만 사용합니다: {self.fallback_path}")
+                else:
+                    print("🤖 축소 모델에 없는 단어가 있어 전체 Word2Vec 모델을 매핑합니다...")
+                    self._fallback_model = KeyedVectors.load(self.fallback_path, mmap='r')
+        return self._fallback_model
+
+    def __contains__(self, word: str) -> bool:
+        if word in self.pruned_model:
+            return True
+        if word in self.known_oov:
+            return False
+        fallback_model = self._get_fallback_model()
+        return fallback_model is not None and word in fallback_model
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        if word in self.pruned_model:
+            return self.pruned_model[word]
+        fallback_model = None if word in self.known_oov else self._get_fallback_model()
+        if fallback_model is None:
+            raise KeyError(f"Key '{word}' not present")
+        self.fallback_hits += 1
+        return fallback_model[word]
+
+    def get_vector(self, word: str) -> np.ndarray:
+        return self[word]
+
+    def __len__(self) -> int:
+        return len(self.pruned_model)
+
+
+def load_word_vectors(kv_path: str, pruned_path: str = None, use_fallback: bool = True):
+    """
+    Word2Vec 모델 로드 (축소 모델이 있으면 축소 모델 + 전체 모델 대체 조회)
+
+    Args:
+        kv_path: 전체 모델(.kv) 경로
+        pruned_path: 축소 모델(.kv) 경로
+        use_fallback: 축소 모델에 없는 단어를 전체 모델에서 조회할지 여부
+
+    Returns:
+        KeyedVectors 또는 FallbackKeyedVectors
+    """
+    if pruned_path and os.path.exists(pruned_path):
+        pruned_model = KeyedVectors.load(pruned_path)
+        known_oov = []
+        oov_path = oov_path_for(pruned_path)
+        if os.path.exists(oov_path):
+            with open(oov_path, 'r', encoding='utf-8') as f:
+                known_oov = json.load(f)
+        print(f"✅ 축소 Word2Vec 모델 로드 완료 ({len(pruned_model)}개 단어)")
+        return FallbackKeyedVectors(pruned_model, kv_path if use_fallback else None, known_oov)
+
+    # 축소 모델이 없으면 전체 모델을 매핑(mmap) 방식으로 로드
+    return KeyedVectors.load(kv_path, mmap='r')
+
+
+def oov_path_for(pruned_path: str) -> str:
+    """축소 모델과 함께 저장하는 OOV 게임 어휘 목록 경로"""
+    return os.path.splitext(str(pruned_path))[0] + ".oov.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """임베딩 시 조회되는 형태(원문, 소문자, 특수문자 제거)의 단어 목록"""
+    tokens = text.split()
+    cleaned_tokens = _PUNCTUATION_PATTERN.sub('', text).split()
+    return tokens + cleaned_tokens + [w.lower() for w in tokens + cleaned_tokens]
+
+
+def _collect_strings(value: Any, vocabulary: Set[str]):
+    """JSON 값에서 문자열을 모두 찾아 단어로 추가 (임베딩 값은 건너뜀)"""
+    if isinstance(value, str):
+        vocabulary.update(tokenize(value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("embeddings", "embedding"):
+                continue
+            vocabulary.update(tokenize(str(key)))
+            _collect_strings(item, vocabulary)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, vocabulary)
+
+
+def collect_game_vocabulary(agent_dir: str) -> Set[str]:
+    """
+    게임 도메인 단어 수집
+
+    Args:
+        agent_dir: AI/agent 디렉토리 경로
+
+    Returns:
+        Set[str]: 프롬프트, 오브젝트 사전, 위치, 저장된 메모리/성찰/계획에 등장하는 단어
+    """
+    agent_dir = Path(agent_dir)
+    vocabulary = set()
+
+    # 프롬프트
+    for prompt_path in (agent_dir / "prompts").rglob("*.txt"):
+        try:
+            vocabulary.update(tokenize(prompt_path.read_text(encoding="utf-8")))
+        except Exception as e:
+            print(f"⚠️ 프롬프트 읽기 실패 ({prompt_path}): {e}")
+
+    # 오브젝트 사전
+    object_dict_path = agent_dir / "data" / "object_dict" / "object_dictionary.json"
+    if object_dict_path.exists():
+        try:
+            with open(object_dict_path, "r", encoding="utf-8") as f:
+                _collect_strings(json.load(f), vocabulary)
+        except Exception as e:
+            print(f"⚠️ JSON 읽기 실패 ({object_dict_path}): {e}")
+
+    # 저장된 성찰/계획 (에이전트별 파일 또는 SQLite)
+    from .storage.backend import load_agent_documents
+    for json_path in (agent_dir / "data" / "reflections.json", agent_dir / "data" / "plans.json"):
+        try:
+            _collect_strings(load_agent_documents(str(json_path)), vocabulary)
+        except Exception as e:
+            print(f"⚠️ JSON 읽기 실패 ({json_path}): {e}")
+
+    # 메모리 (에이전트별 스냅샷 + 변경 로그, 또는 SQLite)
+    memories_path = agent_dir / "data" / "memories.json"
+    try:
+        from .storage.memory_store import load_memory_data
+        _collect_strings(load_memory_data(str(memories_path)), vocabulary)
+    except Exception as e:
+        print(f"⚠️ 메모리 읽기 실패 ({memories_path}): {e}")
+
+    # 위치와 행동
+    try:
+        from .plan.available_test import (
+            VALID_ACTIONS, REGION_LOCATION_OBJECTS, FINDABLE_ANYWHERE, OBJECT_LOCATION_MAP
+        )
+        _collect_strings(
+            [list(VALID_ACTIONS), REGION_LOCATION_OBJECTS, list(FINDABLE_ANYWHERE), OBJECT_LOCATION_MAP],
+            vocabulary
+        )
+    except Exception as e:
+        print(f"⚠️ 위치 정보 읽기 실패: {e}")
+
+    vocabulary.discard("")
+    return vocabulary
+
+
+def build_pruned_model(full_model: KeyedVectors, vocabulary: Iterable[str], top_n: int = None) -> Tuple[KeyedVectors, List[str]]:
+    """
+    빈도 상위 N개 단어와 게임 어휘만 남긴 축소 모델 생성
+
+    Args:
+        full_model: 전체 KeyedVectors (단어가 빈도순으로 정렬되어 있음)
+        vocabulary: 반드시 포함할 단어
+        top_n: 포함할 빈도 상위 단어 수
+
+    Returns:
+        Tuple[KeyedVectors, List[str]]: 축소 모델 (벡터 값은 전체 모델과 동일), 전체 모델에도 없는 게임 어휘
+    """
+    top_n = DEFAULT_TOP_N if top_n is None else top_n
+
+    keys = list(full_model.index_to_key[:top_n])
+    seen = set(keys)
+    missing_words = []
+    for word in sorted(vocabulary):
+        if word in seen:
+            continue
+        if word in full_model.key_to_index:
+            keys.append(word)
+            seen.add(word)
+        else:
+            missing_words.append(word)
+
+    indices = np.array([full_model.key_to_index[word] for word in keys], dtype=np.int64)
+    vectors = np.asarray(full_model.vectors[indices], dtype=np.float32)
+
+    pruned_model = KeyedVectors(full_model.vector_size, dtype=np.float32)
+    pruned_model.add_vectors(keys, vectors)
+    return pruned_model, missing_words
@@ -1,11 +1,20 @@
 import os
 import sys
+import json
 import time
 import gensim.downloader as api
 from gensim.models import KeyedVectors
 import subprocess
 from pathlib import Path
 
+# AI 디렉토리를 Python 경로에 추가 (게임 어휘 수집용 agent 모듈 임포트)
+ROOT_DIR = Path(__file__).parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+# 축소 모델에 포함할 빈도 상위 단어 수 (환경 변수로 변경 가능)
+PRUNED_TOP_N = int(os.environ.get("PRUNED_WORD2VEC_TOP_N", "50000"))
+
 def get_gensim_data_path():
     """gensim 모델 다운로드 기본 경로를 반환합니다"""
     try:
@@ -30,10 +39,13 @@ def prepare_model():
     # 모델 저장 경로 설정
     current_dir = Path(__file__).parent
     KV_PATH = os.path.join(current_dir, 'models', 'word2vec-google-news-300.kv')
+    PRUNED_KV_PATH = os.path.join(current_dir, 'models', 'word2vec-game-vocab.kv')
     
     # 1. KV 파일 존재 여부 확인
     if os.path.exists(KV_PATH):
         print(f"\n✅ Word2Vec 모델이 이미 설치되어 있습니다. ({KV_PATH})")
+        if not os.path.exists(PRUNED_KV_PATH):
+            prepare_pruned_model(KV_PATH, PRUNED_KV_PATH)
         return True
     else:
         # 2. KV 파일이 없으면 다운로드 및 변환
@@ -59,6 +71,9 @@ def prepare_model():
             kv.save(KV_PATH)
             print("✅ 모델 변환 및 저장 완료")
             
+            # 게임 어휘 축소 모델 생성
+            prepare_pruned_model(KV_PATH, PRUNED_KV_PATH, full_model=kv)
+            
             # 총 소요 시간 계산
             total_time = time.time() - start_time
             print(f"\n⏱ 총 모델 준비 시간: {total_time:.2f}초")
@@ -71,6 +86,38 @@ def prepare_model():
             input("계속하려면 아무 키나 누르세요...")
             return False
 
+def prepare_pruned_model(kv_path, pruned_kv_path, full_model=None, top_n=PRUNED_TOP_N):
+    """빈도 상위 단어와 게임 어휘만 남긴 축소 Word2Vec 모델을 생성하는 함수"""
+    print(f"\n✂️ 게임 어휘 축소 모델 생성 중... (빈도 상위 {top_n}개 단어 + 게임 어휘)")
+    start_time = time.time()
+    
+    try:
+        from agent.modules.word_vectors import collect_game_vocabulary, build_pruned_model, oov_path_for
+        
+        if full_model is None:
+            full_model = KeyedVectors.load(kv_path, mmap='r')
+        
+        # 프롬프트, 오브젝트 사전, 위치, 저장된 메모리에 등장하는 단어 수집
+        vocabulary = collect_game_vocabulary(os.path.join(ROOT_DIR, 'agent'))
+        print(f"🔍 수집된 게임 어휘: {len(vocabulary)}개")
+        
+        pruned_model, missing_words = build_pruned_model(full_model, vocabulary, top_n=top_n)
+        os.makedirs(os.path.dirname(pruned_kv_path), exist_ok=True)
+        pruned_model.save(pruned_kv_path)
+        
+        # 전체 모델에도 없는 어휘는 서버에서 전체 모델을 매핑하지 않고 바로 제외
+        with open(oov_path_for(pruned_kv_path), 'w', encoding='utf-8') as f:
+            json.dump(missing_words, f, ensure_ascii=False)
+        
+        print(f"✅ 축소 모델 저장 완료 ({len(pruned_model)}개 단어, {pruned_kv_path})")
+        print(f"⏱ 축소 모델 생성 시간: {time.time() - start_time:.2f}초")
+        return True
+    
+    except Exception as e:
+        # 축소 모델이 없어도 서버는 전체 모델로 동작
+        print(f"⚠️ 축소 모델 생성 실패 (전체 모델을 사용합니다): {e}")
+        return False
+
 def start_server():
     """서버를 백그라운드로 시작하는 함수"""
     print("\n🚀 AI 서버를 시작합니다...")
@@ -111,6 +158,16 @@ def main():
     """메인 함수 - 모델 준비 및 서버 시작"""
     start_time = time.time()
     
+    # 저장된 메모리가 늘어난 뒤 축소 모델 다시 생성
+    if "--rebuild-pruned" in sys.argv:
+        current_dir = Path(__file__).parent
+        KV_PATH = os.path.join(current_dir, 'models', 'word2vec-google-news-300.kv')
+        PRUNED_KV_PATH = os.path.join(current_dir, 'models', 'word2vec-game-vocab.kv')
+        if not os.path.exists(KV_PATH):
+            print(f"❌ Word2Vec 모델이 설치되어 있지 않습니다. ({KV_PATH})")
+            sys.exit(1)
+        sys.exit(0 if prepare_pruned_model(KV_PATH, PRUNED_KV_PATH) else 1)
+    
     # 모델 준비
     if not prepare_model():
         sys.exit(1)
@@ -49,12 +49,42 @@ try:
 except Exception as e:
     print(f"❌ MemoryRetriever 임포트 실패: {e}")
 
+try:
+    from agent.modules.object_index import ObjectEmbeddingIndex
+    print("✅ ObjectEmbeddingIndex 임포트 완료")
+except Exception as e:
+    print(f"❌ ObjectEmbeddingIndex 임포트 실패: {e}")
+
+try:
+    from agent.modules.prompt_registry import get_prompt_registry
+    print("✅ PromptRegistry 임포트 완료")
+except Exception as e:
+    print(f"❌ PromptRegistry 임포트 실패: {e}")
+
 try:
     from agent.modules.embedding_updater import EmbeddingUpdater
     print("✅ EmbeddingUpdater 임포트 완료")
 except Exception as e:
     print(f"❌ EmbeddingUpdater 임포트 실패: {e}")
 
+try:
+    from agent.modules.storage.io_executor import run_io, shutdown_io_executor
+    print("✅ 저장소 I/O 실행기 임포트 완료")
+except Exception as e:
+    print(f"❌ 저장소 I/O 실행기 임포트 실패: {e}")
+
+try:
+    from agent.modules.background_jobs import BackgroundJobManager, JobFailed
+    print("✅ BackgroundJobManager 임포트 완료")
+except Exception as e:
+    print(f"❌ BackgroundJobManager 임포트 실패: {e}")
+
+try:
+    from agent.modules.word_vectors import load_word_vectors
+    print("✅ word_vectors 임포트 완료")
+except Exception as e:
+    print(f"❌ word_vectors 임포트 실패: {e}")
+
 from agent.modules.reaction_decider import ReactionDecider
 from agent.modules.agent_conversation import AgentConversationManager
 
@@ -121,23 +151,28 @@ if not os.path.exists(KV_PATH):
         print(f"❌ prepare_server.py 실행 중 오류 발생: {e}")
         sys.exit(1)
 
-# 2) 매핑(mmap) 방식으로 빠르게 로드
+# 2) 게임 어휘 축소 모델이 있으면 축소 모델을 로드하고, 없는 단어만 전체 모델에서 조회
+#    (USE_PRUNED_WORD2VEC=0 이면 전체 모델을 매핑(mmap) 방식으로 로드)
+PRUNED_KV_PATH = os.path.join('models', 'word2vec-game-vocab.kv')
+USE_PRUNED_WORD2VEC = os.environ.get("USE_PRUNED_WORD2VEC", "1") != "0"
 print("🤖  KeyedVectors 모델 로딩 중...")
-word2vec_model = KeyedVectors.load(KV_PATH, mmap='r')
+if USE_PRUNED_WORD2VEC and os.path.exists(PRUNED_KV_PATH):
+    word2vec_model = load_word_vectors(KV_PATH, pruned_path=PRUNED_KV_PATH)
+else:
+    word2vec_model = KeyedVectors.load(KV_PATH, mmap='r')
 print("✅  KeyedVectors 모델 로딩 완료")
 
 print("✅ Word2Vec 모델 로딩 완료")
 
-# object_embeddings.json 파일 로드
+# object_embeddings.json 파일을 한 번만 읽어 정규화된 오브젝트 임베딩 행렬로 구성
 print("📚 object_embeddings.json 파일 로딩 중...")
 object_embeddings_path = ROOT_DIR / "agent" / "data" / "object_dict" / "object_embeddings.json"
 try:
-    with open(object_embeddings_path, 'r', encoding='utf-8') as f:
-        object_embeddings = json.load(f)
-    print("✅ object_embeddings.json 파일 로딩 완료")
+    object_embeddings = ObjectEmbeddingIndex.load(str(object_embeddings_path))
+    print(f"✅ object_embeddings.json 파일 로딩 완료 (오브젝트 {len(object_embeddings)}개, 차원: {object_embeddings.dim})")
 except Exception as e:
     print(f"❌ object_embeddings.json 파일 로딩 실패: {e}")
-    object_embeddings = {}
+    object_embeddings = ObjectEmbeddingIndex()
 
 try:
     client = OllamaClient()
@@ -152,13 +187,13 @@ except Exception as e:
     print(f"❌ MemoryUtils 인스턴스 생성 실패: {e}")
 
 try:
-    retrieve = MemoryRetriever(memory_file_path="agent/data/memories.json", word2vec_model=word2vec_model)
+    retrieve = MemoryRetriever(memory_file_path="agent/data/memories.json", word2vec_model=word2vec_model, memory_utils=memory_utils)
     print("✅ MemoryRetriever 인스턴스 생성 완료")
 except Exception as e:
     print(f"❌ MemoryRetriever 인스턴스 생성 실패: {e}")
 
 try:
-    embedding_updater = EmbeddingUpdater(word2vec_model)
+    embedding_updater = EmbeddingUpdater(word2vec_model, memory_utils=memory_utils)
     print("✅ EmbeddingUpdater 인스턴스 생성 완료")
 except Exception as e:
     print(f"❌ EmbeddingUpdater 인스턴스 생성 실패: {e}")
@@ -202,8 +237,27 @@ try:
 except Exception as e:
     print(f"❌ SimpleFeedbackProcessor 인스턴스 생성 실패: {e}")
 
+# 반성/계획 생성 백그라운드 작업 (같은 에이전트와 게임 시간으로 다시 제출하면 기존 작업을 재사용)
+reflect_plan_jobs = BackgroundJobManager()
+REFLECT_PLAN_STAGES = ("importance", "reflection", "plan", "unity_plan", "plan_retry")
+
 print(f"⏱ 인스턴스 생성 시간: {time.time() - instance_start:.2f}초")
 
+
+@app.on_event("shutdown")
+def flush_memory_store():
+    """서버 종료 시 아직 기록되지 않은 메모리 변경 사항을 디스크에 기록"""
+    memory_utils.memory_store.flush()
+    shutdown_io_executor()
+    print("💾 메모리 저장소 기록 완료")
+
+
+@app.on_event("shutdown")
+async def close_ollama_client():
+    """서버 종료 시 백그라운드 작업을 멈추고 올라마 HTTP 세션 정리"""
+    await reflect_plan_jobs.shutdown()
+    await client.close()
+
 # 프롬프트 템플릿
 RETRIEVE_PROMPT_TEMPLATE = """
 당신은 {AGENT_NAME}입니다. 현재 상황에 대해 반응해야 합니다.
@@ -227,42 +281,33 @@ You are a helpful AI assistant that responds in JSON format.
 Your responses should be natural and contextual.
 """
 
-# 프롬프트 파일 경로
-PROMPT_DIR = ROOT_DIR / "agent" / "prompts" / "retrieve"
-RETRIEVE_PROMPT_PATH = PROMPT_DIR / "retrieve_prompt.txt"
-RETRIEVE_SYSTEM_PATH = PROMPT_DIR / "retrieve_system.txt"
+# 프롬프트 템플릿 레지스트리 (agent/prompts/** 를 시작 시 한 번 읽고 파일이 바뀌면 다시 로드)
+prompt_registry = get_prompt_registry(ROOT_DIR / "agent" / "prompts")
+prompt_registry.register(
+    "retrieve/retrieve_prompt",
+    default=RETRIEVE_PROMPT_TEMPLATE,
+    placeholders=("AGENT_NAME", "AGENT_DATA", "EVENT_CONTENT", "RELEVANT_MEMORIES", "RELEVANT_OBJECTS")
+)
+prompt_registry.register("retrieve/retrieve_system", default=RETRIEVE_SYSTEM_TEMPLATE)
 
 print("\n=== 프롬프트 파일 확인 ===")
-print(f"📂 프롬프트 디렉토리: {PROMPT_DIR}")
-print(f"📄 프롬프트 파일: {RETRIEVE_PROMPT_PATH}")
-print(f"📄 시스템 파일: {RETRIEVE_SYSTEM_PATH}")
-
-def load_prompt_file(file_path: Path) -> str:
-    """
-    프롬프트 파일을 로드하거나 기본 템플릿을 반환
-    
-    Args:
-        file_path: 프롬프트 파일 경로
-    
-    Returns:
-        str: 프롬프트 내용
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"❌ 프롬프트 파일 로드 중 오류 발생: {e}")
-        # 파일이 없는 경우 기본 템플릿 반환
-        if file_path == RETRIEVE_PROMPT_PATH:
-            return RETRIEVE_PROMPT_TEMPLATE
-        elif file_path == RETRIEVE_SYSTEM_PATH:
-            return RETRIEVE_SYSTEM_TEMPLATE
-        return ""
+print(f"📂 프롬프트 디렉토리: {prompt_registry.prompts_dir}")
+print(f"📄 프롬프트 템플릿: {prompt_registry.stats()['templates']}개")
 
 @app.get("/hello")
 async def hello():
     return "Hello from Python!"
 
+@app.get("/llm/stats")
+async def llm_stats():
+    """LLM 요청 우선순위 클래스별 대기열 길이와 대기 시간 (+ 반응 판단 캐시, 프롬프트 레지스트리, 메모리 기록, 백그라운드 작업 통계)"""
+    stats = dict(client.get_queue_stats())
+    stats["reaction_decision_cache"] = reaction_decider.decision_cache.stats()
+    stats["prompt_registry"] = prompt_registry.stats()
+    stats["memory_writes"] = memory_utils.memory_store.write_stats()
+    stats["background_jobs"] = reflect_plan_jobs.stats()
+    return stats
+
 @app.post("/perceive")
 async def perceive_event(payload: dict):
     """관찰 정보를 저장하는 엔드포인트"""
@@ -284,7 +329,7 @@ async def perceive_event(payload: dict):
         # 메모리 저장
         success = False
         if event_data.get("event_is_save", True):
-            success = memory_utils.save_perception(event_data, agent_name)
+            success = await memory_utils.save_perception_async(event_data, agent_name)
         else:
             print("💾 event_is_save 값이 False이므로 메모리 저장 건너뜀")
         return {
@@ -316,7 +361,7 @@ async def location_data(payload: dict):
         # 메모리 저장
         success = False
         if event_data.get("event_is_save", True):
-            success = memory_utils.save_location_data(event_data, agent_name)
+            success = await memory_utils.save_location_data_async(event_data, agent_name)
         else:
             print("💾 event_is_save 값이 False이므로 메모리 저장 건너뜀")
         return {
@@ -327,6 +372,57 @@ async def location_data(payload: dict):
         print(f"❌ 관찰 정보 저장 중 오류 발생: {str(e)}")
         return {"success": False, "error": str(e)}
 
+@app.post("/perceive_batch")
+async def perceive_batch(payload: dict):
+    """
+    여러 에이전트의 관찰/위치 정보를 한 번에 저장하는 엔드포인트
+
+    요청 형식:
+        {"events": [{"type": "perceive" | "location", "agent": {"name", "time", "perceive_event"}}, ...]}
+        (각 항목의 agent는 /perceive, /location_data 요청의 agent와 같은 형식)
+
+    응답의 memory_ids는 요청 순서대로 저장된 메모리 ID입니다.
+    (event_is_save가 False이거나 형식이 잘못된 항목은 None)
+    """
+    try:
+        items = (payload or {}).get("events")
+        if not isinstance(items, list):
+            return {"success": False, "error": "events field is required"}
+
+        batch = []
+        positions = []
+        errors = {}
+        for i, item in enumerate(items):
+            agent_data = item.get("agent") if isinstance(item, dict) else None
+            event_type = item.get("type", "perceive") if isinstance(item, dict) else None
+            if not isinstance(agent_data, dict) or event_type not in ("perceive", "location"):
+                errors[i] = "agent field and type (perceive/location) are required"
+                continue
+
+            event_data = dict(agent_data.get("perceive_event", {}))
+            # 게임 시간 정보가 없으면 추가
+            game_time = agent_data.get("time", None)
+            if game_time and "time" not in event_data:
+                event_data["time"] = game_time
+            if not event_data.get("event_is_save", True):
+                continue
+
+            batch.append({"type": event_type, "agent": agent_data.get("name", "Tom"), "event": event_data})
+            positions.append(i)
+
+        memory_ids = [None] * len(items)
+        for position, memory_id in zip(positions, await memory_utils.save_events_batch_async(batch)):
+            memory_ids[position] = memory_id
+
+        response = {"success": not errors, "memory_ids": memory_ids, "saved": len(batch)}
+        if errors:
+            response["errors"] = errors
+        return response
+
+    except Exception as e:
+        print(f"❌ 관찰 정보 묶음 저장 중 오류 발생: {str(e)}")
+        return {"success": False, "error": str(e)}
+
 
 @app.post("/react")
 async def should_react(payload: dict):
@@ -369,7 +465,7 @@ async def should_react(payload: dict):
         if should_react == False and event_is_save == True:
             print("💾 메모리 저장 중...")
             memory_start = time.time()
-            success = memory_utils.save_perception(event_data, agent_name)
+            success = await memory_utils.save_perception_async(event_data, agent_name)
             memory_time = time.time() - memory_start
             print(f"⏱ 메모리 저장 시간: {memory_time:.2f}초")
         
@@ -472,7 +568,7 @@ async def react_to_event(payload: dict):
             event_embedding=embedding,
             state_embedding=state_embedding,
             agent_name=agent_name,
-            prompt_template=load_prompt_file(RETRIEVE_PROMPT_PATH),
+            prompt_template=prompt_registry.get("retrieve/retrieve_prompt"),
             agent_data=agent_data,
             similar_data_cnt=5,  # 유사한 이벤트 5개 포함
             similarity_threshold=0.1,  # 유사도 0.5 이상인 이벤트만 포함
@@ -490,14 +586,16 @@ async def react_to_event(payload: dict):
             # Ollama API 호출
             response = await client.process_prompt(
                 prompt=prompt,
-                system_prompt=load_prompt_file(RETRIEVE_SYSTEM_PATH),
+                system_prompt=prompt_registry.get("retrieve/retrieve_system"),
                 model_name="gemma3",
                 options={
                     "temperature": 0.7,
                     "top_p": 0.9,
                     "frequency_penalty": 0.1,
                     "presence_penalty": 0.1
-                }
+                },
+                priority="interactive",
+                stop_on="json"
             )
             
             # Ollama 응답 시간 계산
@@ -544,7 +642,7 @@ async def react_to_event(payload: dict):
                 event_importance = 0
                 embedding = memory_utils.get_embedding("")
 
-            memory_id = memory_utils.save_memory(
+            memory_id = await memory_utils.save_memory_async(
                 event_sentence=event_sentence,
                 embedding=embedding,
                 event_time=agent_time,  # 에이전트의 시간 사용
@@ -553,6 +651,8 @@ async def react_to_event(payload: dict):
                 importance=event_importance
             )
             print(f"💾 메모리 저장 완료 (시간: {agent_time}, 메모리 ID: {memory_id})")
+            # 새 반응 메모리가 생겼으므로 이 에이전트의 캐시된 반응 판단은 버림
+            reaction_decider.invalidate_decisions(agent_name)
 
             # 전체 처리 시간 계산
             total_response_time = time.time() - total_start_time
@@ -595,10 +695,14 @@ async def save_simple_action_feedback(payload: dict):
             return {"success": False, "error": "agent field is required"}
             
         # 피드백 처리
-        result = simple_feedback_processor.process_simple_feedback(payload)
+        result = await run_io(simple_feedback_processor.process_simple_feedback, payload)
         
         if not result:
             return {"success": False, "error": "Failed to process feedback"}
+
+        # 행동 피드백이 저장되었으므로 이 에이전트의 캐시된 반응 판단은 버림
+        feedback_agent = payload.get('agent', {})
+        reaction_decider.invalidate_decisions(feedback_agent.get('agent_name', feedback_agent.get('name')))
         
         # 처리 시간 계산
         total_time = time.time() - start_time
@@ -613,52 +717,135 @@ async def save_simple_action_feedback(payload: dict):
         return {"success": False, "error": str(e)}
 
 
+def _validate_reflect_plan_payload(payload: Dict[str, Any]):
+    """반성/계획 요청 필수 필드 확인 (문제가 없으면 None, 있으면 오류 메시지)"""
+    if "agent" not in payload or "name" not in payload["agent"]:
+        return "agent.name이 필요합니다."
+    if not payload.get("agent", {}).get("time", ""):
+        return "agent.time이 필요합니다."
+    callback_url = payload.get("callback_url")
+    if callback_url and not reflect_plan_jobs.is_callback_allowed(callback_url):
+        return "허용되지 않은 callback_url입니다. (JOB_CALLBACK_ALLOWED_URLS 확인)"
+    return None
+
+
+async def _run_reflect_and_plan(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    """
+    반성 및 계획 생성 (백그라운드 작업으로 실행, progress로 단계 이름 전달)
+
+    Raises:
+        JobFailed: 반성 또는 계획 생성에 실패한 경우 (성공한 결과만 보관되어 재사용되고, 실패하면 다시 제출할 때 새로 실행)
+    """
+    # 전체 처리 시작 시간 기록
+    total_start_time = time.time()
+    
+    # 반성 처리 시작 시간
+    reflection_start_time = time.time()
+    reflection_success = await process_reflection_request(payload, client, word2vec_model=word2vec_model, progress=progress)
+    reflection_time = time.time() - reflection_start_time
+    print(f"⏱ 반성 처리 시간: {reflection_time:.2f}초")
+    
+    # 계획 처리 시작 시간
+    plan_start_time = time.time()
+    plan_success, unity_plan = await process_plan_request(payload, client, progress=progress)
+    plan_time = time.time() - plan_start_time
+    print(f"⏱ 계획 처리 시간: {plan_time:.2f}초")
+    
+    # 전체 처리 시간 계산
+    total_time = time.time() - total_start_time
+    print(f"\n⏱ 시간 측정 결과:")
+    print(f"  - 반성 처리 시간: {reflection_time:.2f}초")
+    print(f"  - 계획 처리 시간: {plan_time:.2f}초")
+    print(f"  - 전체 처리 시간: {total_time:.2f}초")
+    
+    result = {
+        "success": reflection_success and plan_success,
+        "next_day_plan": unity_plan
+    }
+    if not result["success"]:
+        stage = "반성" if not reflection_success else "계획"
+        raise JobFailed(f"{stage} 생성에 실패했습니다.", result)
+    return result
+
+
+def _submit_reflect_and_plan(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """반성/계획 작업 제출 (같은 에이전트와 게임 시간의 작업이 있으면 그 작업을 반환)"""
+    agent = payload["agent"]
+    return reflect_plan_jobs.submit(
+        "reflect_and_plan",
+        lambda progress: _run_reflect_and_plan(payload, progress),
+        key=(agent["name"], agent["time"]),
+        stages=REFLECT_PLAN_STAGES,
+        callback_url=payload.get("callback_url")
+    )
+
+
 @app.post("/reflect-and-plan")
 async def reflection_and_plan(payload: Dict[str, Any]):
-    """반성 및 계획 생성 엔드포인트"""
+    """
+    반성 및 계획 생성 엔드포인트 (완료될 때까지 기다렸다가 결과 반환)
+
+    백그라운드 작업으로 실행하므로, 연결이 끊긴 뒤 같은 요청을 다시 보내면 진행 중인 작업의 결과를 기다립니다.
+    기다리지 않으려면 /reflect-and-plan/jobs를 사용합니다.
+    """
     try:
-        # 전체 처리 시작 시간 기록
-        total_start_time = time.time()
         print(f"\n=== /reflect-and-plan 엔드포인트 호출 ===")
         print(f"📥 요청 데이터: {payload}")
         
         # 필수 필드 확인
-        if "agent" not in payload or "name" not in payload["agent"]:
-            return {"success": False, "error": "agent.name이 필요합니다."}
-        
-        # 날짜 확인
-        agent_time = payload.get("agent", {}).get("time", "")
-        if not agent_time:
-            return {"success": False, "error": "agent.time이 필요합니다."}
-        
-        # 반성 처리 시작 시간
-        reflection_start_time = time.time()
-        reflection_success = await process_reflection_request(payload, client, word2vec_model=word2vec_model)
-        reflection_time = time.time() - reflection_start_time
-        print(f"⏱ 반성 처리 시간: {reflection_time:.2f}초")
+        error = _validate_reflect_plan_payload(payload)
+        if error:
+            return {"success": False, "error": error}
         
-        # 계획 처리 시작 시간
-        plan_start_time = time.time()
-        plan_success, unity_plan = await process_plan_request(payload, client)
-        plan_time = time.time() - plan_start_time
-        print(f"⏱ 계획 처리 시간: {plan_time:.2f}초")
-        
-        # 전체 처리 시간 계산
-        total_time = time.time() - total_start_time
-        print(f"\n⏱ 시간 측정 결과:")
-        print(f"  - 반성 처리 시간: {reflection_time:.2f}초")
-        print(f"  - 계획 처리 시간: {plan_time:.2f}초")
-        print(f"  - 전체 처리 시간: {total_time:.2f}초")
-        
-        return {
-            "success": reflection_success and plan_success,
-            "next_day_plan": unity_plan
-        }
+        job = _submit_reflect_and_plan(payload)
+        job = await reflect_plan_jobs.wait(job["job_id"])
+        if job is None:
+            return {"success": False, "error": "작업 결과를 찾을 수 없습니다."}
+        if job["status"] != "succeeded":
+            # 실패해도 생성된 계획이 있으면 기존과 같은 형식으로 반환
+            if isinstance(job.get("result"), dict):
+                return dict(job["result"], error=job["error"])
+            return {"success": False, "error": job["error"]}
+        return job["result"]
         
     except Exception as e:
         print(f"❌ 반성 및 계획 처리 중 오류 발생: {str(e)}")
         return {"success": False, "error": str(e)}
 
+
+@app.post("/reflect-and-plan/jobs")
+async def submit_reflection_and_plan_job(payload: Dict[str, Any]):
+    """
+    반성 및 계획 생성 작업 제출 엔드포인트 (작업 ID를 바로 반환)
+
+    payload는 /reflect-and-plan과 같고, "callback_url"이 있으면 작업이 끝났을 때 작업 상태를 POST로 보냅니다.
+    (callback_url은 JOB_CALLBACK_ALLOWED_URLS에 등록한 주소 아래만 허용)
+    진행 상황과 결과는 GET /reflect-and-plan/jobs/{job_id}로 조회합니다.
+    """
+    print(f"\n=== /reflect-and-plan/jobs 엔드포인트 호출 ===")
+    print(f"📥 요청 데이터: {payload}")
+    
+    error = _validate_reflect_plan_payload(payload)
+    if error:
+        return {"success": False, "error": error}
+    
+    job = _submit_reflect_and_plan(payload)
+    print(f"📋 반성/계획 작업: {job['job_id']} ({job['status']})")
+    return {"success": True, "job": job}
+
+
+@app.get("/reflect-and-plan/jobs/{job_id}")
+async def get_reflection_and_plan_job(job_id: str):
+    """
+    반성 및 계획 생성 작업 상태 조회 엔드포인트
+
+    status(queued/running/succeeded/failed), 단계별 진행 상황(stages, progress), 끝난 작업의 결과(result)를 반환합니다.
+    """
+    job = reflect_plan_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return {"success": True, "job": job}
+
 ######################################################################################
 ###                                     계획                                       ###
 ######################################################################################
@@ -666,15 +853,26 @@ async def reflection_and_plan(payload: Dict[str, Any]):
 @app.post("/update_embeddings")
 async def update_embeddings():
     """
-    모든 메모리와 반성의 임베딩을 업데이트하는 엔드포인트
+    새로 추가되었거나 텍스트가 바뀐 메모리와 반성의 임베딩을 업데이트하는 엔드포인트
+
+    저장된 텍스트 해시와 같은 항목은 건너뛰며, 다시 계산한 수(updated)와 건너뛴 수(skipped)를 반환합니다.
     """
+    global object_embeddings
     try:
         print("\n=== 임베딩 업데이트 시작 ===")
-        update_counts = embedding_updater.update_embeddings()
+        update_counts = await run_io(embedding_updater.update_embeddings)
+        # 오브젝트 임베딩 파일을 새로 만들었으면 행렬도 다시 구성
+        if update_counts.get("objects"):
+            object_embeddings = await run_io(ObjectEmbeddingIndex.load, str(object_embeddings_path))
         print(f"✅ 임베딩 업데이트 완료: {update_counts}")
+        print(f"📊 임베딩 캐시: {memory_utils.embedding_cache.stats()}")
         return {
             "success": True,
-            "updated": update_counts
+            "updated": {key: update_counts[key] for key in ("memories", "reflections", "objects")},
+            "skipped": {
+                "memories": update_counts["skipped_memories"],
+                "reflections": update_counts["skipped_reflections"]
+            }
         }
     except Exception as e:
         print(f"❌ 임베딩 업데이트 실패: {e}")
@@ -715,6 +913,9 @@ async def handle_conversation(payload: dict):
             memory_ids = result.get("memory_ids", [])
             if memory_ids:
                 print(f"💾 메모리 저장 완료: {memory_ids}")
+                # 대화 메모리가 저장되었으므로 참여 에이전트의 캐시된 반응 판단은 버림
+                for agent in payload.get("agents", []):
+                    reaction_decider.invalidate_decisions(agent.get("name"))
         
         return result
         
@@ -726,37 +927,31 @@ async def handle_conversation(payload: dict):
 def _perform_clear_all_data():
     """
     실제로 모든 데이터 파일을 빈 상태로 초기화하는 내부 함수.
-    memories.json, plans.json, reflections.json 파일을 완전히 초기화합니다.
+    memories, plans, reflections의 에이전트별 파일을 모두 삭제하여 완전히 초기화합니다.
     주의: 이 작업은 되돌릴 수 없습니다.
     """
     try:
         results = {}
         data_dir = os.path.dirname(memory_utils.memories_file)
         
-        # 초기화할 파일 목록
+        # 초기화할 데이터 목록
         files_to_clear = [
-            {"name": "memories", "path": memory_utils.memories_file},
-            {"name": "plans", "path": memory_utils.plans_file},
-            {"name": "reflections", "path": memory_utils.reflections_file}
+            {"name": "memories"},
+            {"name": "plans", "store": memory_utils.plan_store},
+            {"name": "reflections", "store": memory_utils.reflection_store}
         ]
         
-        # 각 파일 초기화
+        # 각 데이터 초기화
         for file_info in files_to_clear:
             file_name = file_info["name"]
-            file_path = file_info["path"]
             
             try:
-                # 파일 존재 확인
-                if not os.path.exists(file_path):
-                    print(f"⚠️ {file_name}.json 파일이 존재하지 않습니다. 빈 파일을 생성합니다.")
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
-                # 빈 데이터 구조 생성
-                empty_data = {}
-                
-                # 파일에 저장
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(empty_data, f, ensure_ascii=False, indent=2)
+                # 에이전트별 파일 삭제 (메모리는 상주 저장소를 비우고 샤드 삭제까지 즉시 기록)
+                if file_name == "memories":
+                    memory_utils.memory_store.replace_all({})
+                    memory_utils.memory_store.flush()
+                else:
+                    file_info["store"].clear()
                 
                 print(f"🧹 {file_name}.json 파일이 완전히 초기화되었습니다.")
                 
@@ -795,7 +990,47 @@ async def clear_all_data():
     memories.json, plans.json, reflections.json 파일을 완전히 초기화합니다.
     주의: 이 작업은 되돌릴 수 없습니다.
     """
-    return _perform_clear_all_data()
+    result = await run_io(_perform_clear_all_data)
+    reaction_decider.invalidate_decisions()
+    return result
+
+
+def _perform_set_all_data(payload: dict):
+    """
+    실제로 모든 데이터를 설정하는 내부 함수 (블로킹 I/O, 저장소 I/O 스레드에서 실행).
+    payload는 {"이름": {"memories":{}, "reflections":[], "plans":[]}} 형식이어야 합니다.
+    저장 후에는 임베딩을 업데이트합니다.
+    """
+    memories = {}
+    # 각 에이전트별로 데이터 처리
+    for agent_name, agent_data in payload.items():
+        # 메모리 데이터 (텍스트가 그대로인 필드는 기존 임베딩을 이어받음)
+        if "memories" in agent_data:
+            memories[agent_name] = {
+                "memories": agent_data["memories"],
+                "embeddings": embedding_updater.carry_over_memory_embeddings(agent_name, agent_data["memories"])
+            }
+        
+        # 반성 데이터 저장 (해당 에이전트 파일만 다시 씀, thought가 같은 반성은 기존 임베딩을 이어받음)
+        if "reflections" in agent_data:
+            agent_reflections = memory_utils.reflection_store.load_agent(agent_name) or {"reflections": []}
+            agent_reflections["reflections"] = agent_data["reflections"]
+            embedding_updater.carry_over_reflection_embeddings(agent_name, agent_reflections["reflections"])
+            memory_utils._save_reflections({agent_name: agent_reflections})
+        
+        # 계획 데이터 저장 (해당 에이전트 파일만 다시 씀)
+        if "plans" in agent_data:
+            memory_utils._save_plans({agent_name: agent_data["plans"]})
+
+    # 메모리 데이터 저장 (기존 임베딩을 모두 읽은 뒤 한 번에 교체)
+    if memories:
+        memory_utils._save_memories(memories)
+    
+    # 임베딩 업데이트 (새로 추가되었거나 바뀐 텍스트만 다시 임베딩)
+    print("\n=== 임베딩 업데이트 시작 ===")
+    update_counts = embedding_updater.update_embeddings()
+    print(f"✅ 임베딩 업데이트 완료: {update_counts}")
+    return update_counts
 
 
 @app.post("/data/save")
@@ -809,43 +1044,8 @@ async def set_all_data(payload: dict):
         if not payload:
             return {"success": False, "error": "데이터가 비어있습니다."}
         
-        memories = {}
-        # 각 에이전트별로 데이터 처리
-        for agent_name, agent_data in payload.items():
-            # 메모리 데이터 저장
-            if "memories" in agent_data:
-                memories[agent_name] = {
-                    "memories": {},
-                    "embeddings": {}
-                }
-                memories[agent_name]["memories"] = agent_data["memories"]
-                memory_utils._save_memories(memories)
-            
-            # 반성 데이터 저장
-            if "reflections" in agent_data:
-                reflections = memory_utils._load_reflections()
-                if agent_name not in reflections:
-                    reflections[agent_name] = {"reflections": []}
-                reflections[agent_name]["reflections"] = agent_data["reflections"]
-                memory_utils._save_reflections(reflections)
-            
-            # 계획 데이터 저장
-            if "plans" in agent_data:
-                try:
-                    with open(memory_utils.plans_file, 'r', encoding='utf-8') as f:
-                        plans = json.load(f)
-                except Exception:
-                    plans = {}
-                
-                plans[agent_name] = agent_data["plans"]
-                
-                with open(memory_utils.plans_file, 'w', encoding='utf-8') as f:
-                    json.dump(plans, f, ensure_ascii=False, indent=2)
-        
-        # 임베딩 업데이트
-        print("\n=== 임베딩 업데이트 시작 ===")
-        update_counts = embedding_updater.update_embeddings()
-        print(f"✅ 임베딩 업데이트 완료: {update_counts}")
+        update_counts = await run_io(_perform_set_all_data, payload)
+        reaction_decider.invalidate_decisions()
         
         return {
             "success": True,
@@ -858,6 +1058,10 @@ async def set_all_data(payload: dict):
         return {"success": False, "error": str(e)}
 
 
+# /data/load 응답에서 제외할 반성 임베딩 필드
+REFLECTION_EMBEDDING_KEYS = ("embedding", "embedding_row", "embedding_hash")
+
+
 @app.get("/data/load")
 async def get_all_data():
     """
@@ -866,19 +1070,14 @@ async def get_all_data():
     임베딩 데이터는 제외됩니다.
     """
     try:
-        # 메모리 데이터 로드
-        memories_data = memory_utils._load_memories()
+        # 메모리 데이터 조회 (응답 직렬화 중 다른 요청의 변경과 겹치지 않도록 복사본 사용)
+        memories_data = await memory_utils.load_memories_async()
         
         # 반성 데이터 로드
-        reflections_data = memory_utils._load_reflections()
+        reflections_data = await memory_utils.load_reflections_async()
         
         # 계획 데이터 로드
-        try:
-            with open(memory_utils.plans_file, 'r', encoding='utf-8') as f:
-                plans_data = json.load(f)
-        except Exception as e:
-            print(f"계획 데이터 로드 중 오류 발생: {e}")
-            plans_data = {"Tom": [], "Jane": []}
+        plans_data = await memory_utils.load_plans_async()
         
         # 결과 데이터 구조 생성
         result = {}
@@ -895,13 +1094,12 @@ async def get_all_data():
             if "memories" in memories_data[agent_name]:
                 result[agent_name]["memories"] = memories_data[agent_name]["memories"]
             
-            # 반성 데이터 처리 (임베딩 제외)
+            # 반성 데이터 처리 (임베딩 행 번호/텍스트 해시 같은 서버 내부 필드 제외)
             if agent_name in reflections_data and "reflections" in reflections_data[agent_name]:
-                for reflection in reflections_data[agent_name]["reflections"]:
-                    # 임베딩 필드 제거
-                    if "embedding" in reflection:
-                        del reflection["embedding"]
-                    result[agent_name]["reflections"].append(reflection)
+                result[agent_name]["reflections"] = [
+                    {key: value for key, value in reflection.items() if key not in REFLECTION_EMBEDDING_KEYS}
+                    for reflection in reflections_data[agent_name]["reflections"]
+                ]
             
             # 계획 데이터 처리
             if agent_name in plans_data:
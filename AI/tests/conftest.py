@@ -0,0 +1,12 @@
+"""
+테스트 공통 설정
+
+서버와 같은 방식(AI 디렉토리를 경로에 추가)으로 agent 패키지를 임포트합니다.
+"""
+
+import sys
+from pathlib import Path
+
+AI_DIR = Path(__file__).resolve().parent.parent
+if str(AI_DIR) not in sys.path:
+    sys.path.insert(0, str(AI_DIR))
@@ -0,0 +1,62 @@
+import numpy as np
+
+from agent.modules.storage.ann_index import IVFIndex
+
+
+def _normalized(rng, count, dim=8):
+    matrix = rng.normal(size=(count, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _assert_consistent(index):
+    """_count, assignment, 군집별 행 목록이 서로 일치하는지 확인"""
+    listed = [(row, label) for label, rows in enumerate(index._lists) for row in rows]
+    assert len(index) == len(listed)
+    assert len({row for row, _ in listed}) == len(listed)
+    for row, label in listed:
+        assert index.assignment[row] == label
+    assigned = np.flatnonzero(index.assignment >= 0)
+    assert sorted(assigned.tolist()) == sorted(row for row, _ in listed)
+
+
+def test_add_and_remove_after_train_keep_index_consistent():
+    rng = np.random.default_rng(0)
+    matrix = _normalized(rng, 300)
+    index = IVFIndex(n_lists=8, seed=0)
+    index.train(matrix, np.arange(200))
+    assert len(index) == 200
+    _assert_consistent(index)
+
+    # 학습 범위를 넘는 새 행 추가 (assignment 배열 확장)
+    for row in range(200, 300):
+        index.add(row, matrix[row])
+    assert len(index) == 300
+    _assert_consistent(index)
+
+    # 이미 있는 행을 다시 추가하면 중복 없이 재배정
+    for row in (0, 150, 299):
+        index.add(row, -matrix[row])
+    assert len(index) == 300
+    _assert_consistent(index)
+
+    for row in range(0, 300, 3):
+        index.remove(row)
+    # 없는 행 제거는 무시
+    index.remove(0)
+    index.remove(10000)
+    assert len(index) == 200
+    _assert_consistent(index)
+
+    candidates, _ = index.search(matrix, [matrix[1]], count=5, n_probe=8)
+    assert 1 in candidates.tolist()
+    assert not any(row % 3 == 0 for row in candidates.tolist())
+
+
+def test_add_before_train_is_ignored():
+    rng = np.random.default_rng(1)
+    matrix = _normalized(rng, 4)
+    index = IVFIndex(n_lists=2)
+    index.add(0, matrix[0])
+    index.remove(0)
+    assert len(index) == 0
+    assert not index.trained
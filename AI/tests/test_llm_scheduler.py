@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from agent.modules.llm_scheduler import PriorityScheduler, PRIORITY_BACKGROUND
+
+
+def test_fail_waiters_wakes_requests_on_another_loop():
+    scheduler = None
+    ready = threading.Event()
+    result = {}
+
+    async def waiter():
+        nonlocal scheduler
+        scheduler = PriorityScheduler(1)
+        await scheduler.acquire(PRIORITY_BACKGROUND)
+        task = asyncio.create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        ready.set()
+        try:
+            await asyncio.wait_for(task, timeout=5)
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=lambda: asyncio.run(waiter()))
+    thread.start()
+    assert ready.wait(5)
+    scheduler.fail_waiters(RuntimeError("loop changed"))
+    thread.join(5)
+
+    assert isinstance(result.get("error"), RuntimeError)
+    assert scheduler.get_stats()["classes"][PRIORITY_BACKGROUND]["queued"] == 0
+
+
+def test_fail_waiters_skips_closed_loop():
+    scheduler = None
+
+    async def enqueue():
+        nonlocal scheduler
+        scheduler = PriorityScheduler(1)
+        await scheduler.acquire(PRIORITY_BACKGROUND)
+        asyncio.get_running_loop().create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(enqueue())
+    loop.close()
+
+    scheduler.fail_waiters(RuntimeError("loop changed"))
+    assert scheduler.get_stats()["classes"][PRIORITY_BACKGROUND]["queued"] == 0
@@ -0,0 +1,138 @@
+import shutil
+
+import pytest
+
+from agent.modules.storage.memory_log import MemoryLog
+from agent.modules.storage.memory_store import MemoryStore
+
+
+def _put(agent, memory_id, event, vector):
+    return {
+        "op": "put_memory",
+        "agent": agent,
+        "memory_id": memory_id,
+        "memory": {"event": event, "time": "2025.05.01.10:00"},
+        "embeddings": {"event": vector}
+    }
+
+
+def _row(store, agent, memory_id):
+    return store.get_agent(agent)["embeddings"][memory_id]["row"]
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    stores = []
+
+    def make():
+        # 타이머로는 기록하지 않고 테스트에서 flush할 때만 기록
+        store = MemoryStore(str(tmp_path / "memories.json"), flush_delay=100, max_flush_delay=100, durability="group")
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.flush()
+
+
+def test_log_replay_after_crash_between_compaction_and_truncation(tmp_path):
+    snapshot_path = str(tmp_path / "Tom.json")
+    log = MemoryLog(snapshot_path)
+    log.append([
+        {"op": "put_memory", "agent": "Tom", "memory_id": "1", "memory": {"event": "a"}},
+        {"op": "put_memory", "agent": "Tom", "memory_id": "2", "memory": {"event": "b"}},
+        {"op": "update_memory", "agent": "Tom", "memory_id": "1", "fields": {"importance": 5}},
+        {"op": "delete_memory", "agent": "Tom", "memory_id": "2"},
+    ])
+    data = MemoryLog(snapshot_path).load()
+
+    # 스냅샷 교체 후 로그를 비우기 전에 종료된 상황: 새 스냅샷 + 이전 로그
+    shutil.copy(log.log_path, str(tmp_path / "old.log"))
+    log.compact(data)
+    shutil.copy(str(tmp_path / "old.log"), log.log_path)
+
+    recovered = MemoryLog(snapshot_path).load()
+    assert recovered == data
+    assert recovered["Tom"]["memories"] == {"1": {"event": "a", "importance": 5}}
+
+
+def test_store_reload_replays_unflushed_log(make_store):
+    store = make_store()
+    store.apply([_put("Tom", "1", "a", [1.0, 0.0]), _put("Tom", "2", "b", [0.0, 1.0])])
+    store.flush()
+    store.apply([{"op": "delete_memory", "agent": "Tom", "memory_id": "1"}])
+    store.flush()
+
+    reloaded = make_store()
+    assert set(reloaded.get_agent("Tom")["memories"]) == {"2"}
+    assert reloaded.get_embeddings("Tom", "2")["event"] == pytest.approx([0.0, 1.0])
+
+
+def test_deleted_row_reused_only_after_flush(make_store):
+    store = make_store()
+    store.apply([_put("Tom", "1", "a", [1.0, 0.0]), _put("Tom", "2", "b", [0.0, 1.0])])
+    store.flush()
+    deleted_row = _row(store, "Tom", "1")
+
+    store.apply([{"op": "delete_memory", "agent": "Tom", "memory_id": "1"}])
+    store.apply([_put("Tom", "3", "c", [1.0, 1.0])])
+    # 삭제가 기록되기 전에는 삭제된 메모리의 행을 다시 쓰지 않음
+    assert _row(store, "Tom", "3") != deleted_row
+
+    store.flush()
+    store.apply([_put("Tom", "4", "d", [0.5, 0.5])])
+    assert _row(store, "Tom", "4") == deleted_row
+    assert store.get_embeddings("Tom", "2")["event"] == pytest.approx([0.0, 1.0])
+    assert store.get_embeddings("Tom", "3")["event"] == pytest.approx([1.0, 1.0])
+
+
+def test_replace_agent_keeps_old_rows_until_flush(make_store):
+    store = make_store()
+    store.apply([_put("Tom", "1", "a", [1.0, 0.0]), _put("Tom", "2", "b", [0.0, 1.0])])
+    store.flush()
+    old_rows = {_row(store, "Tom", "1"), _row(store, "Tom", "2")}
+
+    store.replace_agent("Tom", {
+        "memories": {"5": {"event": "e", "time": "2025.05.02.09:00"}},
+        "embeddings": {"5": {"event": [0.3, 0.4]}}
+    })
+    assert _row(store, "Tom", "5") not in old_rows
+    store.apply([_put("Tom", "6", "f", [0.6, 0.8])])
+    assert _row(store, "Tom", "6") not in old_rows
+
+    store.flush()
+    store.apply([_put("Tom", "7", "g", [0.1, 0.2])])
+    assert _row(store, "Tom", "7") in old_rows
+
+    store.flush()
+    reloaded = make_store()
+    assert set(reloaded.get_agent("Tom")["memories"]) == {"5", "6", "7"}
+    assert reloaded.get_embeddings("Tom", "5")["event"] == pytest.approx([0.3, 0.4])
+
+
+def test_replace_all_removes_missing_agents_and_reserves_rows(make_store, tmp_path):
+    store = make_store()
+    store.apply([_put("Tom", "1", "a", [1.0, 0.0]), _put("Jane", "1", "b", [0.0, 1.0])])
+    store.flush()
+    old_row = _row(store, "Tom", "1")
+    jane_shard = tmp_path / "memories" / "Jane.log.jsonl"
+    assert jane_shard.exists()
+
+    store.replace_all({
+        "Tom": {
+            "memories": {"2": {"event": "c", "time": "2025.05.02.09:00"}},
+            "embeddings": {"2": {"event": [0.6, 0.8]}}
+        }
+    })
+    assert _row(store, "Tom", "2") != old_row
+    assert store.get_agent("Jane") is None
+
+    store.flush()
+    assert not jane_shard.exists()
+    store.apply([_put("Tom", "3", "d", [0.1, 0.2])])
+    assert _row(store, "Tom", "3") == old_row
+
+    store.flush()
+    reloaded = make_store()
+    assert reloaded.get_agent("Jane") is None
+    assert set(reloaded.get_agent("Tom")["memories"]) == {"2", "3"}
@@ -0,0 +1,63 @@
+"""시간 인덱스 파싱/정렬 테스트"""
+
+import pytest
+
+from agent.modules.storage.time_index import MIN_TIMESTAMP, AgentTimeIndex, date_key, parse_timestamp
+
+
+@pytest.mark.parametrize("time_str, expected", [
+    ("2025.05.01.09:30", 20250501093000),
+    ("2025.05.01.09:30:15", 20250501093015),
+    ("2025.05.01.9:30", 20250501093000),
+    ("2025.5.1.9:05", 20250501090500),
+    ("2025.05.01", 20250501000000),
+    ("2025-05-01 09:30:00", 20250501093000),
+])
+def test_parse_timestamp_accepts_game_time_variants(time_str, expected):
+    assert parse_timestamp(time_str) == expected
+
+
+@pytest.mark.parametrize("time_str", ["", None, "yesterday", "2025.13.01.09:30", "2025.05.01.25:00"])
+def test_parse_timestamp_rejects_invalid_times(time_str):
+    assert parse_timestamp(time_str) == MIN_TIMESTAMP
+
+
+def test_date_key_accepts_unpadded_dates():
+    assert date_key("2025.05.01") == 20250501
+    assert date_key("2025.5.1") == 20250501
+    assert date_key("2025.05.01.09:30") is None
+
+
+def test_unpadded_and_date_only_memories_are_found_by_date():
+    agent_data = {"memories": {
+        "1": {"time": "2025.05.01.9:30"},
+        "2": {"time": "2025.05.01"},
+        "3": {"time": "2025.05.02.08:00"},
+    }}
+    index = AgentTimeIndex()
+    index.sync(agent_data)
+    assert sorted(index.on_date("2025.05.01")) == ["1", "2"]
+
+
+def test_same_time_memories_keep_insertion_order():
+    memories = {
+        "10": {"time": "2025.05.01.09:00"},
+        "3": {"time": "2025.05.01.12:00"},
+        "7": {"time": "2025.05.01.12:00"},
+        "1": {"time": "2025.05.01.12:00"},
+    }
+    index = AgentTimeIndex()
+    index.sync({"memories": memories})
+
+    # 같은 시간은 먼저 추가된 메모리가 최신순에서 앞 (메모리 ID 순서와 무관)
+    assert list(index.newest_first()) == ["3", "7", "1", "10"]
+    assert index.latest(2) == ["3", "7"]
+    assert sorted(memories, key=index.sort_key, reverse=True) == list(index.newest_first())
+
+    # 시간이 그대로인 변경은 순서를 바꾸지 않고, 나중에 추가된 같은 시간 메모리는 뒤에 옴
+    memories["3"]["event"] = "changed"
+    memories["0"] = {"time": "2025.05.01.12:00"}
+    index.mark_dirty("3")
+    index.mark_dirty("0")
+    index.sync({"memories": memories})
+    assert list(index.newest_first()) == ["3", "7", "1", "0", "10"]